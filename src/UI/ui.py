@@ -1,21 +1,180 @@
 """
-    Interface de usuário principal para o aplicativo TubeTalk.
+Interface de usuário principal para o aplicativo TubeTalk.
 """
 
+import threading
+import uuid
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from pathlib import Path
+
 import streamlit as st
-from services import LLMService, YouTubeService
-from configs.prompts import SUMMARY_PROMPT_TEMPLATE, TOPICS_PROMPT_TEMPLATE, ARTICLE_PROMPT_TEMPLATE
+from services import ChatSession, LibraryService, LLMService, YouTubeService
+from services.analysis_service import (
+    ANALYSIS_PROMPTS,
+    analysis_identity,
+    analysis_key,
+    run_analysis,
+    share_analysis,
+    shared_analysis,
+)
+from services.result_store import ResultStore
+from services.shared_store import SharedStore, deep_sizeof
+from services.translation_service import TranslationService
+from configs.backend_config import ANALYSIS_QUEUE
+from configs.ollama_config import OLLAMA_PRELOAD
+from configs.profiling_config import PROFILE_DIR, PROFILE_ENABLED
+from configs.storage_config import (
+    EXPORT_DIR,
+    SHARED_STORE_LEASE_SECONDS,
+    SHARED_STORE_MAX_BYTES,
+    SPILL_DIR,
+    SPILL_TTL_SECONDS,
+)
+from configs.timeout_config import FETCH_DEADLINE_SHARE, REQUEST_DEADLINE_SECONDS
+from services.deadline import Deadline
+from services.profiler import RerunProfiler, current_profile, profiled
+from services.scheduler import LLMScheduler
+from services.embedding_service import EmbeddingService
+from services.shared_backend import BackendError, shared_backend
+from services.vector_store import CorpusIndex
+from services.worker import enqueue_analysis
+
+
+@st.cache_resource
+def results_store() -> SharedStore:
+    """Transcrições e análises compartilhadas entre sessões, com limite de memória"""
+    return SharedStore(
+        max_bytes=SHARED_STORE_MAX_BYTES,
+        spill_dir=SPILL_DIR,
+        lease_seconds=SHARED_STORE_LEASE_SECONDS,
+        spill_ttl=SPILL_TTL_SECONDS,
+    )
+
+
+@st.cache_resource
+def library() -> LibraryService:
+    """Biblioteca persistente de vídeos analisados"""
+    return LibraryService()
+
+
+@st.cache_resource
+def durable_results() -> ResultStore:
+    """Resultados de análise gravados em disco (sobrevivem a reinícios)"""
+    return ResultStore()
+
+
+@st.cache_resource
+def warm_ollama(model: str) -> dict:
+    """
+    Pré-carrega o modelo do Ollama uma vez por processo, sem bloquear a página
+
+    Só o sucesso vale para o processo inteiro: quem lê uma falha remove a
+    entrada (`warm_ollama.clear(model)`) para a carga ser tentada de novo.
+    """
+    status = {'success': None, 'load_seconds': None, 'error': None}
+    threading.Thread(target=lambda: status.update(LLMService.preload_ollama(model)), daemon=True).start()
+    return status
+
+
+@st.cache_resource
+def corpus() -> CorpusIndex:
+    """Índice vetorial com trechos de todos os vídeos analisados"""
+    # modelo local fixo: o índice não pode misturar dimensões de provedores diferentes
+    return CorpusIndex(EmbeddingService())
+
+
+@st.cache_resource
+def translations() -> TranslationService:
+    """Traduções das transcrições para o idioma da análise, guardadas em disco"""
+    return TranslationService()
+
+
+@st.cache_resource
+def profiler() -> RerunProfiler:
+    """Medições dos reruns de todas as sessões do processo"""
+    return RerunProfiler()
+
+
+@contextmanager
+def profile_rerun(fragment: str = None):
+    """
+    Mede o rerun inteiro (inclusive `UI.__init__`) quando o modo de profiling está ligado
+
+    Ligado por TUBETALK_PROFILE ou pela chave na barra lateral; a troca vale
+    a partir do rerun seguinte.
+
+    Args:
+        fragment: Nome do fragmento que envolve; o rerun só do fragmento é medido
+            à parte, e dentro de um rerun da página o bloco só faz parte dele
+    """
+    if not st.session_state.get('profiling', PROFILE_ENABLED):
+        yield None
+        return
+    if fragment and current_profile() is not None:
+        yield current_profile()
+        return
+    with profiler().rerun() as profile:
+        try:
+            yield profile
+        finally:
+            # a sessão e a página só são conhecidas depois de UI.__init__
+            profile.session = st.session_state.get('session_token')
+            video_data = st.session_state.get('video_data')
+            if fragment:
+                profile.label = f"fragmento {fragment}"
+            elif st.session_state.get('submitted') and video_data:
+                profile.label = f"vídeo {video_data['video_id']}"
+            else:
+                profile.label = "início"
 
-"""
-Interface de usuário principal para o aplicativo TubeTalk.
-"""
 
-import streamlit as st
-from services import LLMService, YouTubeService
-from configs.prompts import SUMMARY_PROMPT_TEMPLATE, TOPICS_PROMPT_TEMPLATE, ARTICLE_PROMPT_TEMPLATE
+# conteúdo derivado da análise, calculado uma vez por texto em vez de a cada rerun
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def summary_html(summary: str) -> str:
+    return "<div class='summary-box'>" + summary.replace(chr(10), '<br>') + "</div>"
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def chapter_labels(chapters: list) -> list:
+    return [f"{YouTubeService.format_duration(int(c['start'])) if c['start'] else '0:00'} · {c['title']}" for c in chapters]
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def history_markdown(history: tuple) -> str:
+    """Histórico do chat em um único bloco de Markdown"""
+    return "\n\n".join(f"**{'You' if role == 'user' else 'LLM'}:** {text}" for role, text in history)
+
+
+def duration_text(seconds: int) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m {seconds}s" if hours else f"{minutes}m {seconds}s"
+
+
+def usage_text(usage: dict) -> str:
+    cost = usage.get('cost')
+    cost_text = f" · ~US$ {cost:.4f}" if cost is not None else ""
+    speed_text = f" · {usage['tokens_per_second']:.1f} tokens/s" if usage.get('tokens_per_second') else ""
+    return f"Tokens: {usage.get('total_tokens', 0)} em {usage.get('calls', 0)} chamadas{cost_text}{speed_text}"
 
 
 class UI:
+    # campos de video_data mantidos na sessão; descrição fica no results_store e a transcrição, em disco
+    VIDEO_VIEW_FIELDS = (
+        'video_id', 'title', 'author', 'channel', 'publish_date', 'views', 'likes',
+        'duration', 'thumbnail_url', 'keywords', 'category', 'transcript_language',
+        'transcript_is_generated', 'transcript_hash', 'analysis_language',
+    )
+
+    # campos com a transcrição inteira; saem de video_data quando ela pode ser relida do disco
+    TRANSCRIPT_FIELDS = ('transcript', 'transcript_segments', 'chapter_segments')
+
+    # templates usados na análise; a versão deles entra na chave do resultado guardado
+    ANALYSIS_PROMPTS = ANALYSIS_PROMPTS
+
+    @profiled
     def __init__(self):
         if "submitted" not in st.session_state:
             st.session_state.submitted = False
@@ -25,8 +184,14 @@ class UI:
             st.session_state.video_data = None
         if "analysis_complete" not in st.session_state:
             st.session_state.analysis_complete = False
-        if "analysis" not in st.session_state:
-            st.session_state.analysis = None
+        if "analysis_reused_from" not in st.session_state:
+            st.session_state.analysis_reused_from = None
+        if "analysis_key" not in st.session_state:
+            st.session_state.analysis_key = None
+        if "session_token" not in st.session_state:
+            st.session_state.session_token = uuid.uuid4().hex
+        if "profiling" not in st.session_state:
+            st.session_state.profiling = PROFILE_ENABLED
 
         if "llm_provider" not in st.session_state:
             st.session_state.llm_provider = "openai"
@@ -76,11 +241,132 @@ class UI:
         """, unsafe_allow_html=True)
 
     def reset(self):
+        deadline = st.session_state.get('active_deadline')
+        if deadline is not None:
+            deadline.cancel()
+        if st.session_state.video_data:
+            vid = st.session_state.video_data['video_id']
+            self.release_results(vid)
+            st.session_state.pop(f'chat_session_{vid}', None)
         st.session_state.submitted = False
         st.session_state.video_url = ""
         st.session_state.video_data = None
         st.session_state.analysis_complete = False
-        st.session_state.analysis = None
+        st.session_state.analysis_reused_from = None
+        st.session_state.analysis_key = None
+
+    def analysis_identity(self) -> tuple:
+        """(provedor, modelo, versão dos templates) que identificam uma análise"""
+        return analysis_identity(st.session_state.llm_provider, st.session_state.llm_model or None)
+
+    def analysis_key(self, video_id: str) -> str:
+        """Chave da análise no results_store e no backend; muda com o modelo ou com algum template da análise"""
+        return analysis_key(video_id, *self.analysis_identity())
+
+    @profiled
+    def cached_analysis(self, video_id: str, transcript_hash: str = None):
+        """
+        Análise já feita com a configuração atual: memória do processo, disco e,
+        por fim, backend compartilhado (feita por outra réplica ou por um worker)
+
+        Com `transcript_hash`, só vale a análise feita sobre a mesma transcrição;
+        se o conteúdo mudou, o vídeo é analisado de novo.
+        """
+        key = self.analysis_key(video_id)
+        analysis = results_store().get(key)
+        if analysis is not None and transcript_hash and analysis.get('transcript_hash') not in (None, transcript_hash):
+            analysis = None
+        if analysis is None:
+            analysis = durable_results().get(video_id, *self.analysis_identity(), transcript_hash=transcript_hash)
+            if analysis is None:
+                analysis = shared_analysis(key, transcript_hash)
+            if analysis is not None:
+                results_store().put(key, analysis)
+        return analysis
+
+    @profiled
+    def hold_results(self, video_id: str):
+        """Reserva (renovando) os resultados do vídeo para esta sessão e retorna a análise"""
+        store = results_store()
+        owner = st.session_state.session_token
+        for key in (f"video:{video_id}", st.session_state.analysis_key):
+            store.acquire(key, owner)
+        return store.get(st.session_state.analysis_key)
+
+    def release_results(self, video_id: str):
+        store = results_store()
+        owner = st.session_state.session_token
+        for key in (f"video:{video_id}", st.session_state.analysis_key):
+            store.release(key, owner)
+
+    @profiled
+    def render_memory_usage(self):
+        with st.sidebar:
+            session_bytes = deep_sizeof({key: value for key, value in st.session_state.items()})
+            usage = results_store().usage()
+            st.caption(
+                f"🧠 Sessão: {session_bytes / 1024:.0f} KB · "
+                f"Compartilhado: {usage['bytes'] / 1024 / 1024:.1f}/{usage['max_bytes'] / 1024 / 1024:.0f} MB "
+                f"({usage['items']} itens, {usage['pinned']} em uso)"
+            )
+            with st.expander("⏱️ Fila do LLM"):
+                metrics = LLMScheduler.for_provider(st.session_state.llm_provider).metrics()
+                st.table({
+                    priority: {
+                        'na fila': values['queued'],
+                        'em andamento': values['running'],
+                        'atendidas': values['served'],
+                        'espera média (s)': round(values['wait_avg'], 2),
+                        'espera p95 (s)': round(values['wait_p95'], 2),
+                    }
+                    for priority, values in metrics.items()
+                })
+
+    # nomes das exceções com que o Streamlit interrompe o script
+    RERUN_EXITS = {'ok': 'completo', 'RerunException': 'st.rerun', 'StopException': 'st.stop'}
+
+    def render_profiling(self):
+        with st.sidebar:
+            with st.expander("🔬 Profiling"):
+                st.toggle(
+                    "Medir cada rerun",
+                    key='profiling',
+                    help="Tempo de cada rerun e das chamadas de serviço, com pilhas para flame graphs. Vale a partir do próximo rerun."
+                )
+                records = profiler().records(st.session_state.session_token)
+                if not records:
+                    st.caption("Nenhum rerun medido nesta sessão.")
+                    return
+                durations = sorted(record.duration for record in records)
+                st.caption(
+                    f"{len(records)} reruns · mediana {durations[len(durations) // 2] * 1000:.0f} ms · "
+                    f"máximo {durations[-1] * 1000:.0f} ms · arquivos em {PROFILE_DIR}"
+                )
+                st.markdown("**Reruns mais lentos**")
+                st.table([
+                    {
+                        'rerun': record.rerun_id,
+                        'página': record.label,
+                        'saída': self.RERUN_EXITS.get(record.exit, record.exit),
+                        'ms': round(record.duration * 1000),
+                        'chamada mais lenta': next(
+                            (f"{top['name']} ({top['seconds'] * 1000:.0f} ms)" for top in record.top_spans(1)), "—"
+                        ),
+                    }
+                    for record in profiler().slowest(5, st.session_state.session_token)
+                ])
+                st.markdown("**Tempo por chamada**")
+                st.table([
+                    {'chamada': total['name'], 'vezes': total['calls'], 'total (ms)': round(total['seconds'] * 1000), 'média (ms)': round(total['mean'] * 1000)}
+                    for total in profiler().span_totals(st.session_state.session_token)[:10]
+                ])
+                st.download_button(
+                    "Baixar pilhas (.folded)",
+                    data=profiler().folded(st.session_state.session_token),
+                    file_name="tubetalk.folded",
+                    help="Formato colapsado: abra com flamegraph.pl, speedscope ou inferno.",
+                    key='profiling_download'
+                )
 
     def get_default_model(self, provider: str) -> str:
         defaults = {
@@ -91,6 +377,7 @@ class UI:
         }
         return defaults.get(provider, '')
 
+    @profiled
     def render_settings(self):
         with st.sidebar:
             st.markdown("### ⚙️ LLM Configuration")
@@ -133,16 +420,112 @@ class UI:
                     st.warning(f"⚠️ {validation['error']}")
             else:
                 st.info("ℹ️ Ollama não requer chave de API (local).")
+                if OLLAMA_PRELOAD:
+                    model = st.session_state.llm_model or LLMService.DEFAULT_MODELS['ollama']
+                    warmup = warm_ollama(model)
+                    if warmup['success']:
+                        st.caption(f"🔥 Modelo carregado ({warmup['load_seconds']:.1f}s)")
+                    elif warmup['success'] is None:
+                        st.caption("⏳ Carregando modelo...")
+                    else:
+                        st.caption(f"⚠️ {warmup['error']}")
+                        # a falha não fica em cache: o próximo rerun tenta carregar de novo
+                        warm_ollama.clear(model)
 
             st.markdown("---")
             st.markdown("### 🎛️ Parâmetros Avançados")
             st.slider("Temperature", min_value=0.0, max_value=1.0, value=st.session_state.llm_temperature, step=0.1, key='llm_temperature')
-            st.slider("Max Tokens", min_value=100, max_value=1000, value=st.session_state.llm_max_tokens, step=100, key='llm_max_tokens')
+            st.slider("Max Tokens", min_value=100, max_value=4000, value=st.session_state.llm_max_tokens, step=100, key='llm_max_tokens')
 
             st.markdown("---")
             st.info("💡 Teste sua configuração de LLM antes de analisar vídeos.")
             st.button("Test LLM", on_click=self._test_llm)
 
+    @profiled
+    def render_library(self):
+        with st.sidebar:
+            st.markdown("---")
+            st.markdown("### 📚 Biblioteca")
+            query = st.text_input("Buscar em vídeos analisados", key='library_query', placeholder='palavras ou "frase exata"')
+            with st.expander("Filtros"):
+                channels = library().channels()
+                channel = st.selectbox("Canal", options=[''] + channels, key='library_channel')
+                tag = st.text_input("Tag", key='library_tag')
+                date_from = st.date_input("Publicado a partir de", value=None, key='library_date_from')
+                date_to = st.date_input("Publicado até", value=None, key='library_date_to')
+
+            self.render_export()
+
+            if not query:
+                return
+            found = library().search(query, channel=channel or None, tag=tag or None, date_from=date_from, date_to=date_to)
+            if not found['success']:
+                st.error(found['error'])
+                return
+            if not found['results']:
+                st.caption("Nenhum resultado.")
+            for result in found['results']:
+                video_id = result['video_id']
+                st.markdown(f"**[{result['title']}](https://www.youtube.com/watch?v={video_id})** · {result.get('channel') or ''}")
+                st.caption(result['snippet'])
+                for hit in result['hits']:
+                    start = int(hit['start'])
+                    st.markdown(f"- [{YouTubeService.format_duration(start) if start else '0:00'}](https://youtu.be/{video_id}?t={start}) {hit['text']}")
+
+    @profiled
+    def render_queue(self):
+        """Fila de análises em segundo plano, processada pelos workers de qualquer réplica"""
+        with st.sidebar:
+            with st.expander("🗂️ Fila de análises"):
+                backend = shared_backend()
+                try:
+                    pending = backend.pending(ANALYSIS_QUEUE)
+                except BackendError as e:
+                    st.error(f"Backend compartilhado indisponível: {e}")
+                    return
+                st.caption(f"{backend.describe()} · {pending['queued']} na fila, {pending['running']} em andamento")
+                url = st.text_input("Vídeo, playlist ou canal", key='queue_url', placeholder="https://www.youtube.com/playlist?list=...")
+                if st.button("Enfileirar", key='queue_add', use_container_width=True) and url.strip():
+                    with st.spinner("Enfileirando..."):
+                        queued = enqueue_analysis(
+                            url.strip(),
+                            st.session_state.llm_provider,
+                            st.session_state.llm_model or None,
+                            st.session_state.llm_temperature,
+                            st.session_state.llm_max_tokens,
+                            backend=backend
+                        )
+                    if queued['success']:
+                        st.success(f"{queued['queued']} vídeos enfileirados ({queued['pending']} já estavam na fila)")
+                    else:
+                        st.error(queued['error'])
+                st.caption("Processada por `python -m services.worker run`, com as chaves de API do ambiente do worker.")
+
+    def render_export(self):
+        with st.expander("⬇️ Exportar análises"):
+            archive = durable_results()
+            st.caption(f"{len(archive)} análises gravadas")
+            export_format = st.selectbox("Formato", options=['JSONL', 'Markdown (ZIP)', 'Parquet'], key='export_format')
+            if st.button("Gerar exportação", key='export_run', use_container_width=True):
+                extension, export = {
+                    'JSONL': ('jsonl', archive.export_jsonl),
+                    'Markdown (ZIP)': ('zip', archive.export_markdown),
+                    'Parquet': ('parquet', archive.export_parquet),
+                }[export_format]
+                EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+                path = EXPORT_DIR / f"tubetalk_{datetime.now():%Y%m%d_%H%M%S}.{extension}"
+                try:
+                    count = export(path)
+                    st.session_state.export_path = str(path)
+                    st.success(f"{count} análises exportadas para {path}")
+                except ImportError as e:
+                    st.error(str(e))
+
+            export_path = st.session_state.get('export_path')
+            if export_path and Path(export_path).exists():
+                with open(export_path, 'rb') as exported:
+                    st.download_button("Baixar arquivo", data=exported, file_name=Path(export_path).name, key='export_download')
+
     def _test_llm(self):
         try:
             llm = LLMService(provider=st.session_state.llm_provider, model_name=st.session_state.llm_model or None, api_key=st.session_state.llm_api_key or None)
@@ -176,61 +559,249 @@ class UI:
             with st.sidebar:
                 st.error(f"Falha ao testar LLM: {e}")
 
-    def extract_transcript(self, url: str):
+    def build_llm_service(self, deadline: Deadline = None, priority: str = 'analysis') -> LLMService:
+        return LLMService(
+            provider=st.session_state.llm_provider,
+            model_name=st.session_state.llm_model or None,
+            api_key=st.session_state.llm_api_key or None,
+            temperature=st.session_state.llm_temperature,
+            max_tokens=st.session_state.llm_max_tokens,
+            deadline=deadline,
+            priority=priority,
+            tenant=st.session_state.session_token
+        )
+
+    @profiled
+    def analyze_url(self, url: str):
+        """Busca, analisa e guarda um vídeo dentro do prazo de uma requisição"""
+        deadline = Deadline(REQUEST_DEADLINE_SECONDS)
+        st.session_state.active_deadline = deadline
+        video_id = YouTubeService.extract_video_id(url)
+        try:
+            with ExitStack() as flight:
+                if video_id:
+                    # outra sessão ou réplica analisando o mesmo vídeo: espera e reaproveita o resultado
+                    with st.spinner("⏳ Este vídeo já está sendo analisado em outra sessão..."):
+                        flight.enter_context(shared_backend().single_flight(self.analysis_key(video_id), deadline=deadline))
+                self._analyze_url(url, video_id, deadline)
+        finally:
+            # um rerun (clique em outro botão, saída da página) interrompe o script aqui;
+            # o cancelamento faz as chamadas ainda em andamento desistirem
+            deadline.cancel()
+            st.session_state.active_deadline = None
+
+    def _analyze_url(self, url: str, video_id: str, deadline: Deadline):
+        """Corpo de `analyze_url`, já com a trava da análise (ou sem ela, se a espera acabou)"""
+        llm_service = None
+        if self.cached_analysis(video_id) is None:
+            try:
+                llm_service = self.build_llm_service(deadline)
+            except Exception:
+                llm_service = None  # analyze_with_llm mostra o erro de configuração
+        # com a análise pronta, a transcrição não é carregada: chat e índices leem trechos do arquivo
+        video_data = self.extract_transcript(
+            url, llm_service, deadline.child(FETCH_DEADLINE_SHARE), include_transcript=llm_service is not None
+        )
+        if not video_data:
+            return
+
+        analysis, duplicate = self.find_reusable_analysis(video_data)
+        if analysis is None:
+            video_data = self.load_transcript(url, video_data)
+            if video_data is None:
+                return
+        # com a análise pronta, só usa uma tradução já guardada (para o chat)
+        video_data = self.translate_transcript(video_data, llm_service if analysis is None else None)
+        if video_data is None:
+            return
+        if analysis is None:
+            analysis = self.analyze_with_llm(video_data['transcript'], video_data, llm_service)
+            if analysis:
+                stored = durable_results().put(video_data, analysis, *self.analysis_identity())
+                if not stored['success']:
+                    st.warning(f"⚠️ {stored['error']}")
+                share_analysis(self.analysis_key(video_data['video_id']), analysis)
+        video_data.pop('chapter_segments', None)
+        if not analysis:
+            return
+
+        video_data = self.release_transcript(video_data)
+        self.index_video(video_data, analysis)
+        vid = video_data['video_id']
+        store = results_store()
+        store.put(f"video:{vid}", video_data)
+        st.session_state.analysis_key = self.analysis_key(vid)
+        store.put(st.session_state.analysis_key, analysis)
+        self.hold_results(vid)
+        st.session_state.video_data = {field: video_data.get(field) for field in self.VIDEO_VIEW_FIELDS}
+        st.session_state.analysis_reused_from = duplicate
+        st.session_state.submitted = True
+        st.session_state.analysis_complete = True
+        st.rerun()
+
+    @profiled
+    def extract_transcript(
+        self,
+        url: str,
+        llm_service: LLMService = None,
+        deadline: Deadline = None,
+        include_transcript: bool = True
+        ):
         with st.spinner("🎬 Extraindo transcrição..."):
-            service = YouTubeService()
-            video_data = service.get_complete_data(url)
+            service = YouTubeService(deadline=deadline)
+            if llm_service is not None:
+                # vídeos longos: o map das partes começa enquanto a transcrição ainda chega;
+                # em caso de falha, get_complete_data abaixo refaz a busca e reporta o erro
+                def chunks():
+                    for chunk in service.stream_transcript(url):
+                        # notas no idioma original seriam descartadas após a tradução: só baixa
+                        if not translations().needs_translation(chunk['language']):
+                            yield chunk['text']
+
+                streamed = llm_service.condense_stream(chunks(), llm_service.template('summary'))
+                if streamed['parts']:
+                    st.caption(f"Transcrição longa: {streamed['parts']} partes condensadas durante o download")
+            video_data = service.get_complete_data(url, include_transcript=include_transcript)
 
             if not video_data['success']:
                 st.error(f"❌ {video_data['error']}")
                 return None
 
-            st.session_state.video_data = video_data
             return video_data
 
-    def analyze_with_llm(self, transcript: str, video_data: dict = None):
-        try:
-            with st.spinner(f"🤖 Gerando com: {st.session_state.llm_provider.upper()}..."):
-                llm_service = LLMService(
-                    provider=st.session_state.llm_provider,
-                    model_name=st.session_state.llm_model or None,
-                    api_key=st.session_state.llm_api_key or None,
-                    temperature=st.session_state.llm_temperature,
-                    max_tokens=st.session_state.llm_max_tokens
-                )
+    def open_transcript_file(self, video_data: dict):
+        """
+        Transcrição usada na análise (a tradução, se houver) aberta para leitura parcial
+
+        Returns:
+            TranscriptFile (quem chamou fecha), ou None se não houver arquivo em disco
+        """
+        video_id = video_data.get('video_id')
+        language = video_data.get('analysis_language')
+        if language:
+            handle = translations().open(video_id, video_data.get('transcript_hash'), language)
+            if handle is not None:
+                return handle
+        return YouTubeService().open_track(
+            video_id, video_data.get('transcript_language'), video_data.get('transcript_is_generated')
+        )
+
+    def load_transcript(self, url: str, video_data: dict):
+        """Completa video_data com a transcrição inteira, necessária para analisar"""
+        if video_data.get('transcript') is not None:
+            return video_data
+        handle = YouTubeService().open_track(
+            video_data['video_id'], video_data.get('transcript_language'), video_data.get('transcript_is_generated')
+        )
+        if handle is None:
+            return self.extract_transcript(url)  # o arquivo sumiu: busca de novo
+        with handle:
+            data = handle.to_dict()
+        return {**video_data, 'transcript': data['transcript'], 'transcript_segments': data['segments']}
+
+    def release_transcript(self, video_data: dict) -> dict:
+        """video_data sem a transcrição inteira, se ela puder ser relida do disco"""
+        handle = self.open_transcript_file(video_data)
+        if handle is None:
+            return video_data
+        handle.close()
+        return {key: value for key, value in video_data.items() if key not in self.TRANSCRIPT_FIELDS}
 
-                summary_result = llm_service.generate_summary(
-                    transcript=transcript,
-                    prompt_template=SUMMARY_PROMPT_TEMPLATE
-                )
+    @profiled
+    def translate_transcript(self, video_data: dict, llm_service: LLMService = None):
+        """
+        Troca a transcrição pela versão no idioma da análise, traduzida uma única vez
 
-                if not summary_result['success']:
-                    st.error(f"❌ Summary generation failed: {summary_result['error']}")
-                    return None
+        Resumo, tópicos, artigo e chat passam a usar o texto traduzido; os
+        capítulos continuam detectados nos segmentos originais (mais finos).
 
-                topics_result = llm_service.extract_topics(
-                    transcript=transcript,
-                    prompt_template=TOPICS_PROMPT_TEMPLATE
-                )
+        Args:
+            video_data: Dados de `get_complete_data`
+            llm_service: Serviço para traduzir (None = só usa uma tradução guardada)
 
-                if not topics_result['success']:
-                    st.error(f"❌ Topics extraction failed: {topics_result['error']}")
-                    return None
+        Returns:
+            video_data (com a tradução, se houver), ou None se a tradução falhou
+        """
+        if not translations().needs_translation(video_data.get('transcript_language')):
+            return video_data
+        if video_data.get('transcript') is None:
+            # análise reaproveitada: basta saber se há tradução guardada, que o chat lê do arquivo
+            handle = translations().open(video_data['video_id'], video_data.get('transcript_hash'))
+            if handle is not None:
+                handle.close()
+                return {**video_data, 'analysis_language': translations().target_language}
+            cached = translations().cached(video_data['video_id'], video_data.get('transcript_hash'))
+            return video_data if cached is None else {**video_data, 'analysis_language': cached['language']}
+        with st.spinner("🌐 Traduzindo transcrição..."):
+            result = translations().translate(video_data, llm_service)
+        if not result['success']:
+            if llm_service is None:
+                return video_data  # sem tradução guardada: o chat usa o original
+            st.error(f"❌ {result['error']}")
+            return None
+        if not result['cached']:
+            st.caption(
+                f"🌐 Transcrição em {result['source_language']} traduzida para {result['language']} "
+                f"({result['parts']} partes)"
+            )
+        return {
+            **video_data,
+            'transcript': result['transcript'],
+            'transcript_segments': result['segments'],
+            'chapter_segments': video_data.get('transcript_segments'),
+            'analysis_language': result['language'],
+        }
 
-                article_result = llm_service.generate_article(
-                    transcript=transcript,
-                    prompt_template=ARTICLE_PROMPT_TEMPLATE,
-                    length='long'
+    @profiled
+    def find_reusable_analysis(self, video_data: dict):
+        """Retorna (análise, duplicata) já gerada para o vídeo ou para um quase duplicado"""
+        cached = self.cached_analysis(video_data.get('video_id'), video_data.get('transcript_hash'))
+        if cached is not None:
+            return cached, None
+        for duplicate in video_data.get('near_duplicates') or []:
+            cached = self.cached_analysis(duplicate['video_id'])
+            if cached is not None:
+                return cached, duplicate
+        return None, None
+
+    @profiled
+    def index_video(self, video_data: dict, analysis: dict):
+        # os índices percorrem os segmentos do arquivo, um bloco por vez
+        handle = self.open_transcript_file(video_data)
+        try:
+            library().add_video(video_data, analysis, segments=handle.iter_segments() if handle else None)
+            try:
+                with st.spinner("📚 Indexando trechos para perguntas entre vídeos..."):
+                    result = corpus().add_video(video_data, segments=handle.iter_segments() if handle else None)
+                if not result['success']:
+                    st.warning(f"⚠️ {result['error']}")
+            except Exception as e:
+                st.warning(f"⚠️ Índice entre vídeos indisponível: {e}")
+        finally:
+            if handle is not None:
+                handle.close()
+
+    @profiled
+    def analyze_with_llm(self, transcript: str, video_data: dict = None, llm_service: LLMService = None):
+        try:
+            with st.spinner(f"🤖 Gerando com: {st.session_state.llm_provider.upper()}..."):
+                llm_service = llm_service or self.build_llm_service()
+                video_data = video_data or {}
+                # capítulos candidatos a partir dos segmentos originais em disco, um bloco por vez
+                handle = YouTubeService().open_track(
+                    video_data.get('video_id'), video_data.get('transcript_language'), video_data.get('transcript_is_generated')
                 )
-                if not article_result['success']:
-                    st.error(f"❌ Article generation failed: {article_result['error']}")
-                    return None
-
-                return {
-                    'summary': summary_result['summary'],
-                    'topics': topics_result['topics'],
-                    'article': article_result['article']
-                }
+                try:
+                    if handle is not None:
+                        video_data = {**video_data, 'chapter_segments': handle.iter_segments()}
+                    result = run_analysis(transcript, video_data, llm_service)
+                finally:
+                    if handle is not None:
+                        handle.close()
+            if not result['success']:
+                st.error(f"❌ {result['error']}")
+                return None
+            return result['analysis']
 
         except Exception as e:
             st.error(f"❌ Falha ao analisar: {str(e)}")
@@ -272,176 +843,124 @@ class UI:
         st.markdown("<h2 class='video-section'>📰 Artigo Gerado</h2>", unsafe_allow_html=True)
         st.markdown(analysis['article'])
 
-    def run(self):
-        st.markdown("""
-            <div class="header-area">
-                <h1>TubeTalk</h1>
-                <h2>🤖 Your personal YouTube assistant</h2>
-                <p>Analyze YouTube videos with AI-powered insights!</p>
-            </div>
-        """, unsafe_allow_html=True)
-
-        st.markdown("<p style='text-align: center; margin-top: 0.5rem;'>Developed by <a href='https://www.linkedin.com/in/wellington-moreira-santos' target='_blank'>Wellington M Santos</a></p>", unsafe_allow_html=True)
-
-        st.markdown("---")
-
-        self.render_settings()
-
-        if not st.session_state.submitted:
-            st.markdown("<p style='font-size: 1.5rem; font-weight: bold; text-align: center;'>Insira uma URL de vídeo do YouTube para começar:</p>", unsafe_allow_html=True)
-            col1, col2, col3 = st.columns([1, 3, 1])
-            with col2:
-                st.text_input(
-                    "",
-                    key="video_url",
-                    placeholder="https://www.youtube.com/watch?v=example",
-                    label_visibility="collapsed",
-                    max_chars=200,
-                    help="Insira uma URL de vídeo do YouTube válida."
-                )
-
-                if st.button("🔍 Analisar Vídeo", use_container_width=True):
-                    url = st.session_state.video_url.strip()
-                    if url:
-                        video_data = self.extract_transcript(url)
+    @profiled
+    def render_results(self, video_data: dict, analysis: dict):
+        """
+        Resultados do vídeo: metadados e abas
+
+        Tópicos e chat são fragmentos: interagir com eles (trocar de capítulo,
+        enviar uma pergunta) reexecuta só o fragmento, não a página inteira.
+        """
+        st.markdown(f"### {video_data.get('title', '')}")
+        col_thumb, col_meta = st.columns([2, 1])
+        with col_thumb:
+            if video_data.get('thumbnail_url'):
+                st.image(video_data['thumbnail_url'], use_container_width=True)
+        with col_meta:
+            st.write(f"**Canal:** {video_data.get('channel', '')}")
+            st.write(f"**Autor:** {video_data.get('author', '')}")
+            st.write(f"**Publicado:** {video_data.get('publish_date', '')}")
+            # contadores com validade curta, atualizados em segundo plano: o rerun mostra os últimos conhecidos
+            stats = YouTubeService().stats_in_background([video_data['video_id']]).get(video_data['video_id'], {})
+            st.write(f"**Views:** {stats.get('views', video_data.get('views', 'N/A'))}")
+            st.write(f"**Likes:** {stats.get('likes', video_data.get('likes', 'N/A'))}")
+            if isinstance(video_data.get('duration'), int):
+                st.write(f"**Duração:** {duration_text(video_data['duration'])}")
+            usage = analysis.get('usage')
+            if usage:
+                st.caption(usage_text(usage))
+
+        duplicate = st.session_state.analysis_reused_from
+        if duplicate:
+            st.info(
+                f"♻️ Conteúdo quase idêntico ao vídeo `{duplicate['video_id']}` "
+                f"(similaridade {duplicate['similarity']:.0%}); análise reaproveitada."
+            )
 
-                        if video_data:
-                            analysis = self.analyze_with_llm(video_data['transcript'], video_data)
+        tab_summary, tab_topics, tab_article, tab_chat = st.tabs(["Summary", "Topics", "Article", "Chat"])
+
+        # downloads não precisam de rerun: o arquivo já está na página
+        with tab_summary:
+            st.markdown(summary_html(analysis['summary']), unsafe_allow_html=True)
+            st.download_button("Download Summary (.txt)", analysis['summary'], file_name="summary.txt", on_click='ignore')
+
+        with tab_topics:
+            self.render_topics(video_data['video_id'], analysis['topics'], analysis.get('chapters'))
+
+        with tab_article:
+            st.markdown(analysis.get('article'), unsafe_allow_html=True)
+            st.download_button("Download Article (.md)", analysis.get('article'), file_name="article.md", on_click='ignore')
+
+        with tab_chat:
+            self.render_chat(video_data, analysis)
+
+    @st.fragment
+    def render_topics(self, video_id: str, topics: str, chapters: list = None):
+        with profile_rerun(fragment='topics'):
+            if chapters:
+                labels = chapter_labels(chapters)
+                selected = st.selectbox("Ir para o capítulo", options=range(len(chapters)), format_func=lambda i: labels[i], key=f"chapter_{video_id}")
+                st.video(f"https://www.youtube.com/watch?v={video_id}", start_time=int(chapters[selected]['start']))
+            st.markdown(topics)
+            st.download_button("Download Topics (.txt)", topics, file_name="topics.txt", on_click='ignore')
+
+    @st.fragment
+    def render_chat(self, video_data: dict, analysis: dict):
+        with profile_rerun(fragment='chat'):
+            vid = video_data.get('video_id')
+            session_key = f'chat_session_{vid}'
+            chat_session = st.session_state.get(session_key)
+
+            st.markdown("#### Chat with the video (context-aware)")
+            st.info("You can ask questions about the video's title, description, tags, summary and transcript.")
+            corpus_mode = st.toggle(
+                "Perguntar a todos os vídeos analisados",
+                key=f'corpus_mode_{vid}',
+                help="Responde com trechos de qualquer vídeo já analisado, com citações."
+            )
 
-                            if analysis:
-                                st.session_state.video_data = video_data
-                                st.session_state.analysis = analysis
-                                st.session_state.submitted = True
-                                st.session_state.analysis_complete = True
-                                st.rerun()
+            # o histórico fica acima do formulário, mas é preenchido depois de tratar o envio
+            history_box = st.container()
+            with st.form(key=f'chat_form_{vid}', clear_on_submit=True, border=False):
+                question = st.text_input("Ask a question about this video:", key=f'chat_input_{vid}')
+                send = st.form_submit_button("Send")
+
+            if send and question:
+                llm = self.build_llm_service(priority='chat')
+                # só o fragmento reexecuta: renova aqui a reserva dos resultados
+                self.hold_results(vid)
+
+                if chat_session is None:
+                    # criada só na primeira pergunta; guarda o contexto, não a transcrição
+                    full_video = results_store().get(f"video:{vid}") or video_data
+                    # só o início da transcrição cabe no contexto: lido do arquivo, sem carregar o resto
+                    handle = None if full_video.get('transcript') else self.open_transcript_file(full_video)
+                    try:
+                        chat_session = ChatSession(full_video, analysis, transcript_file=handle)
+                        chat_session.context(llm)
+                    finally:
+                        if handle is not None:
+                            handle.close()
+                    st.session_state[session_key] = chat_session
+
+                with st.spinner("Asking LLM..."):
+                    if corpus_mode:
+                        res = corpus().answer(question, llm)
+                        if res['success']:
+                            sources = "\n".join(
+                                f"- [{c['number']}] [{c['title']}]({c['url']})" for c in res['citations']
+                            )
+                            answer = f"{res['answer']}\n\n{sources}" if sources else res['answer']
+                            chat_session.history.append(('user', question))
+                            chat_session.history.append(('assistant', answer))
                     else:
-                        st.error("❌ Please enter a valid YouTube video URL.")
-        else:
-            if st.session_state.analysis_complete and st.session_state.video_data:
-                video_data = st.session_state.video_data
-                analysis = st.session_state.analysis
-
-                st.markdown(f"### {video_data.get('title', '')}")
-                col_thumb, col_meta = st.columns([2, 1])
-                with col_thumb:
-                    if video_data.get('thumbnail_url'):
-                        st.image(video_data['thumbnail_url'], use_container_width=False, width='content')
-                with col_meta:
-                    st.write(f"**Canal:** {video_data.get('channel', '')}")
-                    st.write(f"**Autor:** {video_data.get('author', '')}")
-                    st.write(f"**Publicado:** {video_data.get('publish_date', '')}")
-                    st.write(f"**Views:** {video_data.get('views', 'N/A')}")
-                    duracao = video_data.get('duration', 'N/A')
-                    if isinstance(duracao, int):
-                        minutes, seconds = divmod(duracao, 60)
-                        hours, minutes = divmod(minutes, 60)
-                        formatted_duration = f"{hours}h {minutes}m {seconds}s" if hours else f"{minutes}m {seconds}s"
-                        st.write(f"**Duração:** {formatted_duration}")
-                    tags = video_data.get('keywords', 'N/A')
-
-                tab_summary, tab_topics, tab_article, tab_chat = st.tabs(["Summary", "Topics", "Article", "Chat"])
-
-                with tab_summary:
-                    st.markdown("<div class='summary-box'>" + analysis['summary'].replace(chr(10), '<br>') + "</div>", unsafe_allow_html=True)
-                    st.download_button("Download Summary (.txt)", analysis['summary'], file_name="summary.txt")
-
-                with tab_topics:
-                    st.markdown(analysis['topics'])
-                    st.download_button("Download Topics (.txt)", analysis['topics'], file_name="topics.txt")
-
-                with tab_article:
-                    current_article = None
-                    if st.session_state.get('analysis') and st.session_state.analysis.get('article'):
-                        current_article = st.session_state.analysis.get('article')
-                    else:
-                        current_article = analysis.get('article')
-                    article_container = st.container()
-                    article_container.empty()
-                    article_container.markdown(current_article, unsafe_allow_html=True)
-                    st.download_button("Download Article (.md)", current_article, file_name="article.md")
-
-                with tab_chat:
-                    vid = video_data.get('video_id')
-                    chat_key = f'chat_history_{vid}'
-                    if chat_key not in st.session_state:
-                        st.session_state[chat_key] = []
-
-                    st.markdown("#### Chat with the video (context-aware)")
-                    st.info("You can ask questions about the video's title, description, tags, summary and transcript.")
-
-                    for role, txt in st.session_state[chat_key]:
-                        if role == 'user':
-                            st.markdown(f"**You:** {txt}")
-                        else:
-                            st.markdown(f"**LLM:** {txt}")
-
-                    input_key = f'chat_input_{vid}'
-                    clear_key = f'clear_chat_{vid}'
-                    default_val = None
-                    if clear_key in st.session_state:
-                        if input_key in st.session_state:
-                            try:
-                                del st.session_state[input_key]
-                            except Exception:
-                                pass
-                        default_val = ''
-                        try:
-                            del st.session_state[clear_key]
-                        except Exception:
-                            pass
-
-                    if default_val is not None:
-                        question = st.text_input("Ask a question about this video:", value=default_val, key=input_key)
-                    else:
-                        question = st.text_input("Ask a question about this video:", key=input_key)
-
-                    if st.button("Send", key=f'chat_send_{vid}') and question:
-                        context_parts = []
-                        if video_data.get('title'):
-                            context_parts.append(f"Title: {video_data.get('title')}")
-                        if video_data.get('description'):
-                            context_parts.append(f"Description: {video_data.get('description')}")
-                        if video_data.get('keywords'):
-                            context_parts.append(f"Tags: {', '.join(video_data.get('keywords') if isinstance(video_data.get('keywords'), list) else [video_data.get('keywords')])}")
-                        if analysis.get('summary'):
-                            context_parts.append(f"Summary: {analysis.get('summary')}")
-                        transcript = video_data.get('transcript') or ''
-                        if transcript:
-                            context_parts.append(f"Transcript excerpt: {transcript[:800]}")
-
-                        context = "\n\n".join(context_parts)
-
-                        prompt = f"Context:\n{context}\n\nUser question: {question}\n\nPlease answer concisely and reference the context when applicable."
-
-                        llm = LLMService(
-                            provider=st.session_state.llm_provider,
-                            model_name=st.session_state.llm_model or None,
-                            api_key=st.session_state.llm_api_key or None,
-                            temperature=st.session_state.llm_temperature,
-                            max_tokens=st.session_state.llm_max_tokens
-                        )
+                        res = chat_session.ask(question, llm)
 
-                        with st.spinner("Asking LLM..."):
-                            res = llm.generate(prompt)
+                if not res['success']:
+                    st.error(f"LLM error: {res['error']}")
 
-                        if res and res.get('success'):
-                            answer = res.get('text')
-                            st.session_state[chat_key].append(('user', question))
-                            st.session_state[chat_key].append(('assistant', answer))
-                            st.session_state[clear_key] = True
-                            st.rerun()
-                        else:
-                            st.error(f"LLM error: {res.get('error') if res else 'Unknown error'}")
-
-                st.markdown("<br>", unsafe_allow_html=True)
-                if st.button("🔄 Analisar Outro Vídeo", use_container_width=True):
-                    self.reset()
-                    st.rerun()
-            else:
-                st.error("❌ Análise não disponível. Por favor, tente novamente.")
-                if st.button("← Voltar para a Página Inicial"):
-                    self.reset()
-                    st.rerun()
+            if chat_session and chat_session.history:
+                history_box.markdown(history_markdown(tuple(chat_session.history)))
 
     def run(self):
         """Executa a interface principal"""
@@ -462,6 +981,10 @@ class UI:
 
         
         self.render_settings()
+        self.render_library()
+        self.render_queue()
+        self.render_memory_usage()
+        self.render_profiling()
 
         if not st.session_state.submitted:
             st.markdown("<p style='font-size: 1.5rem; font-weight: bold; text-align: center;'>Insira uma URL de vídeo do YouTube para começar:</p>", unsafe_allow_html=True)
@@ -479,135 +1002,14 @@ class UI:
                 if st.button("🔍 Analisar Vídeo", use_container_width=True):
                     url = st.session_state.video_url.strip()
                     if url:
-                        video_data = self.extract_transcript(url)
-
-                        if video_data:
-                            analysis = self.analyze_with_llm(video_data['transcript'], video_data)
-
-                            if analysis:
-                                st.session_state.video_data = video_data
-                                st.session_state.analysis = analysis
-                                st.session_state.submitted = True
-                                st.session_state.analysis_complete = True
-                                st.rerun()
+                        self.analyze_url(url)
                     else:
                         st.error("❌ Please enter a valid YouTube video URL.")
         else:
-            if st.session_state.analysis_complete and st.session_state.video_data:
-                video_data = st.session_state.video_data
-                analysis = st.session_state.analysis
-
-                st.markdown(f"### {video_data.get('title', '')}")
-                col_thumb, col_meta = st.columns([2, 1])
-                with col_thumb:
-                    if video_data.get('thumbnail_url'):
-                        st.image(video_data['thumbnail_url'], use_container_width=True)
-                with col_meta:
-                    st.write(f"**Canal:** {video_data.get('channel', '')}")
-                    st.write(f"**Autor:** {video_data.get('author', '')}")
-                    st.write(f"**Publicado:** {video_data.get('publish_date', '')}")
-                    st.write(f"**Views:** {video_data.get('views', 'N/A')}")
-                    duracao = video_data.get('duration', 'N/A')
-                    if isinstance(duracao, int):
-                        minutes, seconds = divmod(duracao, 60)
-                        hours, minutes = divmod(minutes, 60)
-                        formatted_duration = f"{hours}h {minutes}m {seconds}s" if hours else f"{minutes}m {seconds}s"
-                        st.write(f"**Duração:** {formatted_duration}")
-                    tags = video_data.get('keywords', 'N/A')
-
-                tab_summary, tab_topics, tab_article, tab_chat = st.tabs(["Summary", "Topics", "Article", "Chat"])
-
-                with tab_summary:
-                    st.markdown("<div class='summary-box'>" + analysis['summary'].replace(chr(10), '<br>') + "</div>", unsafe_allow_html=True)
-                    st.download_button("Download Summary (.txt)", analysis['summary'], file_name="summary.txt")
-
-                with tab_topics:
-                    st.markdown(analysis['topics'])
-                    st.download_button("Download Topics (.txt)", analysis['topics'], file_name="topics.txt")
-
-                with tab_article:
-                    current_article = None
-                    if st.session_state.get('analysis') and st.session_state.analysis.get('article'):
-                        current_article = st.session_state.analysis.get('article')
-                    else:
-                        current_article = analysis.get('article')
-                    article_container = st.container()
-                    article_container.empty()
-                    article_container.markdown(current_article, unsafe_allow_html=True)
-                    st.download_button("Download Article (.md)", current_article, file_name="article.md")
-
-                with tab_chat:
-                    vid = video_data.get('video_id')
-                    chat_key = f'chat_history_{vid}'
-                    if chat_key not in st.session_state:
-                        st.session_state[chat_key] = []
-
-                    st.markdown("#### Chat with the video (context-aware)")
-                    st.info("You can ask questions about the video's title, description, tags, summary and transcript.")
-
-                    for role, txt in st.session_state[chat_key]:
-                        if role == 'user':
-                            st.markdown(f"**You:** {txt}")
-                        else:
-                            st.markdown(f"**LLM:** {txt}")
-
-                    input_key = f'chat_input_{vid}'
-                    clear_key = f'clear_chat_{vid}'
-                    default_val = None
-                    if clear_key in st.session_state:
-                        if input_key in st.session_state:
-                            try:
-                                del st.session_state[input_key]
-                            except Exception:
-                                pass
-                        default_val = ''
-                        try:
-                            del st.session_state[clear_key]
-                        except Exception:
-                            pass
-
-                    if default_val is not None:
-                        question = st.text_input("Ask a question about this video:", value=default_val, key=input_key)
-                    else:
-                        question = st.text_input("Ask a question about this video:", key=input_key)
-
-                    if st.button("Send", key=f'chat_send_{vid}') and question:
-                        context_parts = []
-                        if video_data.get('title'):
-                            context_parts.append(f"Title: {video_data.get('title')}")
-                        if video_data.get('description'):
-                            context_parts.append(f"Description: {video_data.get('description')}")
-                        if video_data.get('keywords'):
-                            context_parts.append(f"Tags: {', '.join(video_data.get('keywords') if isinstance(video_data.get('keywords'), list) else [video_data.get('keywords')])}")
-                        if analysis.get('summary'):
-                            context_parts.append(f"Summary: {analysis.get('summary')}")
-                        transcript = video_data.get('transcript') or ''
-                        if transcript:
-                            context_parts.append(f"Transcript excerpt: {transcript[:800]}")
-
-                        context = "\n\n".join(context_parts)
-
-                        prompt = f"Context:\n{context}\n\nUser question: {question}\n\nPlease answer concisely and reference the context when applicable."
-
-                        llm = LLMService(
-                            provider=st.session_state.llm_provider,
-                            model_name=st.session_state.llm_model or None,
-                            api_key=st.session_state.llm_api_key or None,
-                            temperature=st.session_state.llm_temperature,
-                            max_tokens=st.session_state.llm_max_tokens
-                        )
-
-                        with st.spinner("Asking LLM..."):
-                            res = llm.generate(prompt)
-
-                        if res and res.get('success'):
-                            answer = res.get('text')
-                            st.session_state[chat_key].append(('user', question))
-                            st.session_state[chat_key].append(('assistant', answer))
-                            st.session_state[clear_key] = True
-                            st.rerun()
-                        else:
-                            st.error(f"LLM error: {res.get('error') if res else 'Unknown error'}")
+            video_data = st.session_state.video_data
+            analysis = self.hold_results(video_data['video_id']) if video_data else None
+            if st.session_state.analysis_complete and analysis:
+                self.render_results(video_data, analysis)
 
                 st.markdown("<br>", unsafe_allow_html=True)
                 if st.button("🔄 Analisar Outro Vídeo", use_container_width=True):
@@ -0,0 +1,34 @@
+"""
+Backend compartilhado entre réplicas: caches, travas de execução única e fila de tarefas
+"""
+
+import os
+
+from configs.storage_config import DATA_DIR
+from configs.timeout_config import REQUEST_DEADLINE_SECONDS
+
+# vazio = SQLite local (um nó, vários processos); "redis://host:6379/0" = várias réplicas
+SHARED_BACKEND_URL = os.getenv("TUBETALK_BACKEND_URL", "")
+SHARED_DB_PATH = DATA_DIR / "shared.db"
+
+# prefixo das chaves no Redis (várias instalações podem dividir o mesmo servidor)
+BACKEND_PREFIX = os.getenv("TUBETALK_BACKEND_PREFIX", "tubetalk:")
+
+# validade das análises e traduções no cache compartilhado
+SHARED_CACHE_TTL_SECONDS = int(os.getenv("TUBETALK_SHARED_CACHE_TTL_DAYS", "7")) * 24 * 3600
+
+# uma trava vence sozinha se o dono cair; cobre o prazo inteiro de uma análise
+LOCK_TTL_SECONDS = REQUEST_DEADLINE_SECONDS + 30
+LOCK_POLL_SECONDS = 0.25
+
+# tarefa não concluída dentro do prazo volta para a fila (o worker caiu)
+JOB_LEASE_SECONDS = REQUEST_DEADLINE_SECONDS + 60
+JOB_MAX_ATTEMPTS = 3
+JOB_RESULT_TTL_SECONDS = 24 * 3600
+
+# conexão com o Redis
+REDIS_SOCKET_TIMEOUT = 10.0
+
+# fila de análises em segundo plano (vídeos, playlists e canais) e intervalo de consulta dos workers
+ANALYSIS_QUEUE = "analysis"
+WORKER_POLL_SECONDS = 2.0
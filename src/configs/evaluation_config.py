@@ -0,0 +1,24 @@
+"""
+Variantes padrão do pipeline comparadas pelo harness de avaliação (services.evaluation)
+"""
+
+# cada variante: 'name' e, opcionalmente, 'provider' ('stub' = LLM local simulado, sem rede),
+# 'model', 'max_tokens', 'temperature', 'context_window' (força condensar/cortar),
+# 'strategy' ('chunk'|'clip'), 'parallel' (etapas ao mesmo tempo), 'concurrency'
+# (vagas do escalonador próprio do stub; padrão: uma por etapa), 'stages' e
+# 'templates' (etapa -> nome registrado ou texto com {transcript})
+DEFAULT_VARIANTS = [
+    {'name': 'baseline', 'provider': 'stub', 'strategy': 'chunk', 'parallel': False},
+    {'name': 'parallel', 'provider': 'stub', 'strategy': 'chunk', 'parallel': True},
+    {'name': 'clip-2k', 'provider': 'stub', 'strategy': 'clip', 'context_window': 2048, 'parallel': True},
+    {'name': 'chunk-2k', 'provider': 'stub', 'strategy': 'chunk', 'context_window': 2048, 'parallel': True},
+]
+
+# etapas do pipeline da UI
+EVALUATION_STAGES = ('summary', 'topics', 'article')
+
+# velocidades simuladas pelo stub (tokens/s de um modelo pequeno em CPU) e fração
+# desse tempo efetivamente esperada (0 = não espera, só reporta)
+STUB_PREFILL_TPS = 400.0
+STUB_DECODE_TPS = 20.0
+STUB_TIME_SCALE = 0.01
@@ -0,0 +1,20 @@
+"""
+Validade de cada grupo de campos dos dados de um vídeo
+"""
+
+import os
+
+# contadores que mudam o tempo todo; atualizados sozinhos, por uma chamada leve em lote
+VOLATILE_FIELDS = ('views', 'likes')
+VOLATILE_TTL_SECONDS = float(os.getenv("TUBETALK_STATS_TTL_MINUTES", "15")) * 60
+
+# título, descrição, tags etc. raramente mudam
+METADATA_TTL_SECONDS = 7 * 24 * 3600
+
+# a transcrição vale por TRANSCRIPT_TTL_SECONDS (configs.storage_config); análises
+# geradas não expiram: são refeitas só quando o hash do conteúdo da transcrição muda
+
+# chave da YouTube Data API; com ela, os contadores de até 50 vídeos vêm em uma
+# única requisição. Sem ela, o yt-dlp é usado (mais lento, um vídeo por vez)
+YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+STATS_BATCH_SIZE = 50
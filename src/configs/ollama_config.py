@@ -0,0 +1,22 @@
+"""
+Configurações do provedor Ollama (inferência local)
+"""
+
+import os
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+# tempo que o modelo fica carregado após a última chamada ("30m", "-1" = para sempre);
+# sem isso o Ollama descarrega em 5 minutos e a próxima chamada paga o carregamento
+OLLAMA_KEEP_ALIVE = os.getenv("TUBETALK_OLLAMA_KEEP_ALIVE", "30m")
+
+# requisições que o servidor atende ao mesmo tempo; deve ser igual ao OLLAMA_NUM_PARALLEL
+# com que o `ollama serve` foi iniciado (a fila do TubeTalk não passa disso)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "2"))
+
+# threads de CPU por requisição (None = o Ollama decide)
+OLLAMA_NUM_THREAD = int(os.getenv("TUBETALK_OLLAMA_NUM_THREAD")) if os.getenv("TUBETALK_OLLAMA_NUM_THREAD") else None
+
+# carrega o modelo configurado em segundo plano assim que a UI abre
+OLLAMA_PRELOAD = os.getenv("TUBETALK_OLLAMA_PRELOAD", "1") not in ("0", "false", "no")
+OLLAMA_PRELOAD_TIMEOUT = 300
@@ -0,0 +1,19 @@
+"""
+Modo de profiling da interface: tempo e pilhas amostradas de cada rerun do Streamlit
+"""
+
+import os
+
+from configs.storage_config import DATA_DIR
+
+# liga o profiling para todas as sessões (também pode ser ligado na barra lateral)
+PROFILE_ENABLED = os.getenv("TUBETALK_PROFILE", "").lower() in ("1", "true", "yes")
+
+# intervalo entre amostras das pilhas (s); menor = mais detalhe e mais overhead
+PROFILE_INTERVAL_SECONDS = float(os.getenv("TUBETALK_PROFILE_INTERVAL_MS", "5")) / 1000
+
+# reruns mantidos em memória para o resumo na barra lateral
+PROFILE_KEEP = 200
+
+# tempos por rerun (reruns.jsonl) e pilhas colapsadas (*.folded) para flame graphs
+PROFILE_DIR = DATA_DIR / "profiles"
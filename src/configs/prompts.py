@@ -52,6 +52,154 @@ TÍTULO SUGERIDO (ou use o título fornecido se houver): {title}
 ARTIGO COM META DESCRIPTION:
 """
 
+CHUNK_SUMMARY_PROMPT_TEMPLATE = """Você receberá um trecho de uma transcrição longa de vídeo (parte {part} de {total}).
+
+Resuma o trecho em notas objetivas, preservando fatos, nomes, números, exemplos e a ordem em que os assuntos aparecem. Não adicione introdução nem conclusão; apenas as notas.
+
+TRECHO:
+{transcript}
+
+NOTAS:"""
+
+CHAT_PROMPT_TEMPLATE = """Você é um assistente que responde perguntas sobre um vídeo do YouTube.
+
+CONTEXTO DO VÍDEO:
+{context}
+
+RESUMO DA CONVERSA ANTERIOR:
+{conversation_summary}
+
+MENSAGENS RECENTES:
+{recent_turns}
+
+Pergunta do usuário: {question}
+
+Responda de forma concisa e faça referência ao contexto quando aplicável."""
+
+CHAT_SUMMARY_PROMPT_TEMPLATE = """Atualize o resumo de uma conversa entre um usuário e um assistente sobre um vídeo.
+
+RESUMO ATUAL:
+{summary}
+
+NOVAS MENSAGENS:
+{turns}
+
+Escreva um resumo curto (no máximo 5 frases) que preserve as perguntas feitas, as respostas dadas e quaisquer preferências ou fatos mencionados pelo usuário.
+
+RESUMO ATUALIZADO:"""
+
+CORPUS_QA_PROMPT_TEMPLATE = """Responda à pergunta usando apenas os trechos de vídeos abaixo.
+
+Regras:
+- Cite as fontes com o número do trecho entre colchetes, por exemplo [1] ou [2][3].
+- Se os trechos não contiverem a resposta, diga que não encontrou a informação nos vídeos analisados.
+- Seja conciso.
+
+TRECHOS:
+{context}
+
+PERGUNTA: {question}
+
+RESPOSTA:"""
+
+CHAPTER_TITLES_PROMPT_TEMPLATE = """Abaixo estão os trechos iniciais dos capítulos de um vídeo, numerados na ordem em que aparecem.
+
+Para cada capítulo, escreva uma linha no formato:
+N. Título curto: Uma frase que resume o capítulo.
+
+Use títulos de 2 a 5 palavras e descrições de no máximo 20 palavras. Não inclua nada além da lista.
+
+CAPÍTULOS:
+{chapters}
+
+LISTA:"""
+
+ARTICLE_DEFAULT_PROMPT_TEMPLATE = """Escreva um artigo bem estruturado com base na transcrição abaixo. Inclua uma introdução, subtítulos quando apropriado e uma conclusão. Use um tom informativo e claro.
+
+Transcrição:
+{transcript}
+
+"""
+
+# instruções que `LLMService.generate_article` põe antes do template do artigo
+ARTICLE_HEADER_PROMPT_TEMPLATE = """{length_hint}
+
+"""
+
+ARTICLE_TITLED_HEADER_PROMPT_TEMPLATE = """Escreva um artigo em português pt-BR intitulado '{title}'. {length_hint}
+
+"""
+
+ARTICLE_LENGTH_HINTS = {
+    'short': 'Escreva um artigo curto, aproximando-se de 150-300 palavras.',
+    'medium': 'Escreva um artigo de média extensão, aproximando-se de 400-700 palavras.',
+    'long': 'Escreva um artigo longo e detalhado, aproximando-se de 800-1200 palavras.',
+}
+
+# variantes curtas para modelos locais com janela pequena (ex.: phi3 com 4k tokens)
+SHORT_SUMMARY_PROMPT_TEMPLATE = """Resuma em um parágrafo de 2-4 frases, em tom neutro, sobre o que trata o vídeo.
+
+Transcrição:
+{transcript}
+
+Resumo:"""
+
+SHORT_TOPICS_PROMPT_TEMPLATE = """Liste os 3 a 5 tópicos mais importantes da transcrição, um por linha, no formato "- Título curto: descrição de até 20 palavras". Apenas a lista.
+
+TRANSCRIÇÃO:
+{transcript}
+
+TÓPICOS:
+"""
+
+SHORT_CHUNK_SUMMARY_PROMPT_TEMPLATE = """Trecho {part} de {total} de uma transcrição. Resuma em notas objetivas, mantendo fatos, nomes, números e a ordem dos assuntos.
+
+TRECHO:
+{transcript}
+
+NOTAS:"""
+
+TRANSLATE_PROMPT_TEMPLATE = """Traduza o trecho de transcrição abaixo de {source_language} para {target_language}.
+
+- Traduza o trecho inteiro, sem resumir, omitir ou acrescentar informações.
+- Mantenha nomes próprios, números e termos técnicos consagrados.
+- Responda apenas com a tradução.
+
+TRECHO:
+{transcript}
+
+TRADUÇÃO:"""
+
+# nome -> (template, campos obrigatórios); validados e compilados por `services.prompt_registry`
+PROMPT_TEMPLATES = {
+    'summary': (SUMMARY_PROMPT_TEMPLATE, ('transcript',)),
+    'topics': (TOPICS_PROMPT_TEMPLATE, ('transcript',)),
+    'article': (ARTICLE_PROMPT_TEMPLATE, ('transcript', 'title')),
+    'article_default': (ARTICLE_DEFAULT_PROMPT_TEMPLATE, ('transcript',)),
+    'article_header': (ARTICLE_HEADER_PROMPT_TEMPLATE, ('length_hint',)),
+    'article_header_titled': (ARTICLE_TITLED_HEADER_PROMPT_TEMPLATE, ('title', 'length_hint')),
+    'chunk_summary': (CHUNK_SUMMARY_PROMPT_TEMPLATE, ('part', 'total', 'transcript')),
+    'chat': (CHAT_PROMPT_TEMPLATE, ('context', 'conversation_summary', 'recent_turns', 'question')),
+    'chat_summary': (CHAT_SUMMARY_PROMPT_TEMPLATE, ('summary', 'turns')),
+    'corpus_qa': (CORPUS_QA_PROMPT_TEMPLATE, ('context', 'question')),
+    'chapter_titles': (CHAPTER_TITLES_PROMPT_TEMPLATE, ('chapters',)),
+    'translate': (TRANSLATE_PROMPT_TEMPLATE, ('source_language', 'target_language', 'transcript')),
+}
+
+# provedor -> {nome: template}; nomes ausentes usam o template padrão
+PROMPT_VARIANTS = {
+    'ollama': {
+        'summary': SHORT_SUMMARY_PROMPT_TEMPLATE,
+        'topics': SHORT_TOPICS_PROMPT_TEMPLATE,
+        'chunk_summary': SHORT_CHUNK_SUMMARY_PROMPT_TEMPLATE,
+    },
+    'huggingface': {
+        'summary': SHORT_SUMMARY_PROMPT_TEMPLATE,
+        'topics': SHORT_TOPICS_PROMPT_TEMPLATE,
+        'chunk_summary': SHORT_CHUNK_SUMMARY_PROMPT_TEMPLATE,
+    },
+}
+
 # default config
 DEFAULT_GENERATION_CONFIG = {
     "temperature": 0.7,
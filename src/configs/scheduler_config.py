@@ -0,0 +1,26 @@
+"""
+Configurações da fila de chamadas aos provedores de LLM
+"""
+
+from configs.ollama_config import OLLAMA_NUM_PARALLEL
+
+# chamadas simultâneas por provedor (quota da API ou capacidade da máquina local)
+PROVIDER_CONCURRENCY = {
+    'openai': 8,
+    'groq': 4,
+    'ollama': OLLAMA_NUM_PARALLEL,
+    'huggingface': 2,
+}
+
+# vagas de cada provedor que o processamento em lote nunca ocupa
+INTERACTIVE_RESERVE = 1
+
+# espera máxima desejada na fila (s) das classes interativas; lotes são adiados
+# quando a espera recente passa da metade desse valor
+LATENCY_SLO_SECONDS = {
+    'chat': 2.0,
+    'analysis': 10.0,
+}
+
+# peso de cada tenant na fila justa (ausentes = 1.0)
+TENANT_WEIGHTS = {}
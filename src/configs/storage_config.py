@@ -0,0 +1,34 @@
+"""
+Configurações de armazenamento local (biblioteca, índices e caches em disco)
+"""
+
+import os
+from pathlib import Path
+
+# diretório base dos dados persistentes; sobrescreva com TUBETALK_DATA_DIR
+DATA_DIR = Path(os.getenv("TUBETALK_DATA_DIR", Path.home() / ".tubetalk"))
+
+LIBRARY_DB_PATH = DATA_DIR / "library.db"
+
+CORPUS_DIR = DATA_DIR / "corpus"
+
+EMBEDDING_CACHE_PATH = DATA_DIR / "embeddings.db"
+
+# armazenamento compartilhado de transcrições/análises entre sessões da UI
+SHARED_STORE_MAX_BYTES = int(os.getenv("TUBETALK_STORE_MAX_MB", "256")) * 1024 * 1024
+SPILL_DIR = DATA_DIR / "spill"
+# a reserva de uma sessão é renovada a cada rerun; abas fechadas a perdem em poucos minutos
+SHARED_STORE_LEASE_SECONDS = 300
+# arquivos de spill mais velhos que isso (inclusive de execuções anteriores) são apagados
+SPILL_TTL_SECONDS = 24 * 3600
+
+# resultados de análise duráveis e exportações em lote
+RESULTS_DB_PATH = DATA_DIR / "results.db"
+EXPORT_DIR = DATA_DIR / "exports"
+
+# transcrições comprimidas (zstd por bloco) que servem de cache de `get_transcript`
+TRANSCRIPT_DIR = DATA_DIR / "transcripts"
+TRANSCRIPT_TTL_SECONDS = int(os.getenv("TUBETALK_TRANSCRIPT_TTL_DAYS", "30")) * 24 * 3600
+
+# traduções das transcrições para o idioma da análise, no mesmo formato e validade
+TRANSLATION_DIR = DATA_DIR / "translations"
@@ -0,0 +1,21 @@
+"""
+Prazos e timeouts das chamadas externas (YouTube e provedores de LLM)
+"""
+
+import os
+
+# prazo total de uma análise (busca + LLM); sobrescreva com TUBETALK_REQUEST_DEADLINE
+REQUEST_DEADLINE_SECONDS = float(os.getenv("TUBETALK_REQUEST_DEADLINE", "600"))
+
+# fração do prazo reservada à busca de metadados e transcrição; o LLM fica com o restante
+FETCH_DEADLINE_SHARE = 0.3
+
+# timeout de cada conexão com o YouTube (yt-dlp e youtube_transcript_api)
+YOUTUBE_SOCKET_TIMEOUT = float(os.getenv("TUBETALK_YOUTUBE_TIMEOUT", "20"))
+
+# prazo da atualização de views/likes feita em segundo plano para a página
+STATS_DEADLINE_SECONDS = float(os.getenv("TUBETALK_STATS_DEADLINE", "30"))
+
+# timeout de cada chamada ao provedor de LLM e tentativas extras do cliente
+LLM_REQUEST_TIMEOUT = float(os.getenv("TUBETALK_LLM_TIMEOUT", "120"))
+LLM_MAX_RETRIES = 2
@@ -0,0 +1,28 @@
+"""
+Tradução da transcrição para o idioma da análise (feita uma vez por vídeo e idioma)
+"""
+
+import os
+
+# idioma em que os prompts pedem as análises; transcrições em outro idioma são traduzidas antes
+TARGET_LANGUAGE = os.getenv("TUBETALK_TARGET_LANGUAGE", "pt-BR")
+
+# tokens da tradução por token do original (pt costuma ser mais longo que en);
+# limita o tamanho de cada parte para a tradução caber em `max_tokens`
+TRANSLATION_EXPANSION = 1.3
+
+# nomes usados no prompt de tradução (código base -> nome)
+LANGUAGE_NAMES = {
+    'pt': 'português (pt-BR)',
+    'en': 'inglês',
+    'es': 'espanhol',
+    'fr': 'francês',
+    'de': 'alemão',
+    'it': 'italiano',
+    'ja': 'japonês',
+    'ko': 'coreano',
+    'zh': 'chinês',
+    'ru': 'russo',
+    'hi': 'hindi',
+    'ar': 'árabe',
+}
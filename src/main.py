@@ -1,9 +1,10 @@
 import streamlit as st
-from UI.ui import UI
+from UI.ui import UI, profile_rerun
 from configs.streamlit_config import PAGE_CONFIG
 
 st.set_page_config(**PAGE_CONFIG)
 
 if __name__ == "__main__":
-    ui = UI()
-    ui.run()
\ No newline at end of file
+    with profile_rerun():
+        ui = UI()
+        ui.run()
\ No newline at end of file
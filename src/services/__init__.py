@@ -1,4 +1,8 @@
+from .chat_service import ChatSession
+from .embedding_service import EmbeddingService
+from .library_service import LibraryService
 from .llm_service import LLMService
+from .result_store import ResultStore
 from .youtube_service import YouTubeService
 
-__all__ = ["YouTubeService", "LLMService"]
\ No newline at end of file
+__all__ = ["YouTubeService", "LLMService", "ChatSession", "LibraryService", "EmbeddingService", "ResultStore"]
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Pipeline de análise (resumo, tópicos/capítulos e artigo) usado pela interface e pelos
+workers da fila, e as chaves com que o resultado é dividido entre réplicas
+"""
+
+from typing import Dict, Optional
+
+from configs.backend_config import SHARED_CACHE_TTL_SECONDS
+from .chapter_service import format_chapters, segment_chapters
+from .llm_service import LLMService
+from .profiler import profiled
+from .prompt_registry import PROMPTS
+from .shared_backend import BackendError, SharedBackend, shared_backend
+
+# templates usados na análise; a versão deles entra na chave do resultado guardado
+ANALYSIS_PROMPTS = (
+    'summary', 'chunk_summary', 'topics', 'chapter_titles',
+    'article', 'article_header', 'article_header_titled',
+)
+
+
+def analysis_identity(provider: str, model: Optional[str] = None) -> tuple:
+    """(provedor, modelo, versão dos templates) que identificam uma análise"""
+    return provider, model or LLMService.DEFAULT_MODELS.get(provider), PROMPTS.version(ANALYSIS_PROMPTS, provider)
+
+
+def analysis_key(video_id: str, provider: str, model: str, version: str) -> str:
+    """Chave da análise nos caches (memória da UI e backend compartilhado)"""
+    return f"analysis:{video_id}:{provider}:{model}:{version}"
+
+
+def shared_analysis(
+    key: str,
+    transcript_hash: Optional[str] = None,
+    backend: Optional[SharedBackend] = None
+    ) -> Optional[Dict[str, any]]:
+    """
+    Análise publicada por alguma réplica ou worker
+
+    Args:
+        key: Chave de `analysis_key`
+        transcript_hash: Hash da transcrição atual; análise de outro conteúdo é ignorada
+        backend: Backend compartilhado (padrão: o do processo)
+
+    Returns:
+        Análise no formato de `run_analysis`, ou None (também com o backend indisponível)
+    """
+    try:
+        analysis = (backend or shared_backend()).get(key)
+    except BackendError:
+        return None
+    if analysis is not None and transcript_hash and analysis.get('transcript_hash') not in (None, transcript_hash):
+        return None
+    return analysis
+
+
+def share_analysis(key: str, analysis: Dict[str, any], backend: Optional[SharedBackend] = None) -> bool:
+    """Publica a análise para as outras réplicas; False se o backend estiver indisponível"""
+    try:
+        (backend or shared_backend()).set(key, analysis, ttl=SHARED_CACHE_TTL_SECONDS)
+        return True
+    except BackendError:
+        return False
+
+
+@profiled
+def run_analysis(transcript: str, video_data: Dict[str, any], llm_service: LLMService) -> Dict[str, any]:
+    """
+    Gera resumo, tópicos (ou capítulos) e artigo de uma transcrição
+
+    Args:
+        transcript: Transcrição (já no idioma da análise)
+        video_data: Dados do vídeo ('video_id', 'transcript_hash' e os segmentos
+            usados para detectar capítulos: 'chapter_segments' ou 'transcript_segments')
+        llm_service: Serviço configurado para a análise
+
+    Returns:
+        Dict com 'success', 'analysis' ('summary', 'topics', 'chapters', 'article',
+        'usage', 'prompt_version', 'transcript_hash') e 'error'
+
+    Raises:
+        Exception: Erros de configuração ou de chamada do LLM não tratados pelas etapas
+    """
+    # condensa (se preciso) uma única vez; as etapas abaixo reaproveitam as notas
+    for name in ('summary', 'topics', 'article'):
+        llm_service.fit_transcript(transcript, llm_service.template(name))
+
+    # capítulos locais: o LLM só dá título a trechos curtos
+    candidates = segment_chapters(video_data.get('chapter_segments') or video_data.get('transcript_segments') or [])
+
+    def topics_step():
+        if len(candidates) > 1:
+            chapters_result = llm_service.title_chapters(candidates, llm_service.template('chapter_titles'))
+            if chapters_result['success']:
+                chapters = [
+                    {key: chapter[key] for key in ('start', 'end', 'title', 'description')}
+                    for chapter in chapters_result['chapters']
+                ]
+                return {
+                    'success': True,
+                    'topics': format_chapters(chapters, video_data.get('video_id')),
+                    'chapters': chapters,
+                    'error': None,
+                }
+        return llm_service.extract_topics(
+            transcript=transcript,
+            prompt_template=llm_service.template('topics')
+        )
+
+    # etapas independentes: rodam juntas (no Ollama, em lote no servidor)
+    results = llm_service.run_parallel({
+        'summary': lambda: llm_service.generate_summary(
+            transcript=transcript,
+            prompt_template=llm_service.template('summary')
+        ),
+        'topics': topics_step,
+        'article': lambda: llm_service.generate_article(
+            transcript=transcript,
+            prompt_template=llm_service.template('article'),
+            length='long'
+        ),
+    })
+
+    failures = {
+        'summary': "Summary generation failed",
+        'topics': "Topics extraction failed",
+        'article': "Article generation failed",
+    }
+    for stage, message in failures.items():
+        if not results[stage]['success']:
+            return {'success': False, 'analysis': None, 'error': f"{message}: {results[stage]['error']}"}
+
+    return {
+        'success': True,
+        'analysis': {
+            'summary': results['summary']['summary'],
+            'topics': results['topics']['topics'],
+            'chapters': results['topics'].get('chapters'),
+            'article': results['article']['article'],
+            'usage': dict(llm_service.usage_total),
+            'prompt_version': llm_service.prompt_version(ANALYSIS_PROMPTS),
+            'transcript_hash': video_data.get('transcript_hash'),
+        },
+        'error': None,
+    }
@@ -0,0 +1,84 @@
+"""
+Cache em memória compartilhado entre sessões do processo
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Cache LRU thread-safe com expiração por tempo (TTL)"""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        """
+        Inicializa o cache
+
+        Args:
+            maxsize: Número máximo de entradas mantidas
+            ttl: Tempo de vida padrão das entradas em segundos (None = sem expiração)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retorna o valor de uma chave, ou `default` se ausente/expirada
+
+        Args:
+            key: Chave buscada
+            default: Valor retornado quando a chave não existe
+
+        Returns:
+            Valor armazenado ou `default`
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Armazena um valor, descartando a entrada menos usada se o cache estiver cheio
+
+        Args:
+            key: Chave da entrada
+            value: Valor a armazenar
+            ttl: TTL específico desta entrada (usa o padrão do cache se None)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove uma chave do cache, se existir"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
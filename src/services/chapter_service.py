@@ -0,0 +1,193 @@
+"""
+Segmentação local da transcrição em capítulos com tempo de início
+"""
+
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_STOPWORDS = set("""
+a o as os um uma uns umas de do da dos das em no na nos nas por para pra com sem que e ou
+é ser foi são era está estão isso isto esse essa este esta aqui ali lá não sim mas se como
+mais muito muita também já então né tipo aí eu você ele ela nós eles elas me te lhe seu sua
+the a an and or of to in on for with is are was were be it this that you i we they he she
+so but not do just like yeah um uh oh
+""".split())
+
+
+def _hash_vectors(texts: List[str], dim: int) -> np.ndarray:
+    """Matriz TF-IDF (hashing) normalizada, uma linha por bloco"""
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for word in _WORD_RE.findall(text.lower()):
+            if len(word) > 2 and word not in _STOPWORDS:
+                rows.append(row)
+                cols.append(zlib.crc32(word.encode("utf-8")) % dim)
+
+    counts = np.zeros((len(texts), dim), dtype=np.float32)
+    np.add.at(counts, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(texts)) / (1 + df)) + 1.0
+    vectors = np.log1p(counts) * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _blocks(segments: Iterable[Dict[str, any]], block_seconds: float) -> List[Dict[str, any]]:
+    """Agrupa segmentos consecutivos em blocos de ~block_seconds"""
+    blocks = []
+    current = None
+    for segment in segments:
+        if current is None:
+            current = {'start': segment['start'], 'end': segment['start'], 'texts': []}
+        current['texts'].append(segment['text'])
+        current['end'] = segment['start'] + segment.get('duration', 0)
+        if current['end'] - current['start'] >= block_seconds:
+            blocks.append(current)
+            current = None
+    if current is not None:
+        blocks.append(current)
+    for block in blocks:
+        block['text'] = " ".join(block.pop('texts'))
+    return blocks
+
+
+def _gap_similarities(vectors: np.ndarray, window: int) -> np.ndarray:
+    """
+    Similaridade de cosseno entre as `window` linhas antes e depois de cada fronteira
+
+    Calculada de uma vez com somas acumuladas; o elemento i compara os blocos
+    [i-window, i) com [i, i+window).
+    """
+    n = vectors.shape[0]
+    cumulative = np.vstack([np.zeros((1, vectors.shape[1]), dtype=vectors.dtype), np.cumsum(vectors, axis=0)])
+    gaps = np.arange(1, n)
+    left = cumulative[gaps] - cumulative[np.maximum(gaps - window, 0)]
+    right = cumulative[np.minimum(gaps + window, n)] - cumulative[gaps]
+    dots = np.einsum("ij,ij->i", left, right)
+    norms = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+    return dots / np.maximum(norms, 1e-12)
+
+
+def _run_peaks(values: np.ndarray) -> np.ndarray:
+    """
+    Para cada posição, o valor no início da sequência não crescente que termina nela
+
+    É o pico à esquerda do TextTiling (subir enquanto a similaridade não cai),
+    achado de uma vez: cada subida começa uma nova sequência, e o início da
+    sequência de cada posição é o máximo acumulado desses inícios.
+    """
+    positions = np.arange(len(values))
+    rises = np.concatenate(([True], values[1:] > values[:-1]))
+    return values[np.maximum.accumulate(np.where(rises, positions, 0))]
+
+
+def _depth_scores(similarities: np.ndarray) -> np.ndarray:
+    """Profundidade de cada vale de similaridade (TextTiling), vetorizada"""
+    if similarities.size == 0:
+        return np.zeros_like(similarities)
+    left = _run_peaks(similarities)
+    right = _run_peaks(similarities[::-1])[::-1]
+    return (left - similarities) + (right - similarities)
+
+
+def segment_chapters(
+    segments: Iterable[Dict[str, any]],
+    block_seconds: float = 20.0,
+    window: int = 3,
+    min_chapter_seconds: float = 90.0,
+    max_chapters: Optional[int] = None,
+    embeddings=None,
+    excerpt_words: int = 60,
+    dim: int = 4096
+    ) -> List[Dict[str, any]]:
+    """
+    Divide a transcrição em capítulos detectando mudanças de assunto
+
+    Blocos consecutivos viram vetores (TF-IDF por hashing ou embeddings) e as
+    fronteiras são os vales mais profundos de similaridade entre as janelas
+    vizinhas, respeitando uma duração mínima por capítulo.
+
+    Args:
+        segments: Segmentos com 'text', 'start' e 'duration' (lista ou iterador,
+            ex.: `TranscriptFile.iter_segments()`; percorridos uma única vez)
+        block_seconds: Duração de cada bloco comparado
+        window: Blocos de cada lado usados na comparação
+        min_chapter_seconds: Duração mínima de um capítulo
+        max_chapters: Limite de capítulos (padrão: ~1 a cada 4 minutos, até 12)
+        embeddings: Objeto com `embed_documents` para usar similaridade semântica
+        excerpt_words: Palavras do início de cada capítulo guardadas em 'excerpt'
+        dim: Dimensão do hashing lexical
+
+    Returns:
+        Lista de dicts com 'start', 'end', 'text' e 'excerpt'
+    """
+    blocks = _blocks(segments or [], block_seconds)
+    if not blocks:
+        return []
+    total_end = blocks[-1]['end']
+    if max_chapters is None:
+        max_chapters = int(min(12, max(1, total_end // 240)))
+
+    boundaries = []
+    if len(blocks) > 2 and max_chapters > 1:
+        texts = [block['text'] for block in blocks]
+        if embeddings is not None:
+            vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        else:
+            vectors = _hash_vectors(texts, dim)
+
+        depths = _depth_scores(_gap_similarities(vectors, window))
+        threshold = depths.mean() + depths.std() / 2
+        starts = np.array([block['start'] for block in blocks])
+
+        # gap i fica entre os blocos i e i+1
+        for gap in np.argsort(-depths):
+            if depths[gap] < threshold or len(boundaries) >= max_chapters - 1:
+                break
+            position = starts[gap + 1]
+            edges = [0.0, total_end] + [starts[b] for b in boundaries]
+            if all(abs(position - edge) >= min_chapter_seconds for edge in edges):
+                boundaries.append(gap + 1)
+
+    chapters = []
+    cuts = [0] + sorted(boundaries) + [len(blocks)]
+    for first, last in zip(cuts, cuts[1:]):
+        text = " ".join(block['text'] for block in blocks[first:last])
+        chapters.append({
+            'start': blocks[first]['start'],
+            'end': blocks[last - 1]['end'],
+            'text': text,
+            'excerpt': " ".join(text.split()[:excerpt_words]),
+        })
+    return chapters
+
+
+def format_chapters(chapters: List[Dict[str, any]], video_id: Optional[str] = None) -> str:
+    """
+    Formata capítulos com título como lista Markdown (com links de tempo, se houver vídeo)
+
+    Args:
+        chapters: Capítulos com 'start', 'title' e 'description'
+        video_id: ID do vídeo para os links `?t=`
+
+    Returns:
+        Lista no formato "- [mm:ss] Título: descrição"
+    """
+    lines = []
+    for chapter in chapters:
+        start = int(chapter['start'])
+        minutes, seconds = divmod(start, 60)
+        hours, minutes = divmod(minutes, 60)
+        stamp = f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+        stamp = f"[{stamp}](https://youtu.be/{video_id}?t={start})" if video_id else f"[{stamp}]"
+        description = f": {chapter['description']}" if chapter.get('description') else ""
+        lines.append(f"- {stamp} **{chapter['title']}**{description}")
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+"""
+Sessão de chat com memória: últimas mensagens na íntegra e resumo progressivo das antigas
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .profiler import profiled
+from .prompt_registry import PROMPTS
+from .token_budget import MAX_CHARS_PER_TOKEN
+from .transcript_store import TranscriptFile
+
+
+class ChatSession:
+    """Mantém o histórico de chat de um vídeo dentro de um orçamento de tokens"""
+
+    def __init__(
+        self,
+        video_data: Dict[str, any],
+        analysis: Optional[Dict[str, any]] = None,
+        max_turns: int = 6,
+        token_budget: int = 3000,
+        context_share: float = 0.5,
+        transcript_file: Optional[TranscriptFile] = None
+        ):
+        """
+        Inicializa a sessão
+
+        Args:
+            video_data: Dados do vídeo (formato de `YouTubeService.get_complete_data`)
+            analysis: Resultados da análise (usa o 'summary' se houver)
+            max_turns: Mensagens mantidas na íntegra (pergunta e resposta contam separadamente)
+            token_budget: Limite de tokens do prompt do chat
+            context_share: Fração do orçamento reservada ao contexto do vídeo
+            transcript_file: Transcrição em disco, lida só até onde cabe no
+                contexto (no lugar de 'transcript'); precisa estar aberta até
+                a primeira chamada de `context`
+        """
+        self.video_data = video_data
+        self._transcript_file = transcript_file
+        self.analysis = analysis or {}
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.context_share = context_share
+        self.history: List[Tuple[str, str]] = []  # todas as mensagens, para exibição
+        self.summary = ""
+        self._folded = 0  # mensagens de `history` já incorporadas ao resumo
+        self._context: Optional[str] = None
+
+    def _budget(self, llm_service) -> int:
+        """Orçamento efetivo: o menor entre o configurado e o que cabe no modelo"""
+        available = llm_service.context_window - llm_service.max_tokens - llm_service.PROMPT_MARGIN
+        return max(0, min(self.token_budget, available))
+
+    def context(self, llm_service) -> str:
+        """
+        Contexto fixo do vídeo (título, descrição, tags, resumo e transcrição)
+
+        Montado uma única vez por sessão; a transcrição ocupa o espaço que
+        sobrar da fração do orçamento reservada ao contexto. Depois de montado,
+        a sessão deixa de referenciar os dados completos do vídeo.
+
+        Args:
+            llm_service: LLMService usado para contar tokens
+
+        Returns:
+            Texto do contexto
+        """
+        if self._context is not None:
+            return self._context
+
+        video_data = self.video_data
+        parts = []
+        if video_data.get('title'):
+            parts.append(f"Título: {video_data['title']}")
+        if video_data.get('description'):
+            parts.append(f"Descrição: {video_data['description']}")
+        keywords = video_data.get('keywords')
+        if keywords:
+            parts.append(f"Tags: {', '.join(keywords) if isinstance(keywords, list) else keywords}")
+        if self.analysis.get('summary'):
+            parts.append(f"Resumo: {self.analysis['summary']}")
+
+        counter = llm_service.token_counter
+        header = "\n\n".join(parts)
+        context_budget = int(self._budget(llm_service) * self.context_share)
+        header = counter.clip(header, context_budget)
+
+        transcript_budget = context_budget - counter.count(header)
+        if transcript_budget > 0:
+            # só o início da transcrição entra no contexto: não lê (nem conta) o resto
+            excerpt = self._transcript_head(transcript_budget * MAX_CHARS_PER_TOKEN)
+            if excerpt:
+                excerpt = counter.clip(excerpt, transcript_budget)
+                header = f"{header}\n\nTranscrição: {excerpt}" if header else f"Transcrição: {excerpt}"
+
+        self._context = header
+        self.video_data = None
+        self.analysis = None
+        self._transcript_file = None
+        return self._context
+
+    def _transcript_head(self, max_chars: int) -> str:
+        """Início da transcrição com até ~`max_chars` caracteres"""
+        if self._transcript_file is not None:
+            return self._transcript_file.head(max_chars)
+        return (self.video_data.get('transcript') or '')[:max_chars]
+
+    @staticmethod
+    def _format_turns(turns: List[Tuple[str, str]]) -> str:
+        labels = {'user': 'Usuário', 'assistant': 'Assistente'}
+        return "\n".join(f"{labels.get(role, role)}: {text}" for role, text in turns)
+
+    @property
+    def recent_turns(self) -> List[Tuple[str, str]]:
+        """Mensagens ainda não incorporadas ao resumo"""
+        return self.history[self._folded:]
+
+    def build_prompt(self, question: str, llm_service) -> str:
+        """
+        Monta o prompt com contexto, resumo da conversa e mensagens recentes
+
+        Args:
+            question: Pergunta do usuário
+            llm_service: LLMService usado para contar tokens
+
+        Returns:
+            Prompt pronto para `LLMService.generate`
+        """
+        context = self.context(llm_service)
+        counter = llm_service.token_counter
+        template = PROMPTS.get('chat', llm_service.provider)
+        fixed = template.render(
+            context=context,
+            conversation_summary=self.summary or "(nenhum)",
+            recent_turns="",
+            question=question,
+        )
+        room = self._budget(llm_service) - counter.count(fixed)
+
+        # mantém as mensagens mais recentes que couberem no orçamento
+        turns = []
+        for turn in reversed(self.recent_turns):
+            cost = counter.count(self._format_turns([turn])) + 1
+            if cost > room:
+                break
+            turns.insert(0, turn)
+            room -= cost
+
+        return template.render(
+            context=context,
+            conversation_summary=self.summary or "(nenhum)",
+            recent_turns=self._format_turns(turns) or "(nenhuma)",
+            question=question,
+        )
+
+    @property
+    def fold_batch(self) -> int:
+        """Excesso mínimo (em mensagens, par) que dispara um novo resumo"""
+        batch = max(2, self.max_turns // 2)
+        return batch + batch % 2
+
+    def fold(self, llm_service) -> None:
+        """
+        Incorpora ao resumo as mensagens que excedem `max_turns`
+
+        O resumo custa uma chamada extra ao LLM; por isso só é refeito quando o
+        excesso chega a `fold_batch` mensagens, e não a cada pergunta. Até lá,
+        `build_prompt` mantém as mensagens recentes que couberem no orçamento.
+
+        Args:
+            llm_service: LLMService usado para gerar o resumo
+        """
+        overflow = len(self.recent_turns) - self.max_turns
+        if overflow < self.fold_batch:
+            return
+        # dobra em pares pergunta/resposta
+        overflow += overflow % 2
+        turns = self.history[self._folded:self._folded + overflow]
+
+        prompt = PROMPTS.get('chat_summary', llm_service.provider).render(
+            summary=self.summary or "(vazio)",
+            turns=self._format_turns(turns),
+        )
+        result = llm_service.generate(prompt)
+        if result['success']:
+            self.summary = llm_service.token_counter.clip(
+                result['text'],
+                int(self._budget(llm_service) * (1 - self.context_share) / 2)
+            )
+            self._folded += len(turns)
+
+    @profiled
+    def ask(self, question: str, llm_service) -> Dict[str, any]:
+        """
+        Responde uma pergunta usando o histórico da conversa
+
+        Args:
+            question: Pergunta do usuário
+            llm_service: LLMService usado na resposta
+
+        Returns:
+            Dict com 'success', 'answer', 'usage' e 'error'
+        """
+        result = llm_service.generate(self.build_prompt(question, llm_service))
+        if not result['success']:
+            return {'success': False, 'answer': None, 'usage': None, 'error': result['error']}
+
+        self.history.append(('user', question))
+        self.history.append(('assistant', result['text']))
+        self.fold(llm_service)
+        return {'success': True, 'answer': result['text'], 'usage': result['usage'], 'error': None}
@@ -0,0 +1,151 @@
+"""
+Prazos por requisição, repartidos entre as etapas, e cancelamento cooperativo
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """O prazo da requisição acabou"""
+
+
+class Cancelled(Exception):
+    """A requisição foi cancelada (ex.: usuário saiu ou pediu outro vídeo)"""
+
+
+class Deadline:
+    """
+    Prazo absoluto de uma requisição, com sinal de cancelamento compartilhado
+
+    Etapas recebem uma fração do tempo restante com `child`; o cancelamento
+    de um prazo vale para todos os filhos.
+    """
+
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+        _expires_at: Optional[float] = None
+        ):
+        """
+        Inicializa o prazo
+
+        Args:
+            seconds: Tempo total disponível (None = sem prazo, só cancelamento)
+            cancel_event: Evento de cancelamento compartilhado (cria um se None)
+        """
+        if _expires_at is None and seconds is not None:
+            _expires_at = time.monotonic() + seconds
+        self.expires_at = _expires_at
+        self._cancel_event = cancel_event or threading.Event()
+
+    def child(self, share: float) -> "Deadline":
+        """Prazo de uma etapa: `share` do tempo restante, com o mesmo cancelamento"""
+        remaining = self.remaining()
+        expires_at = None if remaining is None else time.monotonic() + remaining * share
+        return Deadline(cancel_event=self._cancel_event, _expires_at=expires_at)
+
+    def remaining(self) -> Optional[float]:
+        """Segundos restantes (None = sem prazo)"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """Sinaliza o cancelamento para esta requisição e todas as suas etapas"""
+        self._cancel_event.set()
+
+    def check(self, stage: str = "") -> None:
+        """
+        Interrompe a etapa se a requisição foi cancelada ou o prazo acabou
+
+        Raises:
+            Cancelled: Requisição cancelada
+            DeadlineExceeded: Prazo esgotado
+        """
+        suffix = f" ({stage})" if stage else ""
+        if self.cancelled:
+            raise Cancelled(f"Requisição cancelada{suffix}")
+        if self.expired:
+            raise DeadlineExceeded(f"Tempo limite da requisição esgotado{suffix}")
+
+    def timeout(self, default: Optional[float]) -> Optional[float]:
+        """Timeout de uma chamada de rede: o menor entre `default` e o tempo restante"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+
+# threads para chamadas bloqueantes que não aceitam timeout total (yt-dlp, clientes de LLM)
+_runner = ThreadPoolExecutor(max_workers=16, thread_name_prefix="deadline")
+
+
+def run_with_deadline(
+    fn: Callable,
+    deadline: Optional[Deadline],
+    stage: str = "",
+    poll: float = 0.25,
+    on_done: Optional[Callable[[], None]] = None
+    ):
+    """
+    Executa uma chamada bloqueante sem prender a thread de quem chamou além do prazo
+
+    A chamada roda em outra thread; quem chamou volta assim que ela termina,
+    o prazo acaba ou a requisição é cancelada. A chamada abandonada termina
+    sozinha pelo timeout de socket configurado no cliente.
+
+    Args:
+        fn: Função sem argumentos
+        deadline: Prazo da requisição (None = chama diretamente)
+        stage: Nome da etapa, para as mensagens de erro
+        poll: Intervalo de verificação do cancelamento
+        on_done: Chamada quando `fn` termina de fato, mesmo depois de quem
+            chamou desistir (ex.: devolver a vaga no provedor)
+
+    Returns:
+        Resultado de `fn`
+
+    Raises:
+        Cancelled: Requisição cancelada
+        DeadlineExceeded: Prazo esgotado
+    """
+    if deadline is None:
+        try:
+            return fn()
+        finally:
+            if on_done is not None:
+                on_done()
+
+    try:
+        deadline.check(stage)
+    except (Cancelled, DeadlineExceeded):
+        if on_done is not None:
+            on_done()
+        raise
+    future = _runner.submit(fn)
+    if on_done is not None:
+        # também roda se `future.cancel()` impedir a chamada de começar
+        future.add_done_callback(lambda _: on_done())
+    while True:
+        remaining = deadline.remaining()
+        wait = poll if remaining is None else min(poll, remaining)
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeout:
+            try:
+                deadline.check(stage)
+            except (Cancelled, DeadlineExceeded):
+                future.cancel()
+                raise
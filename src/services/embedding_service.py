@@ -0,0 +1,224 @@
+"""
+Serviço de embeddings em lote com cache em disco por hash do conteúdo
+"""
+
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from configs.storage_config import EMBEDDING_CACHE_PATH
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    dtype TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    scale REAL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, hash)
+);
+"""
+
+
+class EmbeddingService:
+    """Gera embeddings em lote (matrizes NumPy) e evita recalcular trechos já vistos"""
+
+    DEFAULT_MODELS = {
+        'local': 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
+        'ollama': 'nomic-embed-text',
+        'openai': 'text-embedding-3-small',
+    }
+
+    STORAGE_DTYPES = ('float32', 'float16', 'int8')
+
+    # modelos locais carregados uma vez por processo
+    _local_models: Dict[str, any] = {}
+    _local_lock = threading.Lock()
+
+    def __init__(
+        self,
+        provider: str = 'local',
+        model_name: Optional[str] = None,
+        api_key: Optional[str] = None,
+        batch_size: int = 32,
+        storage_dtype: str = 'float16',
+        cache_path: Optional[Union[str, Path]] = None,
+        use_cache: bool = True
+        ):
+        """
+        Inicializa o serviço
+
+        Args:
+            provider: 'local' (sentence-transformers na CPU, offline), 'ollama' ou 'openai'
+            model_name: Nome do modelo (usa DEFAULT_MODELS se None)
+            api_key: Chave de API (apenas 'openai')
+            batch_size: Trechos por lote enviado ao modelo
+            storage_dtype: Precisão dos vetores no cache ('float32', 'float16' ou 'int8')
+            cache_path: Caminho do cache SQLite (padrão: EMBEDDING_CACHE_PATH)
+            use_cache: Desliga o cache em disco se False
+        """
+        if provider not in self.DEFAULT_MODELS:
+            raise ValueError(f"Provedor de embeddings não suportado: {provider}")
+        if storage_dtype not in self.STORAGE_DTYPES:
+            raise ValueError(f"Precisão de armazenamento inválida: {storage_dtype}")
+
+        self.provider = provider
+        self.model_name = model_name or self.DEFAULT_MODELS[provider]
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.storage_dtype = storage_dtype
+        self.use_cache = use_cache
+        self.cache_path = Path(cache_path or EMBEDDING_CACHE_PATH)
+        self._client = None
+
+        if self.use_cache:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+
+    @property
+    def cache_namespace(self) -> str:
+        """Chave do modelo no cache (vetores de modelos diferentes não se misturam)"""
+        return f"{self.provider}:{self.model_name}"
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get_client(self):
+        """Inicializa (uma vez) o modelo ou cliente de embeddings"""
+        if self._client is not None:
+            return self._client
+
+        if self.provider == 'local':
+            if SentenceTransformer is None:
+                raise ImportError("Embeddings locais requerem o pacote sentence-transformers")
+            with self._local_lock:
+                model = self._local_models.get(self.model_name)
+                if model is None:
+                    model = SentenceTransformer(self.model_name, device='cpu')
+                    self._local_models[self.model_name] = model
+            self._client = model
+        elif self.provider == 'ollama':
+            from langchain_community.embeddings import OllamaEmbeddings
+            self._client = OllamaEmbeddings(model=self.model_name)
+        else:
+            from langchain_openai import OpenAIEmbeddings
+            self._client = OpenAIEmbeddings(model=self.model_name, api_key=self.api_key)
+        return self._client
+
+    def _compute(self, texts: List[str]) -> np.ndarray:
+        """Calcula embeddings sem cache, em lotes de `batch_size`"""
+        client = self._get_client()
+        if self.provider == 'local':
+            vectors = client.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            return np.asarray(vectors, dtype=np.float32)
+
+        batches = [
+            client.embed_documents(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        vectors = np.asarray([vector for batch in batches for vector in batch], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Hash do conteúdo usado como chave do cache"""
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _encode_vector(self, vector: np.ndarray) -> tuple:
+        """Converte um vetor para a precisão de armazenamento: (blob, escala)"""
+        if self.storage_dtype == 'int8':
+            scale = float(np.abs(vector).max()) / 127 or 1.0
+            return np.round(vector / scale).astype(np.int8).tobytes(), scale
+        return vector.astype(self.storage_dtype).tobytes(), None
+
+    @staticmethod
+    def _decode_vector(blob: bytes, dtype: str, scale: Optional[float]) -> np.ndarray:
+        vector = np.frombuffer(blob, dtype=dtype).astype(np.float32)
+        return vector * scale if scale is not None else vector
+
+    def _load_cached(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._connect() as conn:
+            # consultas em blocos para respeitar o limite de parâmetros do SQLite
+            for i in range(0, len(hashes), 500):
+                block = hashes[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT hash, dtype, scale, vector FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({', '.join('?' * len(block))})",
+                    [self.cache_namespace, *block]
+                )
+                for content_hash, dtype, scale, blob in rows:
+                    found[content_hash] = self._decode_vector(blob, dtype, scale)
+        return found
+
+    def _store(self, hashes: List[str], vectors: np.ndarray) -> None:
+        rows = []
+        for content_hash, vector in zip(hashes, vectors):
+            blob, scale = self._encode_vector(vector)
+            rows.append((self.cache_namespace, content_hash, self.storage_dtype, vector.shape[0], scale, blob))
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Gera embeddings normalizados para uma lista de textos
+
+        Textos repetidos e já presentes no cache não são recalculados.
+
+        Args:
+            texts: Textos (trechos de transcrição, perguntas...)
+
+        Returns:
+            Matriz float32 (len(texts), dim)
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        hashes = [self.content_hash(text) for text in texts]
+        vectors = self._load_cached(list(set(hashes))) if self.use_cache else {}
+
+        missing = {}
+        for content_hash, text in zip(hashes, texts):
+            if content_hash not in vectors:
+                missing.setdefault(content_hash, text)
+        if missing:
+            computed = self._compute(list(missing.values()))
+            vectors.update(zip(missing.keys(), computed))
+            if self.use_cache:
+                self._store(list(missing.keys()), computed)
+
+        return np.vstack([vectors[content_hash] for content_hash in hashes]).astype(np.float32)
+
+    # interface de embeddings do LangChain (usada por CorpusIndex)
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        return self.embed(texts)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
@@ -0,0 +1,456 @@
+"""
+Harness de avaliação: reexecuta um corpus fixo de transcrições em variantes do pipeline
+e compara latência, tokens e custo com indicadores automáticos de qualidade
+"""
+
+import argparse
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Union
+
+from configs.evaluation_config import (
+    DEFAULT_VARIANTS,
+    EVALUATION_STAGES,
+    STUB_DECODE_TPS,
+    STUB_PREFILL_TPS,
+    STUB_TIME_SCALE,
+)
+from .llm_service import LLMService
+from .prompt_registry import PROMPTS, PromptTemplate
+from .scheduler import LLMScheduler
+from .token_budget import estimate_cost
+from .transcript_store import TranscriptFile, TranscriptStore
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return _WORD_RE.findall((text or "").lower())
+
+
+# ---------------------------------------------------------------- qualidade
+
+def _ngrams(tokens: List[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _f1(overlap: int, candidate: int, reference: int) -> float:
+    if not overlap or not candidate or not reference:
+        return 0.0
+    precision, recall = overlap / candidate, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def _lcs(a: List[str], b: List[str]) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b, start=1):
+            current.append(previous[j - 1] + 1 if token == other else max(previous[j], current[j - 1]))
+        previous = current
+    return previous[-1]
+
+
+def rouge(candidate: str, reference: str) -> Dict[str, float]:
+    """
+    ROUGE-1, ROUGE-2 e ROUGE-L (F1) entre um texto gerado e uma referência
+
+    Returns:
+        Dict com 'rouge1', 'rouge2' e 'rougeL' (0 a 1)
+    """
+    cand, ref = _tokens(candidate), _tokens(reference)
+    scores = {}
+    for n in (1, 2):
+        cand_ngrams, ref_ngrams = _ngrams(cand, n), _ngrams(ref, n)
+        overlap = sum((cand_ngrams & ref_ngrams).values())
+        scores[f'rouge{n}'] = _f1(overlap, sum(cand_ngrams.values()), sum(ref_ngrams.values()))
+    scores['rougeL'] = _f1(_lcs(cand, ref), len(cand), len(ref))
+    return scores
+
+
+def topic_coverage(text: str, topics: Iterable[str], threshold: float = 0.5) -> Optional[float]:
+    """
+    Fração dos tópicos de referência mencionados no texto gerado
+
+    Um tópico conta como coberto quando pelo menos `threshold` das suas
+    palavras (com mais de 3 letras) aparecem no texto.
+
+    Returns:
+        Cobertura de 0 a 1, ou None se não houver tópicos
+    """
+    vocabulary = set(_tokens(text))
+    covered, total = 0, 0
+    for topic in topics:
+        words = [word for word in _tokens(topic) if len(word) > 3] or _tokens(topic)
+        if not words:
+            continue
+        total += 1
+        if sum(word in vocabulary for word in words) / len(words) >= threshold:
+            covered += 1
+    return covered / total if total else None
+
+
+# ---------------------------------------------------------------- stub
+
+class StubLLM:
+    """
+    LLM local simulado, determinístico e sem rede
+
+    Responde com as frases mais representativas do maior bloco de texto do
+    prompt (a transcrição), como um resumo extrativo, e informa contagens e
+    tempos no formato do Ollama, calculados a partir de velocidades típicas
+    de um modelo pequeno em CPU.
+    """
+
+    def __init__(
+        self,
+        max_words: int = 150,
+        prefill_tps: float = STUB_PREFILL_TPS,
+        decode_tps: float = STUB_DECODE_TPS,
+        time_scale: float = STUB_TIME_SCALE
+        ):
+        """
+        Inicializa o stub
+
+        Args:
+            max_words: Palavras por resposta
+            prefill_tps: Tokens de prompt processados por segundo
+            decode_tps: Tokens gerados por segundo
+            time_scale: Fração do tempo simulado efetivamente esperada
+        """
+        self.max_words = max_words
+        self.prefill_tps = prefill_tps
+        self.decode_tps = decode_tps
+        self.time_scale = time_scale
+
+    def _respond(self, prompt: str) -> str:
+        source = max(prompt.split("\n"), key=len).split()
+        windows = [source[i:i + 20] for i in range(0, len(source), 20)]
+        if not windows:
+            return ""
+        frequency = Counter(word.lower() for word in source if len(word) > 3)
+
+        def score(window):
+            return sum(frequency[word.lower()] for word in window if len(word) > 3) / len(window)
+
+        # a janela mais representativa de cada trecho do texto, para cobrir o conteúdo inteiro
+        groups = max(1, min(len(windows), self.max_words // 20))
+        size = len(windows) / groups
+        chosen = [
+            max(windows[int(g * size):int((g + 1) * size)] or [windows[-1]], key=score)
+            for g in range(groups)
+        ]
+        return " ".join(" ".join(window) for window in chosen)
+
+    def generate(self, prompts: List[str]):
+        generations = []
+        for prompt in prompts:
+            text = self._respond(prompt)
+            prompt_tokens, output_tokens = max(1, len(prompt) // 4), max(1, len(text) // 4)
+            prefill, decode = prompt_tokens / self.prefill_tps, output_tokens / self.decode_tps
+            if self.time_scale:
+                time.sleep((prefill + decode) * self.time_scale)
+            info = {
+                'prompt_eval_count': prompt_tokens,
+                'eval_count': output_tokens,
+                'prompt_eval_duration': int(prefill * 1e9),
+                'eval_duration': int(decode * 1e9),
+                'load_duration': 0,
+            }
+            generations.append([SimpleNamespace(text=text, generation_info=info)])
+        return SimpleNamespace(generations=generations)
+
+
+# ---------------------------------------------------------------- corpus
+
+def load_corpus(path: Union[str, Path], store: Optional[TranscriptStore] = None) -> List[Dict[str, any]]:
+    """
+    Lê o corpus de avaliação (JSON Lines)
+
+    Cada linha tem 'video_id' e, opcionalmente, 'transcript', 'segments',
+    'reference_summary' e 'reference_topics' (lista). Sem 'transcript', o
+    texto vem das transcrições em cache (`TranscriptStore`), mesmo expiradas.
+
+    Raises:
+        ValueError: Vídeo sem transcrição no arquivo nem no cache
+    """
+    store = store or TranscriptStore()
+    corpus = []
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if not entry.get('transcript'):
+                paths = store.paths(entry['video_id'])
+                if not paths:
+                    raise ValueError(f"Sem transcrição em cache para {entry['video_id']}")
+                with TranscriptFile(paths[0]) as cached:
+                    entry['transcript'] = cached.text()
+                    entry.setdefault('segments', cached.segments())
+            corpus.append(entry)
+    return corpus
+
+
+def corpus_from_store(store: Optional[TranscriptStore] = None, limit: Optional[int] = None) -> List[Dict[str, any]]:
+    """Corpus com as transcrições em cache, sem referências (compara com a variante base)"""
+    store = store or TranscriptStore()
+    corpus, seen = [], set()
+    for path in sorted(store.root.glob("*.tts")) if store.root.exists() else []:
+        video_id = path.name.split(".", 1)[0]
+        if video_id in seen:
+            continue
+        seen.add(video_id)
+        with TranscriptFile(store.paths(video_id)[0]) as cached:
+            corpus.append({'video_id': video_id, 'transcript': cached.text(), 'segments': cached.segments()})
+        if limit and len(corpus) >= limit:
+            break
+    return corpus
+
+
+# ---------------------------------------------------------------- execução
+
+class EvaluationHarness:
+    """Executa as variantes sobre o corpus e resume o custo e a qualidade de cada uma"""
+
+    def __init__(self, corpus: List[Dict[str, any]], variants: Optional[List[Dict[str, any]]] = None):
+        """
+        Inicializa o harness
+
+        Args:
+            corpus: Entradas de `load_corpus` ou `corpus_from_store`
+            variants: Variantes do pipeline (padrão: DEFAULT_VARIANTS); a primeira
+                é a base de comparação para vídeos sem resumo de referência
+        """
+        self.corpus = corpus
+        self.variants = variants or DEFAULT_VARIANTS
+        self.records: List[Dict[str, any]] = []
+
+    @staticmethod
+    def build_service(variant: Dict[str, any]) -> LLMService:
+        """
+        LLMService configurado pela variante, na fila de menor prioridade
+
+        O stub não usa o provedor de verdade: recebe um escalonador próprio,
+        com `concurrency` vagas (padrão: uma por etapa), para que a fila
+        compartilhada do Ollama não serialize as variantes paralelas.
+        """
+        provider = variant.get('provider', 'stub')
+        service = LLMService(
+            provider='ollama' if provider == 'stub' else provider,
+            model_name=variant.get('model'),
+            temperature=variant.get('temperature', 0.0),
+            max_tokens=variant.get('max_tokens', 500),
+            priority='batch',
+            tenant='evaluation',
+            context_window=variant.get('context_window'),
+        )
+        if provider == 'stub':
+            service.llm = StubLLM(max_words=int(service.max_tokens * 0.3))
+            concurrency = variant.get('concurrency', len(variant.get('stages', EVALUATION_STAGES)))
+            service.scheduler = LLMScheduler(max_concurrent=concurrency, interactive_reserve=0)
+        return service
+
+    @staticmethod
+    def _template(service: LLMService, variant: Dict[str, any], stage: str) -> PromptTemplate:
+        name = variant.get('templates', {}).get(stage, stage)
+        if name in PROMPTS.names():
+            return service.template(name)
+        return PROMPTS.compile(name)
+
+    def run_one(self, variant: Dict[str, any], entry: Dict[str, any]) -> Dict[str, any]:
+        """
+        Executa uma variante sobre um vídeo
+
+        Returns:
+            Registro com latência, uso de tokens, custo e saídas de cada etapa
+        """
+        service = self.build_service(variant)
+        transcript = entry['transcript']
+        stages = variant.get('stages', EVALUATION_STAGES)
+        strategy = variant.get('strategy', 'chunk')
+        started = time.perf_counter()
+
+        templates = {stage: self._template(service, variant, stage) for stage in stages}
+        fitted = {}
+        for stage, template in templates.items():
+            # ajuste feito aqui para respeitar a estratégia; os métodos recebem o texto pronto
+            fitted[stage] = service.fit_transcript(transcript, template, strategy)
+
+        tasks = {
+            'summary': lambda: service.generate_summary(fitted['summary']['transcript'], templates['summary']),
+            'topics': lambda: service.extract_topics(fitted['topics']['transcript'], templates['topics']),
+            'article': lambda: service.generate_article(
+                fitted['article']['transcript'], prompt_template=templates['article'], length='long'
+            ),
+        }
+        tasks = {stage: task for stage, task in tasks.items() if stage in stages}
+        if variant.get('parallel'):
+            results = service.run_parallel(tasks)
+        else:
+            results = {stage: task() for stage, task in tasks.items()}
+        latency = time.perf_counter() - started
+
+        usage = service.usage_total
+        errors = [f"{stage}: {result['error']}" for stage, result in results.items() if not result['success']]
+        return {
+            'variant': variant['name'],
+            'video_id': entry.get('video_id'),
+            'success': not errors,
+            'error': "; ".join(errors) or None,
+            'latency': latency,
+            'calls': usage.get('calls', 0),
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0),
+            'cost': estimate_cost(
+                variant.get('cost_model') or service.model,
+                usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+            ),
+            'tokens_per_second': usage.get('tokens_per_second'),
+            'fit': {stage: fitted[stage]['strategy'] for stage in fitted},
+            # cada etapa devolve o texto no campo de mesmo nome ('summary', 'topics', 'article')
+            'outputs': {stage: result.get(stage) for stage, result in results.items()},
+        }
+
+    def score(self, record: Dict[str, any], entry: Dict[str, any], baseline: Optional[Dict[str, any]]) -> None:
+        """Acrescenta ROUGE e cobertura de tópicos ao registro"""
+        summary = record['outputs'].get('summary') or ""
+        reference = entry.get('reference_summary') or (baseline or {}).get('outputs', {}).get('summary')
+        record['reference'] = 'manual' if entry.get('reference_summary') else ('baseline' if reference else None)
+        record.update(rouge(summary, reference) if reference else {'rouge1': None, 'rouge2': None, 'rougeL': None})
+        generated = " ".join(text for text in record['outputs'].values() if text)
+        record['topic_coverage'] = topic_coverage(generated, entry.get('reference_topics') or [])
+
+    def run(self, progress=None) -> List[Dict[str, any]]:
+        """
+        Executa todas as variantes em todo o corpus
+
+        Args:
+            progress: Função opcional chamada com (variante, video_id) antes de cada execução
+
+        Returns:
+            Registros por (variante, vídeo), já com os indicadores de qualidade
+        """
+        self.records = []
+        baselines = {}
+        for index, variant in enumerate(self.variants):
+            for entry in self.corpus:
+                if progress:
+                    progress(variant['name'], entry.get('video_id'))
+                record = self.run_one(variant, entry)
+                if index == 0:
+                    baselines[entry.get('video_id')] = record
+                # a base só se compara com referências manuais
+                self.score(record, entry, None if index == 0 else baselines.get(entry.get('video_id')))
+                self.records.append(record)
+        return self.records
+
+    def summary(self) -> List[Dict[str, any]]:
+        """
+        Agrega os registros por variante
+
+        Returns:
+            Uma linha por variante: 'variant', 'runs', 'failures', 'latency_mean',
+            'latency_p95', 'tokens', 'cost', 'tokens_per_second', 'rouge1',
+            'rougeL' e 'topic_coverage' (médias sobre os vídeos com valor)
+        """
+        rows = []
+        for variant in self.variants:
+            records = [record for record in self.records if record['variant'] == variant['name']]
+            if not records:
+                continue
+            latencies = sorted(record['latency'] for record in records)
+
+            def mean(field):
+                values = [record[field] for record in records if record.get(field) is not None]
+                return sum(values) / len(values) if values else None
+
+            costs = [record['cost'] for record in records if record['cost'] is not None]
+            rows.append({
+                'variant': variant['name'],
+                'runs': len(records),
+                'failures': sum(not record['success'] for record in records),
+                'latency_mean': sum(latencies) / len(latencies),
+                'latency_p95': latencies[int(0.95 * (len(latencies) - 1))],
+                'tokens': sum(record['prompt_tokens'] + record['completion_tokens'] for record in records),
+                'cost': sum(costs) if costs else None,
+                'tokens_per_second': mean('tokens_per_second'),
+                'rouge1': mean('rouge1'),
+                'rougeL': mean('rougeL'),
+                'topic_coverage': mean('topic_coverage'),
+            })
+        return rows
+
+    def best_variant(self, min_rouge_l: float = 0.0, min_coverage: float = 0.0) -> Optional[str]:
+        """
+        Variante mais rápida (latência média) sem falhas e com qualidade aceitável
+
+        Indicadores ausentes (sem referência) não eliminam a variante.
+        """
+        acceptable = [
+            row for row in self.summary()
+            if not row['failures']
+            and (row['rougeL'] is None or row['rougeL'] >= min_rouge_l)
+            and (row['topic_coverage'] is None or row['topic_coverage'] >= min_coverage)
+        ]
+        return min(acceptable, key=lambda row: row['latency_mean'])['variant'] if acceptable else None
+
+    def comparison_table(self) -> str:
+        """Tabela Markdown com uma linha por variante"""
+        def fmt(value, pattern):
+            return "—" if value is None else pattern.format(value)
+
+        lines = [
+            "| variante | execuções | falhas | latência média (s) | p95 (s) | tokens | custo (US$) | tokens/s | ROUGE-1 | ROUGE-L | cobertura |",
+            "|---|---|---|---|---|---|---|---|---|---|---|",
+        ]
+        for row in self.summary():
+            lines.append(
+                f"| {row['variant']} | {row['runs']} | {row['failures']} | {row['latency_mean']:.2f} | "
+                f"{row['latency_p95']:.2f} | {row['tokens']} | {fmt(row['cost'], '{:.4f}')} | "
+                f"{fmt(row['tokens_per_second'], '{:.1f}')} | {fmt(row['rouge1'], '{:.3f}')} | "
+                f"{fmt(row['rougeL'], '{:.3f}')} | {fmt(row['topic_coverage'], '{:.0%}')} |"
+            )
+        return "\n".join(lines)
+
+    def export_jsonl(self, path: Union[str, Path]) -> int:
+        """Grava os registros (um por variante e vídeo), para comparar execuções"""
+        with open(path, 'w', encoding='utf-8') as output:
+            for record in self.records:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(self.records)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compara variantes do pipeline em um corpus fixo de transcrições")
+    parser.add_argument('--corpus', help="Arquivo JSONL do corpus (padrão: transcrições em cache)")
+    parser.add_argument('--variants', help="Arquivo JSON com a lista de variantes (padrão: DEFAULT_VARIANTS)")
+    parser.add_argument('--limit', type=int, help="Máximo de vídeos quando o corpus vem do cache")
+    parser.add_argument('--records', help="Grava os registros detalhados neste arquivo JSONL")
+    parser.add_argument('--min-rouge-l', type=float, default=0.0)
+    parser.add_argument('--min-coverage', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus) if args.corpus else corpus_from_store(limit=args.limit)
+    if not corpus:
+        raise SystemExit("Corpus vazio: informe --corpus ou analise vídeos para preencher o cache")
+    variants = json.loads(Path(args.variants).read_text(encoding='utf-8')) if args.variants else None
+
+    harness = EvaluationHarness(corpus, variants)
+    harness.run(progress=lambda variant, video_id: print(f"{variant}: {video_id}", flush=True))
+    print()
+    print(harness.comparison_table())
+    best = harness.best_variant(args.min_rouge_l, args.min_coverage)
+    print(f"\nMais rápida aceitável: {best or 'nenhuma'}")
+    if args.records:
+        harness.export_jsonl(args.records)
+
+
+if __name__ == '__main__':
+    main()
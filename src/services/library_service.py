@@ -0,0 +1,368 @@
+"""
+Biblioteca persistente de vídeos analisados com busca full-text (SQLite FTS5)
+"""
+
+import json
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from configs.storage_config import LIBRARY_DB_PATH
+from .profiler import profiled
+
+
+_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    author TEXT,
+    channel TEXT,
+    publish_date TEXT,
+    category TEXT,
+    tags TEXT,
+    duration INTEGER,
+    views INTEGER,
+    transcript_language TEXT,
+    analyzed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_channel ON videos(channel);
+CREATE INDEX IF NOT EXISTS idx_videos_publish_date ON videos(publish_date);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title,
+    tags,
+    summary,
+    topics,
+    article,
+    transcript,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    start REAL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_video_id ON segments(video_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+class LibraryService:
+    """Indexa transcrições e análises e permite buscá-las por palavra-chave ou frase"""
+
+    # duração (s) das janelas de trechos indexadas para hits com timestamp
+    SEGMENT_WINDOW = 30
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Inicializa a biblioteca, criando o banco se necessário
+
+        Args:
+            db_path: Caminho do banco SQLite (padrão: LIBRARY_DB_PATH)
+        """
+        self.db_path = Path(db_path or LIBRARY_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            legacy = self._legacy_tables(conn)
+            for table in legacy:
+                conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+            conn.executescript(_SCHEMA)
+            if legacy:
+                self._migrate(conn, legacy)
+
+    @staticmethod
+    def _legacy_tables(conn: sqlite3.Connection) -> List[str]:
+        """Tabelas FTS da versão antiga, com `video_id` dentro do próprio índice"""
+        return [
+            row['name'] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE name IN ('documents', 'segments') AND sql LIKE 'CREATE VIRTUAL TABLE%'"
+            )
+        ]
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection, legacy: List[str]) -> None:
+        """Copia as tabelas antigas para o novo formato (mesmos rowids) e as remove"""
+        if 'documents' in legacy:
+            conn.execute("INSERT INTO documents (id, video_id) SELECT rowid, video_id FROM documents_legacy")
+            conn.execute(
+                "INSERT INTO documents_fts (rowid, title, tags, summary, topics, article, transcript) "
+                "SELECT rowid, title, tags, summary, topics, article, transcript FROM documents_legacy"
+            )
+            conn.execute("DROP TABLE documents_legacy")
+        if 'segments' in legacy:
+            conn.execute("INSERT INTO segments (id, video_id, start) SELECT rowid, video_id, start FROM segments_legacy")
+            conn.execute("INSERT INTO segments_fts (rowid, text) SELECT rowid, text FROM segments_legacy")
+            conn.execute("DROP TABLE segments_legacy")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # uma conexão por operação: seguro entre as threads do Streamlit
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @classmethod
+    def _windows(cls, segments: Optional[Iterable[Dict[str, any]]]) -> List[tuple]:
+        """Agrupa trechos consecutivos em janelas de ~SEGMENT_WINDOW segundos"""
+        windows = []
+        start, texts = None, []
+        for segment in segments or []:
+            if start is None:
+                start = segment['start']
+            texts.append(segment['text'])
+            if segment['start'] + segment.get('duration', 0) - start >= cls.SEGMENT_WINDOW:
+                windows.append((start, " ".join(texts)))
+                start, texts = None, []
+        if texts:
+            windows.append((start, " ".join(texts)))
+        return windows
+
+    @profiled
+    def add_video(
+        self,
+        video_data: Dict[str, any],
+        analysis: Optional[Dict[str, any]] = None,
+        segments: Optional[Iterable[Dict[str, any]]] = None
+        ) -> Dict[str, any]:
+        """
+        Adiciona (ou atualiza) um vídeo analisado na biblioteca
+
+        Args:
+            video_data: Dados do vídeo (formato de `YouTubeService.get_complete_data`)
+            analysis: Resultados da análise ('summary', 'topics', 'article')
+            segments: Segmentos no lugar de 'transcript_segments' (ex.:
+                `TranscriptFile.iter_segments()`); sem 'transcript', o texto
+                indexado é montado a partir deles
+
+        Returns:
+            Dict com 'success' e 'error'
+        """
+        analysis = analysis or {}
+        video_id = video_data.get('video_id')
+        if not video_id:
+            return {'success': False, 'error': 'Vídeo sem video_id'}
+
+        publish_date = video_data.get('publish_date')
+        if isinstance(publish_date, date):
+            publish_date = publish_date.isoformat()
+        tags = video_data.get('keywords') or []
+        windows = self._windows(video_data.get('transcript_segments') if segments is None else segments)
+        transcript = video_data.get('transcript')
+        if transcript is None:
+            transcript = " ".join(text for _, text in windows).replace("\n", " ")
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        video_id,
+                        video_data.get('title'),
+                        video_data.get('author'),
+                        video_data.get('channel'),
+                        publish_date,
+                        video_data.get('category'),
+                        json.dumps(tags, ensure_ascii=False),
+                        video_data.get('duration'),
+                        video_data.get('views'),
+                        video_data.get('transcript_language'),
+                        datetime.now().isoformat(timespec='seconds'),
+                    )
+                )
+                self._delete_text(conn, video_id)
+                document_id = conn.execute("INSERT INTO documents (video_id) VALUES (?)", (video_id,)).lastrowid
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, title, tags, summary, topics, article, transcript) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        document_id,
+                        video_data.get('title') or '',
+                        " ".join(tags),
+                        analysis.get('summary') or '',
+                        analysis.get('topics') or '',
+                        analysis.get('article') or '',
+                        transcript,
+                    )
+                )
+                for start, text in windows:
+                    segment_id = conn.execute(
+                        "INSERT INTO segments (video_id, start) VALUES (?, ?)", (video_id, start)
+                    ).lastrowid
+                    conn.execute("INSERT INTO segments_fts (rowid, text) VALUES (?, ?)", (segment_id, text))
+            return {'success': True, 'error': None}
+        except Exception as e:
+            return {'success': False, 'error': f'Falha ao indexar vídeo: {e}'}
+
+    @staticmethod
+    def _delete_text(conn: sqlite3.Connection, video_id: str) -> None:
+        """Remove o texto indexado de um vídeo (os índices FTS são apagados por rowid)"""
+        conn.execute("DELETE FROM documents_fts WHERE rowid IN (SELECT id FROM documents WHERE video_id = ?)", (video_id,))
+        conn.execute("DELETE FROM documents WHERE video_id = ?", (video_id,))
+        conn.execute("DELETE FROM segments_fts WHERE rowid IN (SELECT id FROM segments WHERE video_id = ?)", (video_id,))
+        conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+
+    @staticmethod
+    def _fts_query(query: str, phrase: bool = False) -> str:
+        """
+        Converte a busca do usuário em uma expressão FTS5 segura
+
+        Termos entre aspas viram frases; os demais são exigidos individualmente.
+        """
+        if phrase:
+            return '"' + query.replace('"', '""') + '"'
+        terms = []
+        for quoted, word in _TERM_RE.findall(query):
+            term = (quoted or word).replace('"', '""')
+            terms.append(f'"{term}"')
+        return " ".join(terms)
+
+    @profiled
+    def search(
+        self,
+        query: str,
+        channel: Optional[str] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        date_from: Optional[Union[str, date]] = None,
+        date_to: Optional[Union[str, date]] = None,
+        phrase: bool = False,
+        limit: int = 20,
+        hits_per_video: int = 3
+        ) -> Dict[str, any]:
+        """
+        Busca vídeos por palavra-chave ou frase
+
+        Args:
+            query: Texto buscado (use aspas para frases)
+            channel: Filtra por canal
+            category: Filtra por categoria
+            tag: Filtra por tag
+            date_from: Data de publicação mínima (YYYY-MM-DD)
+            date_to: Data de publicação máxima (YYYY-MM-DD)
+            phrase: Trata a busca inteira como uma frase
+            limit: Número máximo de vídeos
+            hits_per_video: Máximo de trechos com timestamp por vídeo
+
+        Returns:
+            Dict com 'success', 'results' e 'error'. Cada resultado traz os
+            metadados do vídeo, 'snippet' e 'hits' (lista de 'start' e 'text')
+        """
+        fts_query = self._fts_query(query.strip(), phrase=phrase)
+        if not fts_query:
+            return {'success': True, 'results': [], 'error': None}
+
+        filters, params = [], [fts_query]
+        if channel:
+            filters.append("v.channel = ?")
+            params.append(channel)
+        if category:
+            filters.append("v.category = ?")
+            params.append(category)
+        if tag:
+            filters.append("EXISTS (SELECT 1 FROM json_each(v.tags) WHERE lower(value) = lower(?))")
+            params.append(tag)
+        if date_from:
+            filters.append("v.publish_date >= ?")
+            params.append(str(date_from))
+        if date_to:
+            filters.append("v.publish_date <= ?")
+            params.append(str(date_to))
+        where = "".join(f" AND {condition}" for condition in filters)
+        params.append(limit)
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT v.*,
+                           snippet(documents_fts, -1, '**', '**', '…', 16) AS snippet,
+                           bm25(documents_fts, 8.0, 4.0, 3.0, 2.0, 1.0, 1.0) AS score
+                    FROM documents_fts
+                    JOIN documents d ON d.id = documents_fts.rowid
+                    JOIN videos v ON v.video_id = d.video_id
+                    WHERE documents_fts MATCH ?{where}
+                    ORDER BY score
+                    LIMIT ?
+                    """,
+                    params
+                ).fetchall()
+                hits = self._hits(conn, fts_query, [row['video_id'] for row in rows], hits_per_video)
+
+                results = []
+                for row in rows:
+                    result = dict(row)
+                    result['tags'] = json.loads(result['tags'] or '[]')
+                    result['hits'] = hits.get(row['video_id'], [])
+                    results.append(result)
+
+            return {'success': True, 'results': results, 'error': None}
+        except Exception as e:
+            return {'success': False, 'results': [], 'error': f'Falha na busca: {e}'}
+
+    @staticmethod
+    def _hits(
+        conn: sqlite3.Connection,
+        fts_query: str,
+        video_ids: List[str],
+        per_video: int
+        ) -> Dict[str, List[Dict[str, any]]]:
+        """Melhores trechos com timestamp de cada vídeo, para todos os resultados de uma vez"""
+        if not video_ids:
+            return {}
+        placeholders = ", ".join("?" * len(video_ids))
+        # snippet() não pode ser usado junto de funções de janela: primeiro escolhe os trechos, depois os destaca
+        best = conn.execute(
+            f"""
+            SELECT id FROM (
+                SELECT s.id, row_number() OVER (PARTITION BY s.video_id ORDER BY segments_fts.rank) AS position
+                FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid
+                WHERE segments_fts MATCH ? AND s.video_id IN ({placeholders})
+            )
+            WHERE position <= ?
+            """,
+            [fts_query, *video_ids, per_video]
+        ).fetchall()
+        if not best:
+            return {}
+        rows = conn.execute(
+            f"""
+            SELECT s.video_id, s.start, snippet(segments_fts, 0, '**', '**', '…', 24) AS text
+            FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid
+            WHERE segments_fts MATCH ? AND segments_fts.rowid IN ({", ".join("?" * len(best))})
+            ORDER BY s.video_id, segments_fts.rank
+            """,
+            [fts_query, *(row['id'] for row in best)]
+        )
+        hits: Dict[str, List[Dict[str, any]]] = {}
+        for row in rows:
+            hits.setdefault(row['video_id'], []).append({'start': row['start'], 'text': row['text']})
+        return hits
+
+    def channels(self) -> List[str]:
+        """Canais presentes na biblioteca, para filtros"""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT channel FROM videos WHERE channel IS NOT NULL ORDER BY channel"
+            )]
+
+    def remove_video(self, video_id: str) -> None:
+        """Remove um vídeo da biblioteca"""
+        with self._connect() as conn:
+            self._delete_text(conn, video_id)
+            conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
@@ -2,10 +2,34 @@
 Serviço para processamento de transcrições usando diferentes modelos de LLMs
 """
 
+import hashlib
 import os
-from typing import Dict, Optional
+import re
+import threading
+import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Union
 from dotenv import load_dotenv
 
+from configs.ollama_config import (
+	OLLAMA_BASE_URL,
+	OLLAMA_KEEP_ALIVE,
+	OLLAMA_NUM_THREAD,
+	OLLAMA_PRELOAD_TIMEOUT,
+)
+from configs.prompts import ARTICLE_LENGTH_HINTS
+from configs.timeout_config import LLM_MAX_RETRIES, LLM_REQUEST_TIMEOUT
+from configs.translation_config import TRANSLATION_EXPANSION
+from .deadline import Cancelled, Deadline, DeadlineExceeded, run_with_deadline
+from .embedding_service import EmbeddingService
+from .profiler import profiled, propagate
+from .prompt_registry import PROMPTS, PromptTemplate
+from .scheduler import LLMScheduler
+from .token_budget import TokenCounter, add_usage, usage_summary
+from .token_budget import context_window as _context_window
+from .translation_service import language_name
+
 try:
 	from langchain_community.llms import Ollama
 	from langchain_community.llms import HuggingFaceHub
@@ -26,20 +50,56 @@ class LLMService:
 		'huggingface':'huggingface',
 	}
 
+	DEFAULT_MODELS = {
+		'openai':'gpt-3.5-turbo',
+		'ollama':'phi3',
+		'groq':'llama-3.3-70b-versatile',
+		'huggingface':'phi3',
+	}
+
+	# provedor de embeddings usado com cada provedor de LLM (Groq/HF: modelo local)
+	EMBEDDING_PROVIDERS = {
+		'openai':'openai',
+		'ollama':'ollama',
+		'groq':'local',
+		'huggingface':'local',
+	}
+
+	# folga (tokens) para instruções extras que os métodos somam ao template
+	PROMPT_MARGIN = 256
+
 	def __init__(
 		self,
 		provider:str = 'openai',
 		model_name:Optional[str]=None,
 		api_key:Optional[str]=None,
 		temperature:float = 0.7,
-		max_tokens:int = 1000,):
+		max_tokens:int = 1000,
+		timeout:Optional[float] = LLM_REQUEST_TIMEOUT,
+		deadline:Optional[Deadline] = None,
+		priority:str = 'analysis',  # 'chat'|'analysis'|'batch'
+		tenant:Optional[str] = None,
+		context_window:Optional[int] = None,):  # None = janela conhecida do modelo
 
 		self.provider = provider.lower()
 		self.model_name = model_name
 		self.temperature = temperature
 		self.max_tokens = max_tokens
+		self.timeout = timeout
+		self.deadline = deadline  # prazo da requisição; `generate` desiste quando acaba ou é cancelado
+		self.priority = priority
+		self.tenant = tenant
+		self.scheduler = LLMScheduler.for_provider(self.provider)
 		self.api_key = self._get_api_key(provider=provider, provided_key=api_key)
-		self.llm = self._initialize_llm()
+		self.model = model_name or self.DEFAULT_MODELS.get(self.provider)
+		self.token_counter = TokenCounter(self.provider, self.model)
+		self.context_window = context_window or _context_window(self.provider, self.model)
+		self.usage_total = {}
+		self._usage_lock = threading.Lock()
+		self._condensed = {}  # hash da transcrição -> notas do map
+		self._static_tokens = {}  # versão do template -> tokens do texto fixo
+		self.llm = self._initialize_llm(self.timeout, LLM_MAX_RETRIES)
+		self._own_llm = self.llm  # com prazo, `generate` recria este cliente a cada chamada
 
 	def _get_api_key(
 		self,
@@ -63,34 +123,47 @@ class LLMService:
 
 		return provided_key
 
-	def _initialize_llm(self):
-		""" Inicializa o modelo LLM no provedor escolhido"""
+	def _initialize_llm(self, timeout:Optional[float], max_retries:int):
+		""" Inicializa o modelo LLM no provedor escolhido, com o timeout e as tentativas dados"""
 
 		try:
 			if self.provider=='openai':
 				if not self.api_key: raise ValueError("Requer API KEY OpenAI")
-				model = self.model_name or 'gpt-3.5-turbo'
+				model = self.model
 				return ChatOpenAI(
 					model = model,
 					temperature = self.temperature,
 					max_tokens = self.max_tokens,
-					api_key = self.api_key
+					api_key = self.api_key,
+					timeout = timeout,
+					max_retries = max_retries
 					)
 			elif self.provider=='ollama':
-				model = self.model_name or 'phi3'
-				return Ollama(model=model, temperature=self.temperature)
+				model = self.model
+				return Ollama(
+					model=model,
+					base_url=OLLAMA_BASE_URL,
+					temperature=self.temperature,
+					timeout=timeout,
+					keep_alive=OLLAMA_KEEP_ALIVE,  # mantém o modelo carregado entre chamadas
+					num_ctx=self.context_window,  # mesma janela usada no orçamento de tokens
+					num_predict=self.max_tokens,
+					num_thread=OLLAMA_NUM_THREAD
+					)
 			elif self.provider=='groq':
 				if not self.api_key:raise ValueError("Requer API KEY Groq")
-				model = self.model_name or 'llama-3.3-70b-versatile'
+				model = self.model
 				return ChatGroq(
 					model=model,
 					temperature=self.temperature,
 					max_tokens=self.max_tokens,
-					api_key=self.api_key
+					api_key=self.api_key,
+					timeout=timeout,
+					max_retries=max_retries
 					)
 			elif self.provider=='huggingface':
 				if not self.api_key:raise ValueError("Requer API Key Huggingace")
-				model = self.model_name or 'phi3'
+				model = self.model
 				return HuggingFaceHub(
 					repo_id=model,
 					model_kwargs={
@@ -104,42 +177,483 @@ class LLMService:
 		except Exception as e:
 			raise Exception(f"Falha ao iniciar LLM: {e}")
 
+	def _client_for_call(self):
+		"""
+		Cliente da próxima chamada, com timeout e tentativas que cabem no prazo
+
+		O cliente padrão espera até `timeout` por tentativa, com LLM_MAX_RETRIES
+		tentativas extras; uma chamada abandonada prenderia a thread do runner
+		e a vaga no provedor por minutos depois do fim do prazo.
+
+		Returns:
+			(cliente, True se o cliente foi criado só para esta chamada)
+		"""
+
+		remaining = self.deadline.remaining() if self.deadline is not None else None
+		if remaining is None or self.llm is not self._own_llm or self.provider == 'huggingface':
+			return self.llm, False
+		timeout = self.deadline.timeout(self.timeout)
+		# cada tentativa extra precisa de um timeout inteiro dentro do prazo
+		retries = max(0, min(LLM_MAX_RETRIES, int(remaining // timeout) - 1)) if timeout else 0
+		return self._initialize_llm(timeout, retries), True
+
+	@staticmethod
+	def _close_client(client) -> None:
+		""" Fecha as conexões HTTP de um cliente, interrompendo a chamada em curso """
+
+		# OpenAI guarda o cliente em `root_client`; Groq, no `_client` do recurso de completions
+		for http in (getattr(client, 'root_client', None), getattr(getattr(client, 'client', None), '_client', None)):
+			if hasattr(http, 'close'):
+				try:
+					http.close()
+				except Exception:
+					pass
+
+	def embedding_service(self, offline:bool = True, **kwargs) -> EmbeddingService:
+		"""
+		Cria o serviço de embeddings correspondente a este provedor
+
+		Args:
+			offline: Usa sempre o modelo local (sentence-transformers), sem rede
+			**kwargs: Repassados para EmbeddingService (batch_size, storage_dtype...)
+
+		Returns:
+			EmbeddingService configurado
+		"""
+
+		provider = 'local' if offline else self.EMBEDDING_PROVIDERS.get(self.provider, 'local')
+		api_key = self.api_key if provider == 'openai' else None
+		return EmbeddingService(provider=provider, api_key=api_key, **kwargs)
+
+	def template(self, name:str) -> PromptTemplate:
+		"""Template registrado, na variante do provedor atual se houver"""
+		return PROMPTS.get(name, self.provider)
+
+	def prompt_version(self, names:Iterable[str]) -> str:
+		"""Versão combinada dos templates usados, para chaves de cache de resultados"""
+		return PROMPTS.version(names, self.provider)
+
+	@staticmethod
+	def _as_template(prompt_template:Union[str, PromptTemplate]) -> PromptTemplate:
+		if isinstance(prompt_template, PromptTemplate):
+			return prompt_template
+		return PROMPTS.compile(prompt_template)
+
+	def count_tokens(self, text:str) -> int:
+		""" Conta os tokens de um texto para o modelo configurado """
+
+		return self.token_counter.count(text)
+
+	@profiled
 	def generate(self, prompt:str) -> Dict[str, any]:
 		""" Gera texto usando LLM """
 
+		prompt_tokens = self.count_tokens(prompt)
+		if prompt_tokens + self.max_tokens > self.context_window:
+			# evita pagar por uma chamada que o provedor vai recusar
+			return {
+			'success':False,
+			'text': None,
+			'usage': None,
+			'error':(
+				f"Prompt excede a janela de contexto do modelo {self.model}: "
+				f"{prompt_tokens} + {self.max_tokens} tokens > {self.context_window}"
+			)
+			}
+
 		try:
-			if hasattr(self.llm, 'invoke'):
-				response = self.llm.invoke(prompt)
+			usage = None
+			# espera a vez na fila do provedor (prioridade da instância, justa entre tenants)
+			# a vaga só volta quando a chamada termina, não quando o prazo desiste dela
+			release = self.scheduler.acquire(self.priority, self.tenant, cost=prompt_tokens / 1000, deadline=self.deadline)
+			try:
+				client, per_call = self._client_for_call()
+			except Exception:
+				release()
+				raise
+			if self.provider == 'ollama':
+				# resposta completa do Ollama: traz contagens reais e tempos de geração
+				call = lambda text: client.generate([text])
+			else:
+				call = client.invoke if hasattr(client, 'invoke') else client
+
+			def finished():
+				if per_call:
+					self._close_client(client)
+				release()
+
+			try:
+				response = run_with_deadline(lambda: call(prompt), self.deadline, 'LLM', on_done=finished)
+			except (Cancelled, DeadlineExceeded):
+				if per_call:
+					self._close_client(client)  # a chamada abandonada termina agora, não no timeout
+				raise
+			if self.provider == 'ollama':
+				generation = response.generations[0][0]
+				text = generation.text
+				usage = self._ollama_usage(generation.generation_info, prompt_tokens, text)
+			elif hasattr(self.llm, 'invoke'):
 				text = response.content if hasattr(response, 'content') else str(response)
-			else:text=self.llm(prompt)
+				reported = getattr(response, 'usage_metadata', None)
+				if reported:
+					usage = usage_summary(
+						self.token_counter,
+						reported.get('input_tokens', prompt_tokens),
+						reported.get('output_tokens', 0),
+						estimated=False
+						)
+			else:text=response
+			if usage is None:
+				usage = usage_summary(self.token_counter, prompt_tokens, self.count_tokens(text))
+			with self._usage_lock:
+				add_usage(self.usage_total, usage)
 			return {
 			'success':True,
 			'text': text.strip(),
+			'usage': usage,
 			'error':None
 			}
 		except Exception as e:
 			return {
 			'success':False,
 			'text': None,
+			'usage': None,
 			'error':f"Falha ao gerar texto: {e}"
 			}
 
+	def _ollama_usage(self, info:Optional[Dict[str, any]], prompt_tokens:int, text:str) -> Dict[str, any]:
+		""" Uso de uma chamada ao Ollama, com vazão (tokens/s) e tempo de carga do modelo """
+
+		info = info or {}
+		usage = usage_summary(
+			self.token_counter,
+			info.get('prompt_eval_count', prompt_tokens),  # ausente quando o prompt já estava em cache
+			info['eval_count'] if 'eval_count' in info else self.count_tokens(text),
+			estimated='eval_count' not in info
+			)
+		generation_seconds = (info.get('eval_duration') or 0) / 1e9
+		if generation_seconds:
+			usage['generation_seconds'] = generation_seconds
+			usage['tokens_per_second'] = usage['completion_tokens'] / generation_seconds
+		# carga > 0 indica que o modelo estava descarregado (partida a frio)
+		usage['load_seconds'] = (info.get('load_duration') or 0) / 1e9
+		return usage
+
+	def generate_many(self, prompts:List[str]) -> List[Dict[str, any]]:
+		"""
+		Gera respostas para prompts independentes ao mesmo tempo
+
+		As chamadas passam pela fila do provedor, que limita quantas rodam
+		juntas (no Ollama, OLLAMA_NUM_PARALLEL: o servidor processa as
+		requisições simultâneas em lote).
+
+		Args:
+			prompts: Prompts independentes entre si
+
+		Returns:
+			Resultados de `generate`, na ordem dos prompts
+		"""
+
+		if len(prompts) <= 1:
+			return [self.generate(prompt) for prompt in prompts]
+		with ThreadPoolExecutor(max_workers=min(len(prompts), self.scheduler.max_concurrent)) as executor:
+			futures = [executor.submit(propagate(self.generate), prompt) for prompt in prompts]
+			return [future.result() for future in futures]
+
+	def run_parallel(self, tasks:Dict[str, Callable[[], Dict[str, any]]]) -> Dict[str, Dict[str, any]]:
+		"""
+		Executa etapas independentes (ex.: resumo, tópicos e artigo) ao mesmo tempo
+
+		Args:
+			tasks: Nome -> função sem argumentos que retorna o dict da etapa
+
+		Returns:
+			Nome -> resultado da etapa
+		"""
+
+		with ThreadPoolExecutor(max_workers=max(1, min(len(tasks), self.scheduler.max_concurrent))) as executor:
+			futures = {name: executor.submit(propagate(task)) for name, task in tasks.items()}
+			return {name: future.result() for name, future in futures.items()}
+
+	@staticmethod
+	def preload_ollama(model:Optional[str] = None, keep_alive:Union[str, int] = OLLAMA_KEEP_ALIVE) -> Dict[str, any]:
+		"""
+		Carrega o modelo na memória do Ollama antes da primeira chamada
+
+		Um pedido sem prompt só carrega o modelo e renova o `keep_alive`.
+
+		Args:
+			model: Modelo (padrão: DEFAULT_MODELS['ollama'])
+			keep_alive: Tempo que o modelo fica carregado
+
+		Returns:
+			Dict com 'success', 'load_seconds' e 'error'
+		"""
+
+		try:
+			response = requests.post(
+				f"{OLLAMA_BASE_URL}/api/generate",
+				json={'model':model or LLMService.DEFAULT_MODELS['ollama'], 'keep_alive':keep_alive},
+				timeout=OLLAMA_PRELOAD_TIMEOUT
+				)
+			response.raise_for_status()
+			load_seconds = (response.json().get('load_duration') or 0) / 1e9
+			return {'success':True, 'load_seconds':load_seconds, 'error':None}
+		except Exception as e:
+			return {'success':False, 'load_seconds':None, 'error':f"Falha ao pré-carregar modelo: {e}"}
+
+	def transcript_budget(self, prompt_template:Union[str, PromptTemplate]) -> int:
+		"""
+		Calcula quantos tokens de transcrição cabem em um template
+
+		Args:
+			prompt_template: Template (registrado ou texto) com espaço reservado `{transcript}`
+
+		Returns:
+			Tokens disponíveis para a transcrição
+		"""
+
+		template = self._as_template(prompt_template)
+		template_tokens = self._static_tokens.get(template.version)
+		if template_tokens is None:
+			template_tokens = self.count_tokens(template.static_text)
+			self._static_tokens[template.version] = template_tokens
+		return self.context_window - self.max_tokens - template_tokens - self.PROMPT_MARGIN
+
+	@profiled
+	def fit_transcript(
+		self,
+		transcript:str,
+		prompt_template:Union[str, PromptTemplate],
+		strategy:str = 'chunk'  # 'chunk'|'clip'
+		) -> Dict[str, any]:
+		"""
+		Ajusta a transcrição à janela de contexto antes da chamada.
+
+		Transcrições que cabem são devolvidas intactas. As maiores são
+		condensadas em partes (map) cujo resultado substitui o texto original,
+		ou simplesmente cortadas quando `strategy='clip'`.
+
+		Args:
+			transcript: Texto da transcrição
+			prompt_template: Template que receberá a transcrição
+			strategy: 'chunk' para condensar em partes, 'clip' para cortar
+
+		Returns:
+			Dict com 'transcript', 'strategy' ('full'|'chunked'|'clipped'),
+			'original_tokens' e 'tokens'
+		"""
+
+		budget = self.transcript_budget(prompt_template)
+		if budget <= 0:
+			raise ValueError(f"Template não cabe na janela de contexto de {self.model}")
+
+		original_tokens = self.count_tokens(transcript)
+		if original_tokens <= budget:
+			return {'transcript':transcript, 'strategy':'full', 'original_tokens':original_tokens, 'tokens':original_tokens}
+
+		fitted = None
+		applied = 'clipped'
+		if strategy == 'chunk':
+			fitted = self.condense_transcript(transcript, budget)
+			applied = 'chunked'
+		if fitted is None or self.count_tokens(fitted) > budget:
+			fitted = self.token_counter.clip(fitted or transcript, budget)
+
+		return {
+			'transcript':fitted,
+			'strategy':applied,
+			'original_tokens':original_tokens,
+			'tokens':self.count_tokens(fitted)
+		}
+
+	def translation_budget(self) -> int:
+		"""Tokens de texto por parte da tradução: cabem no prompt e a tradução cabe em `max_tokens`"""
+
+		return max(1, min(self.transcript_budget(self.template('translate')), int(self.max_tokens / TRANSLATION_EXPANSION)))
+
+	@profiled
+	def translate_chunks(
+		self,
+		chunks:List[str],
+		target_language:str,
+		source_language:Optional[str] = None
+		) -> Dict[str, any]:
+		"""
+		Traduz partes independentes de um texto, todas ao mesmo tempo
+
+		Cada parte deve caber em `translation_budget()` tokens.
+
+		Args:
+			chunks: Partes do texto, em ordem
+			target_language: Código do idioma de destino (ex.: 'pt-BR')
+			source_language: Código do idioma original (None = desconhecido)
+
+		Returns:
+			Dict com 'success', 'chunks' (traduções, na ordem das partes) e 'error'
+		"""
+
+		template = self.template('translate')
+		results = self.generate_many([
+			template.render(
+				source_language=language_name(source_language),
+				target_language=language_name(target_language),
+				transcript=chunk
+				)
+			for chunk in chunks
+		])
+		failed = next((result for result in results if not result['success']), None)
+		if failed is not None:
+			return {'success':False, 'chunks':None, 'error':f"Falha na tradução: {failed['error']}"}
+		return {'success':True, 'chunks':[result['text'].strip() for result in results], 'error':None}
+
+	def condense_transcript(self, transcript:str, budget:int) -> Optional[str]:
+		"""
+		Condensa uma transcrição longa resumindo cada parte separadamente
+
+		Args:
+			transcript: Texto da transcrição
+			budget: Tokens que o resultado deve ocupar no prompt final
+
+		Returns:
+			Notas concatenadas das partes, ou None se alguma parte falhar
+		"""
+
+		key = self._transcript_key(transcript)
+		if key in self._condensed:
+			return self._condensed[key]
+
+		chunk_template = self.template('chunk_summary')
+		chunk_budget = self.transcript_budget(chunk_template)
+		chunks = self.token_counter.split(transcript, chunk_budget)
+		# partes independentes: vão juntas para o provedor
+		results = self.generate_many([
+			chunk_template.render(part=index, total=len(chunks), transcript=chunk)
+			for index, chunk in enumerate(chunks, start=1)
+		])
+		if not all(result['success'] for result in results):
+			return None
+		self._condensed[key] = "\n\n".join(result['text'] for result in results)
+		return self._condensed[key]
+
+	def _transcript_key(self, transcript:str) -> str:
+		# notas dependem também da versão do template do map
+		digest = hashlib.sha1(transcript.encode("utf-8")).hexdigest()
+		return f"{digest}:{self.template('chunk_summary').version}"
+
+	@profiled
+	def condense_stream(
+		self,
+		pieces:Iterable[str],
+		prompt_template:Union[str, PromptTemplate],
+		max_in_flight:int = 2
+		) -> Dict[str, any]:
+		"""
+		Condensa a transcrição enquanto ela ainda está sendo baixada.
+
+		As partes são agrupadas até o tamanho do map e enviadas ao LLM assim
+		que a transcrição passa do que cabe em `prompt_template`; vídeos curtos
+		não geram chamadas. Com `max_in_flight` partes em andamento, o consumo de
+		`pieces` pausa até uma delas terminar, segurando também o download. As
+		notas ficam guardadas e são reaproveitadas por `fit_transcript`.
+
+		Args:
+			pieces: Textos da transcrição em ordem (ex.: de `YouTubeService.stream_transcript`)
+			prompt_template: Template final que receberá a transcrição
+			max_in_flight: Partes enviadas ao LLM ao mesmo tempo
+
+		Returns:
+			Dict com 'success', 'transcript' (texto completo), 'notes' (None se não
+			foi preciso condensar), 'parts' e 'error'
+		"""
+
+		threshold = self.transcript_budget(prompt_template)
+		chunk_template = self.template('chunk_summary')
+		chunk_budget = self.transcript_budget(chunk_template)
+		texts, ready, notes = [], [], []
+		pending = deque()
+		current, current_tokens, total_tokens = [], 0, 0
+		error = None
+
+		def collect(future) -> None:
+			nonlocal error
+			result = future.result()
+			if result['success']:
+				notes.append(result['text'])
+			elif error is None:
+				error = result['error']
+
+		def flush() -> None:
+			# só começa o map quando a transcrição já não cabe no template final
+			if total_tokens <= threshold or error is not None:
+				return
+			while ready:
+				if len(pending) >= max_in_flight:
+					collect(pending.popleft())
+				part = len(notes) + len(pending) + 1
+				prompt = chunk_template.render(part=part, total='?', transcript=ready.pop(0))
+				pending.append(executor.submit(propagate(self.generate), prompt))
+
+		with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+			try:
+				for piece in pieces:
+					texts.append(piece)
+					tokens = self.count_tokens(piece)
+					total_tokens += tokens
+					if current and current_tokens + tokens > chunk_budget:
+						ready.append(" ".join(current))
+						current, current_tokens = [], 0
+					if tokens > chunk_budget:
+						ready.extend(self.token_counter.split(piece, chunk_budget))
+					else:
+						current.append(piece)
+						current_tokens += tokens
+					flush()
+				if current:
+					ready.append(" ".join(current))
+				flush()
+				while pending:
+					collect(pending.popleft())
+			except Exception as e:
+				for future in pending:
+					future.cancel()
+				return {'success':False, 'transcript':None, 'notes':None, 'parts':0, 'error':f"Falha ao ler a transcrição: {e}"}
+
+		transcript = " ".join(texts)
+		if error is not None:
+			return {'success':False, 'transcript':transcript, 'notes':None, 'parts':0, 'error':error}
+		if not notes:
+			return {'success':True, 'transcript':transcript, 'notes':None, 'parts':0, 'error':None}
+
+		self._condensed[self._transcript_key(transcript)] = "\n\n".join(notes)
+		return {
+			'success':True,
+			'transcript':transcript,
+			'notes':self._condensed[self._transcript_key(transcript)],
+			'parts':len(notes),
+			'error':None
+		}
+
+	@profiled
 	def generate_summary(
 		self, 
 		transcript:str,
-		prompt_template:str
+		prompt_template:Union[str, PromptTemplate]
 		) -> Dict[str, any]:
 
 		"""Gera um resumo da trancrição"""
 
 		try:
-			prompt = prompt_template.format(transcript=transcript)
+			fitted = self.fit_transcript(transcript, prompt_template)
+			prompt = self._as_template(prompt_template).render(transcript=fitted['transcript'])
 			result = self.generate(prompt)
 
 			if result['success']:
 				return {
 					'success':True,
 					'summary': result['text'],
+					'usage': result['usage'],
+					'fit': fitted['strategy'],
 					'error':None
 				}
 			else:return result
@@ -150,22 +664,26 @@ class LLMService:
 				'error': f'Falha ao gerar sumario: {e}'
 			}
 	
+	@profiled
 	def extract_topics(
 		self,
 		transcript:str,
-		prompt_template:str
+		prompt_template:Union[str, PromptTemplate]
 		) -> Dict[str, any]:
 
 		""" Extrai tópicos chave da trancrição """
 
 		try:
-			prompt = prompt_template.format(transcript=transcript)
+			fitted = self.fit_transcript(transcript, prompt_template)
+			prompt = self._as_template(prompt_template).render(transcript=fitted['transcript'])
 			result = self.generate(prompt)
 
 			if result['success']:
 				return {
 					'success':True,
 					'topics': result['text'],
+					'usage': result['usage'],
+					'fit': fitted['strategy'],
 					'error':None
 				}
 			else:return result
@@ -176,11 +694,58 @@ class LLMService:
 				'error': f'Falha ao extrair tópicos: {e}'
 			}
 
+	@profiled
+	def title_chapters(
+		self,
+		chapters:List[Dict[str, any]],
+		prompt_template:Union[str, PromptTemplate]
+		) -> Dict[str, any]:
+		"""
+		Gera título e descrição para capítulos detectados localmente.
+
+		Só um trecho curto de cada capítulo vai no prompt, em uma única chamada.
+
+		Args:
+			chapters: Capítulos de `segment_chapters` (usa 'excerpt')
+			prompt_template: Template com espaço reservado `{chapters}`
+
+		Returns:
+			Dict com 'success', 'chapters' (com 'title' e 'description'), 'usage' e 'error'
+		"""
+
+		try:
+			if not chapters:
+				return {'success': False, 'chapters': None, 'usage': None, 'error': 'Nenhum capítulo'}
+
+			listing = "\n\n".join(
+				f"{index}. {chapter['excerpt']}" for index, chapter in enumerate(chapters, start=1)
+			)
+			result = self.generate(self._as_template(prompt_template).render(chapters=listing))
+			if not result['success']:
+				return {'success': False, 'chapters': None, 'usage': None, 'error': result['error']}
+
+			titles = {}
+			for line in result['text'].splitlines():
+				match = re.match(r"^\s*[-*]?\s*(\d+)[.):-]\s*(.+)$", line)
+				if match:
+					title, _, description = match.group(2).partition(':')
+					titles[int(match.group(1))] = (title.strip(' *'), description.strip())
+
+			titled = []
+			for index, chapter in enumerate(chapters, start=1):
+				title, description = titles.get(index, (f"Capítulo {index}", ""))
+				titled.append({**chapter, 'title': title, 'description': description})
+
+			return {'success': True, 'chapters': titled, 'usage': result['usage'], 'error': None}
+		except Exception as e:
+			return {'success': False, 'chapters': None, 'usage': None, 'error': f'Falha ao titular capítulos: {e}'}
+
+	@profiled
 	def generate_article(
 		self,
 		transcript: str,
 		title: Optional[str]=None,
-		prompt_template: Optional[str]=None,
+		prompt_template: Optional[Union[str, PromptTemplate]]=None,
 		length: str = 'medium'  # 'short'|'medium'|'long'
 		) -> Dict[str, any]:
 		"""
@@ -200,27 +765,17 @@ class LLMService:
 			if not transcript or transcript.strip() == '':
 				return {'success': False, 'article': None, 'error': 'Transcript vazio'}
 
-			# Prompt padrão
-			default_prompt = (
-				"Escreva um artigo bem estruturado com base na transcrição abaixo. "
-				"Inclua uma introdução, subtítulos quando apropriado e uma conclusão. "
-				"Use um tom informativo e claro.\n\nTranscrição:\n{transcript}\n\n" 
-			)
-
 			# Ajusta extensão esperada
-			if length == 'short':
-				length_hint = 'Escreva um artigo curto, aproximando-se de 150-300 palavras.'
-			elif length == 'long':
-				length_hint = 'Escreva um artigo longo e detalhado, aproximando-se de 800-1200 palavras.'
-			else:
-				length_hint = 'Escreva um artigo de média extensão, aproximando-se de 400-700 palavras.'
-
-			# Constrói o prompt final
-			prompt_base = prompt_template or default_prompt
-			if title:
-				prompt_full = f"Escreva um artigo em português pt-BR intitulado '{title}'. {length_hint}\n\n" + prompt_base.format(transcript=transcript, title=title)
-			else:
-				prompt_full = length_hint + "\n\n" + prompt_base.format(transcript=transcript, title="")
+			length_hint = ARTICLE_LENGTH_HINTS.get(length, ARTICLE_LENGTH_HINTS['medium'])
+
+			# Constrói o prompt final (templates padrão e cabeçalho vêm do registro)
+			prompt_base = self._as_template(prompt_template) if prompt_template else self.template('article_default')
+			header = self.template('article_header_titled' if title else 'article_header')
+			transcript = self.fit_transcript(transcript, prompt_base)['transcript']
+			prompt_full = (
+				header.render(title=title or "", length_hint=length_hint)
+				+ prompt_base.render(transcript=transcript, title=title or "")
+			)
 
 			# Gera com o LLM
 			result = self.generate(prompt_full)
@@ -236,7 +791,7 @@ class LLMService:
 					# garantir que comece com letra maiúscula após limpeza
 					if len(clean) > 0:
 						clean = clean[0].upper() + clean[1:]
-					return {'success': True, 'article': clean, 'error': None}
+					return {'success': True, 'article': clean, 'usage': result['usage'], 'error': None}
 			else:
 				return result
 
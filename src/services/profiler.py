@@ -0,0 +1,356 @@
+"""
+Profiling dos reruns da interface: tempo de cada rerun e de cada chamada de serviço,
+com pilhas amostradas no formato colapsado dos flame graphs
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from configs.profiling_config import PROFILE_DIR, PROFILE_INTERVAL_SECONDS, PROFILE_KEEP
+
+# rerun em andamento no contexto atual (thread do script ou tarefa propagada com `propagate`)
+_current: contextvars.ContextVar = contextvars.ContextVar('tubetalk_profile', default=None)
+
+_SRC_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+
+
+@functools.lru_cache(maxsize=2048)
+def _short_path(filename: str) -> str:
+    if filename.startswith(_SRC_ROOT):
+        return filename[len(_SRC_ROOT):]
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def _caller(frame):
+    """Primeiro frame fora do contextlib e dos geradores de gerenciadores de contexto"""
+    while frame is not None and (
+        frame.f_code.co_flags & inspect.CO_GENERATOR or frame.f_code.co_filename == contextlib.__file__
+    ):
+        frame = frame.f_back
+    return frame
+
+
+def _depth(frame) -> int:
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def _collapse(frame, skip: int, prefix: Optional[str]) -> str:
+    """Pilha da raiz para a folha, sem os `skip` frames de cima; cada frame com a linha em execução"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename == __file__:
+            # wrappers de `profiled` (contam em `skip`, mas não aparecem)
+            names.append(None)
+            frame = frame.f_back
+            continue
+        names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    names.reverse()
+    names = [name for name in names[skip:] if name is not None]
+    if prefix:
+        names.insert(0, prefix)
+    return ";".join(names)
+
+
+class RerunProfile:
+    """Medições de um rerun: tempo total, tempo por chamada de serviço e pilhas amostradas"""
+
+    def __init__(self, rerun_id: int, label: str = "", session: Optional[str] = None):
+        self.rerun_id = rerun_id
+        self.label = label
+        self.session = session
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.exit: Optional[str] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.spans: Dict[str, List] = {}  # nome -> [chamadas, segundos]
+        self.folded_path: Optional[Path] = None
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_sample(self, stack: str) -> None:
+        with self._lock:
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def add_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.spans.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def finish(self, exit: str) -> None:
+        self.duration = time.perf_counter() - self._started
+        self.exit = exit
+
+    def top_spans(self, limit: int = 5) -> List[Dict[str, any]]:
+        """Chamadas com mais tempo acumulado (tempo inclusivo: spans aninhados se sobrepõem)"""
+        with self._lock:
+            ranked = sorted(self.spans.items(), key=lambda item: -item[1][1])[:limit]
+        return [{'name': name, 'calls': calls, 'seconds': seconds} for name, (calls, seconds) in ranked]
+
+    def folded(self) -> str:
+        """Pilhas colapsadas ('raiz;...;folha contagem'), entrada do flamegraph.pl/speedscope"""
+        with self._lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def to_dict(self) -> Dict[str, any]:
+        with self._lock:
+            spans = {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.spans.items()}
+        return {
+            'rerun_id': self.rerun_id,
+            'label': self.label,
+            'session': self.session,
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'exit': self.exit,
+            'samples': self.samples,
+            'spans': spans,
+            'folded': self.folded_path.name if self.folded_path else None,
+        }
+
+
+class _Sampler:
+    """
+    Uma thread que amostra, a cada intervalo, as pilhas das threads registradas
+
+    Só roda enquanto há algum rerun sendo medido; o custo fica fora das
+    threads medidas, exceto pela disputa do GIL durante a amostragem.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._threads: Dict[int, tuple] = {}  # ident -> (profile, skip, prefixo)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, ident: int, profile: RerunProfile, skip: int, prefix: Optional[str] = None) -> bool:
+        """Passa a amostrar a thread; False se ela já está registrada"""
+        with self._lock:
+            if ident in self._threads:
+                return False
+            self._threads[ident] = (profile, skip, prefix)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rerun-profiler", daemon=True)
+                self._thread.start()
+            return True
+
+    def unregister(self, ident: int) -> None:
+        with self._lock:
+            self._threads.pop(ident, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._threads:
+                    self._thread = None
+                    return
+                targets = list(self._threads.items())
+            frames = sys._current_frames()
+            for ident, (profile, skip, prefix) in targets:
+                frame = frames.get(ident)
+                if frame is not None:
+                    profile.add_sample(_collapse(frame, skip, prefix))
+            del frames
+            time.sleep(self.interval)
+
+
+_sampler = _Sampler(PROFILE_INTERVAL_SECONDS)
+
+
+def profiled(fn: Optional[Callable] = None, *, name: Optional[str] = None):
+    """
+    Mede a chamada como um span do rerun em andamento (sem rerun medido, só chama)
+
+    Numa thread auxiliar (ex.: etapas de `LLMService.run_parallel`), a thread
+    também passa a ser amostrada enquanto a chamada dura.
+
+    Args:
+        fn: Função decorada (uso como `@profiled` ou `@profiled(name=...)`)
+        name: Nome do span (padrão: `Classe.método`)
+    """
+    def decorate(function: Callable) -> Callable:
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None:
+                return function(*args, **kwargs)
+            ident = threading.get_ident()
+            # raiz da pilha amostrada: a própria função medida
+            registered = _sampler.register(ident, profile, _depth(sys._getframe()), f"{label} (thread)")
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.add_span(label, time.perf_counter() - started)
+                if registered:
+                    _sampler.unregister(ident)
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Mede um bloco como span do rerun em andamento"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, time.perf_counter() - started)
+
+
+def current_profile() -> Optional[RerunProfile]:
+    """Rerun medido no contexto atual (None fora de um rerun medido)"""
+    return _current.get()
+
+
+def propagate(fn: Callable) -> Callable:
+    """
+    `fn` rodando em outra thread continua contando para o rerun atual
+
+    Copia o contexto no momento da chamada; cada função retornada deve ser
+    executada uma vez por vez (ex.: uma por `executor.submit`).
+    """
+    context = contextvars.copy_context()
+    return functools.partial(context.run, fn)
+
+
+class RerunProfiler:
+    """
+    Guarda as medições dos reruns do processo e grava tempos e pilhas em disco
+
+    Cada rerun vira uma linha em `reruns.jsonl` e um arquivo `.folded` com
+    as pilhas colapsadas (abra com flamegraph.pl, speedscope ou inferno).
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, keep: int = PROFILE_KEEP):
+        """
+        Inicializa o profiler (o diretório só é criado no primeiro rerun medido)
+
+        Args:
+            directory: Destino dos arquivos (padrão: PROFILE_DIR)
+            keep: Reruns mantidos em memória para os resumos
+        """
+        self.directory = Path(directory or PROFILE_DIR)
+        self._records: deque = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def rerun(self, label: str = "", session: Optional[str] = None) -> Iterator[RerunProfile]:
+        """
+        Mede o bloco como um rerun da thread atual
+
+        `st.rerun()` e `st.stop()` interrompem o script com exceções; o rerun
+        é registrado mesmo assim, com o nome da exceção em `exit`.
+        Um bloco aberto dentro de outro já medido devolve o rerun externo.
+
+        Args:
+            label: Descrição do rerun (pode ser alterada durante o bloco)
+            session: Sessão que disparou o rerun
+        """
+        outer = _current.get()
+        if outer is not None:
+            # bloco aninhado (ex.: fragmento executado dentro do rerun da página): faz parte do rerun externo
+            yield outer
+            return
+        profile = RerunProfile(next(self._ids), label, session)
+        ident = threading.get_ident()
+        # raiz da pilha amostrada: quem abriu o bloco
+        registered = _sampler.register(ident, profile, _depth(_caller(sys._getframe())) - 1)
+        token = _current.set(profile)
+        exit = 'ok'
+        try:
+            yield profile
+        except BaseException as e:
+            exit = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            if registered:
+                _sampler.unregister(ident)
+            profile.finish(exit)
+            self._record(profile)
+
+    def _record(self, profile: RerunProfile) -> None:
+        with self._lock:
+            self._records.append(profile)
+        # falha ao gravar não pode derrubar a página
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(profile.started_at))
+            session = (profile.session or 'default')[:8]
+            profile.folded_path = self.directory / f"{stamp}-{session}-{profile.rerun_id}.folded"
+            profile.folded_path.write_text(profile.folded() + "\n", encoding='utf-8')
+            with open(self.directory / "reruns.jsonl", 'a', encoding='utf-8') as output:
+                output.write(json.dumps(profile.to_dict(), ensure_ascii=False) + "\n")
+        except OSError:
+            profile.folded_path = None
+
+    def records(self, session: Optional[str] = None) -> List[RerunProfile]:
+        """Reruns em memória (de uma sessão ou de todas), do mais antigo ao mais recente"""
+        with self._lock:
+            records = list(self._records)
+        return [record for record in records if session is None or record.session == session]
+
+    def slowest(self, limit: int = 10, session: Optional[str] = None) -> List[RerunProfile]:
+        """Reruns mais lentos"""
+        return sorted(self.records(session), key=lambda record: -record.duration)[:limit]
+
+    def span_totals(self, session: Optional[str] = None) -> List[Dict[str, any]]:
+        """
+        Tempo acumulado por chamada em todos os reruns em memória
+
+        Returns:
+            Lista ordenada por tempo, com 'name', 'calls', 'seconds' e 'mean'
+        """
+        totals: Dict[str, List] = {}
+        for record in self.records(session):
+            for name, values in record.to_dict()['spans'].items():
+                entry = totals.setdefault(name, [0, 0.0])
+                entry[0] += values['calls']
+                entry[1] += values['seconds']
+        return [
+            {'name': name, 'calls': calls, 'seconds': seconds, 'mean': seconds / calls}
+            for name, (calls, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])
+        ]
+
+    def folded(self, session: Optional[str] = None) -> str:
+        """Pilhas colapsadas somadas de todos os reruns em memória"""
+        stacks: Counter = Counter()
+        for record in self.records(session):
+            with record._lock:
+                stacks.update(record.stacks)
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
@@ -0,0 +1,182 @@
+"""
+Registro de templates de prompt: compilados uma vez, validados na carga e versionados
+"""
+
+import hashlib
+import threading
+from string import Formatter
+from typing import Dict, Iterable, Optional, Tuple
+
+from configs.prompts import PROMPT_TEMPLATES, PROMPT_VARIANTS
+
+
+class TemplateError(ValueError):
+    """Template inválido ou chamado sem os campos necessários"""
+
+
+class PromptTemplate:
+    """Template de prompt pré-processado; `render` só concatena as partes"""
+
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        required: Iterable[str] = (),
+        provider: Optional[str] = None
+        ):
+        """
+        Compila e valida o template
+
+        Args:
+            name: Nome do template no registro
+            text: Texto no formato de `str.format` (use `{{`/`}}` para chaves literais)
+            required: Campos que o template precisa conter
+            provider: Provedor da variante (None = template padrão)
+
+        Raises:
+            TemplateError: Chaves desbalanceadas, campos posicionais/compostos ou
+                campos obrigatórios ausentes
+        """
+        self.name = name
+        self.text = text
+        self.provider = provider
+
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise TemplateError(f"Template '{name}' inválido: {e}") from e
+
+        parts = []
+        fields = []
+        for literal, field, format_spec, conversion in parsed:
+            if field is not None:
+                if not field.isidentifier():
+                    raise TemplateError(f"Template '{name}': campo inválido '{{{field}}}'")
+                if format_spec or conversion:
+                    raise TemplateError(f"Template '{name}': formatação não suportada em '{{{field}}}'")
+                if field not in fields:
+                    fields.append(field)
+            parts.append((literal, field))
+
+        missing = [field for field in required if field not in fields]
+        if missing:
+            raise TemplateError(f"Template '{name}' sem os campos obrigatórios: {', '.join(missing)}")
+
+        self._parts: Tuple[Tuple[str, Optional[str]], ...] = tuple(parts)
+        self.fields = tuple(fields)
+        # texto fixo (sem os campos), usado para reservar tokens
+        self.static_text = "".join(literal for literal, _ in parts)
+        self.version = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+    def render(self, **values) -> str:
+        """
+        Preenche o template
+
+        Valores extras são ignorados; chaves dentro dos valores (ex.: na
+        transcrição) não são interpretadas.
+
+        Args:
+            **values: Valor de cada campo
+
+        Returns:
+            Prompt pronto
+
+        Raises:
+            TemplateError: Se faltar algum campo
+        """
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise TemplateError(f"Template '{self.name}' sem valores para: {', '.join(missing)}")
+        return "".join(
+            literal + (str(values[field]) if field is not None else "")
+            for literal, field in self._parts
+        )
+
+    # compatível com as chamadas `template.format(...)` de templates em texto
+    format = render
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        variant = f", provider={self.provider!r}" if self.provider else ""
+        return f"PromptTemplate({self.name!r}, version={self.version!r}{variant})"
+
+
+class PromptRegistry:
+    """Templates por nome, com variantes por provedor"""
+
+    def __init__(self):
+        self._templates: Dict[Tuple[str, Optional[str]], PromptTemplate] = {}
+        self._adhoc: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        text: str,
+        required: Iterable[str] = (),
+        provider: Optional[str] = None
+        ) -> PromptTemplate:
+        """
+        Compila e registra um template (ou a variante de um provedor)
+
+        Variantes precisam ter os mesmos campos obrigatórios do template padrão.
+
+        Returns:
+            Template compilado
+        """
+        if provider is not None:
+            required = self.get(name).fields
+        template = PromptTemplate(name, text, required=required, provider=provider)
+        self._templates[(name, provider)] = template
+        return template
+
+    def get(self, name: str, provider: Optional[str] = None) -> PromptTemplate:
+        """
+        Retorna a variante do provedor, ou o template padrão se não houver
+
+        Raises:
+            TemplateError: Se o nome não estiver registrado
+        """
+        template = self._templates.get((name, provider)) or self._templates.get((name, None))
+        if template is None:
+            raise TemplateError(f"Template não registrado: {name}")
+        return template
+
+    def compile(self, text: str) -> PromptTemplate:
+        """Compila (uma vez) um template avulso passado como texto"""
+        template = self._adhoc.get(text)
+        if template is None:
+            template = PromptTemplate('custom', text)
+            with self._lock:
+                self._adhoc[text] = template
+        return template
+
+    def version(self, names: Iterable[str], provider: Optional[str] = None) -> str:
+        """
+        Versão combinada de um conjunto de templates, para chaves de cache
+
+        Muda quando qualquer um dos templates (na variante do provedor) muda.
+        """
+        digest = hashlib.sha1()
+        for name in sorted(names):
+            digest.update(f"{name}={self.get(name, provider).version};".encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(sorted({name for name, _ in self._templates}))
+
+
+def load_registry() -> PromptRegistry:
+    """Registro com os templates de `configs.prompts`, validados na carga"""
+    registry = PromptRegistry()
+    for name, (text, required) in PROMPT_TEMPLATES.items():
+        registry.register(name, text, required)
+    for provider, variants in PROMPT_VARIANTS.items():
+        for name, text in variants.items():
+            registry.register(name, text, provider=provider)
+    return registry
+
+
+PROMPTS = load_registry()
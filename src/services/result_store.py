@@ -0,0 +1,315 @@
+"""
+Armazenamento durável dos resultados de análise, com exportação em lote
+"""
+
+import json
+import sqlite3
+import zipfile
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+from configs.storage_config import RESULTS_DB_PATH
+from .profiler import profiled
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    video_id TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    template_version TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    title TEXT,
+    channel TEXT,
+    publish_date TEXT,
+    summary TEXT,
+    topics TEXT,
+    chapters TEXT,
+    article TEXT,
+    usage TEXT,
+    transcript_hash TEXT,
+    PRIMARY KEY (video_id, provider, model, template_version)
+);
+CREATE INDEX IF NOT EXISTS idx_results_created_at ON results(created_at);
+CREATE INDEX IF NOT EXISTS idx_results_channel ON results(channel);
+"""
+
+# colunas exportadas, na ordem dos arquivos JSONL/Parquet
+EXPORT_FIELDS = (
+    'video_id', 'provider', 'model', 'template_version', 'created_at', 'title', 'channel',
+    'publish_date', 'summary', 'topics', 'chapters', 'article', 'usage', 'transcript_hash',
+)
+
+
+class ResultStore:
+    """Resultados por (vídeo, provedor, modelo, versão dos templates), em SQLite"""
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Inicializa o armazenamento, criando o banco se necessário
+
+        Args:
+            db_path: Caminho do banco SQLite (padrão: RESULTS_DB_PATH)
+        """
+        self.db_path = Path(db_path or RESULTS_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(results)")}
+            if 'transcript_hash' not in columns:
+                # bancos anteriores ao hash da transcrição
+                conn.execute("ALTER TABLE results ADD COLUMN transcript_hash TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @profiled
+    def put(
+        self,
+        video_data: Dict[str, any],
+        analysis: Dict[str, any],
+        provider: str,
+        model: str,
+        template_version: str
+        ) -> Dict[str, any]:
+        """
+        Grava (ou substitui) o resultado de uma análise
+
+        Args:
+            video_data: Dados do vídeo (usa 'video_id', 'title', 'channel', 'publish_date'
+                e 'transcript_hash')
+            analysis: Resultados ('summary', 'topics', 'chapters', 'article', 'usage')
+            provider: Provedor de LLM
+            model: Modelo usado
+            template_version: Versão dos templates (`LLMService.prompt_version`)
+
+        Returns:
+            Dict com 'success' e 'error'
+        """
+        video_id = video_data.get('video_id')
+        if not video_id:
+            return {'success': False, 'error': 'Vídeo sem video_id'}
+
+        publish_date = video_data.get('publish_date')
+        if isinstance(publish_date, date):
+            publish_date = publish_date.isoformat()
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO results ({', '.join(EXPORT_FIELDS)}) "
+                    f"VALUES ({', '.join('?' * len(EXPORT_FIELDS))})",
+                    (
+                        video_id, provider, model, template_version,
+                        datetime.now().isoformat(timespec='seconds'),
+                        video_data.get('title'), video_data.get('channel'), publish_date,
+                        analysis.get('summary'), analysis.get('topics'),
+                        json.dumps(analysis.get('chapters'), ensure_ascii=False),
+                        analysis.get('article'),
+                        json.dumps(analysis.get('usage'), ensure_ascii=False),
+                        video_data.get('transcript_hash') or analysis.get('transcript_hash'),
+                    )
+                )
+            return {'success': True, 'error': None}
+        except sqlite3.Error as e:
+            return {'success': False, 'error': f'Falha ao gravar resultado: {e}'}
+
+    @staticmethod
+    def _to_analysis(row: sqlite3.Row) -> Dict[str, any]:
+        return {
+            'summary': row['summary'],
+            'topics': row['topics'],
+            'chapters': json.loads(row['chapters']) if row['chapters'] else None,
+            'article': row['article'],
+            'usage': json.loads(row['usage']) if row['usage'] else None,
+            'prompt_version': row['template_version'],
+            'transcript_hash': row['transcript_hash'],
+        }
+
+    @profiled
+    def get(
+        self,
+        video_id: str,
+        provider: str,
+        model: str,
+        template_version: str,
+        transcript_hash: Optional[str] = None
+        ) -> Optional[Dict[str, any]]:
+        """
+        Retorna a análise gravada, no mesmo formato produzido pela UI
+
+        Args:
+            transcript_hash: Hash da transcrição atual; se informado, uma análise
+                feita sobre outro conteúdo é ignorada (None = não confere)
+
+        Returns:
+            Dict com 'summary', 'topics', 'chapters', 'article', 'usage',
+            'prompt_version' e 'transcript_hash', ou None se não houver
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM results WHERE video_id = ? AND provider = ? AND model = ? AND template_version = ?",
+                (video_id, provider, model, template_version)
+            ).fetchone()
+        if row is None:
+            return None
+        if transcript_hash and row['transcript_hash'] and row['transcript_hash'] != transcript_hash:
+            return None
+        return self._to_analysis(row)
+
+    def iter_records(
+        self,
+        batch_size: int = 500,
+        channel: Optional[str] = None,
+        since: Optional[Union[str, date]] = None,
+        provider: Optional[str] = None
+        ) -> Iterator[Dict[str, any]]:
+        """
+        Percorre os resultados em lotes, sem carregar tudo na memória
+
+        Args:
+            batch_size: Linhas lidas do banco por vez
+            channel: Filtra por canal
+            since: Só resultados gravados a partir desta data
+            provider: Filtra por provedor
+
+        Yields:
+            Dicts com os campos de EXPORT_FIELDS ('chapters' e 'usage' já decodificados)
+        """
+        filters, params = [], []
+        if channel:
+            filters.append("channel = ?")
+            params.append(channel)
+        if since:
+            filters.append("created_at >= ?")
+            params.append(str(since))
+        if provider:
+            filters.append("provider = ?")
+            params.append(provider)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+        with self._connect() as conn:
+            cursor = conn.execute(f"SELECT * FROM results {where} ORDER BY created_at, video_id", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    record = {field: row[field] for field in EXPORT_FIELDS}
+                    record['chapters'] = json.loads(row['chapters']) if row['chapters'] else None
+                    record['usage'] = json.loads(row['usage']) if row['usage'] else None
+                    yield record
+
+    def export_jsonl(self, path: Union[str, Path], **filters) -> int:
+        """
+        Exporta os resultados como JSON Lines, um registro por linha
+
+        Args:
+            path: Arquivo de saída
+            **filters: Filtros de `iter_records`
+
+        Returns:
+            Número de registros exportados
+        """
+        count = 0
+        with open(path, 'w', encoding='utf-8') as output:
+            for record in self.iter_records(**filters):
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def to_markdown(record: Dict[str, any]) -> str:
+        """Documento Markdown de um resultado (mesmo conteúdo do download da UI)"""
+        parts = [f"# {record.get('title') or record['video_id']}", ""]
+        parts.append(f"- Vídeo: https://www.youtube.com/watch?v={record['video_id']}")
+        if record.get('channel'):
+            parts.append(f"- Canal: {record['channel']}")
+        parts.append(f"- Modelo: {record['provider']}/{record['model']} (templates {record['template_version']})")
+        for heading, field in (("Resumo", 'summary'), ("Tópicos", 'topics'), ("Artigo", 'article')):
+            if record.get(field):
+                parts.extend(["", f"## {heading}", "", record[field]])
+        return "\n".join(parts) + "\n"
+
+    def export_markdown(self, path: Union[str, Path], **filters) -> int:
+        """
+        Exporta um arquivo ZIP com um Markdown por resultado
+
+        Args:
+            path: Arquivo ZIP de saída
+            **filters: Filtros de `iter_records`
+
+        Returns:
+            Número de documentos exportados
+        """
+        count = 0
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+            for record in self.iter_records(**filters):
+                name = f"{record['video_id']}_{record['provider']}_{record['model']}_{record['template_version']}.md"
+                bundle.writestr(name.replace('/', '-'), self.to_markdown(record))
+                count += 1
+        return count
+
+    def export_parquet(self, path: Union[str, Path], batch_size: int = 1000, **filters) -> int:
+        """
+        Exporta os resultados em Parquet, gravando um row group por lote
+
+        Requer o pacote pyarrow.
+
+        Args:
+            path: Arquivo de saída
+            batch_size: Registros por row group
+            **filters: Filtros de `iter_records`
+
+        Returns:
+            Número de registros exportados
+        """
+        if pa is None:
+            raise ImportError("Exportação Parquet requer o pacote pyarrow")
+
+        schema = pa.schema(
+            [(field, pa.string()) for field in EXPORT_FIELDS if field not in ('chapters', 'usage')]
+            + [('chapters', pa.string()), ('usage', pa.string())]
+        )
+        count = 0
+        batch: List[Dict[str, any]] = []
+        with pq.ParquetWriter(str(path), schema) as writer:
+            for record in self.iter_records(batch_size=batch_size, **filters):
+                # estruturas aninhadas variam entre registros; vão como JSON
+                record['chapters'] = json.dumps(record['chapters'], ensure_ascii=False)
+                record['usage'] = json.dumps(record['usage'], ensure_ascii=False)
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    count += len(batch)
+                    batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+        return count
+
+    def remove_video(self, video_id: str) -> None:
+        """Remove todos os resultados de um vídeo"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results WHERE video_id = ?", (video_id,))
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
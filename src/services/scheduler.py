@@ -0,0 +1,263 @@
+"""
+Fila de chamadas ao LLM com classes de prioridade e fila justa ponderada por usuário
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from configs.scheduler_config import (
+    INTERACTIVE_RESERVE,
+    LATENCY_SLO_SECONDS,
+    PROVIDER_CONCURRENCY,
+    TENANT_WEIGHTS,
+)
+from .deadline import Deadline
+
+
+class _Ticket:
+    __slots__ = ('priority', 'tenant', 'finish', 'start', 'enqueued_at', 'granted')
+
+    def __init__(self, priority: str, tenant: str, start: float, finish: float):
+        self.priority = priority
+        self.tenant = tenant
+        self.start = start
+        self.finish = finish
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class LLMScheduler:
+    """
+    Limita as chamadas simultâneas a um provedor e decide quem chama primeiro
+
+    Classes, da maior para a menor prioridade: 'chat', 'analysis', 'batch'.
+    Dentro de cada classe, usuários (tenants) são atendidos por fila justa
+    ponderada: quem já fez muitas chamadas espera atrás de quem fez poucas.
+    'batch' nunca ocupa as `interactive_reserve` últimas vagas e é adiado
+    enquanto houver interativos na fila ou a espera recente deles ameaçar o
+    SLO. Como uma chamada em andamento não pode ser interrompida, lotes
+    cedem a vez entre chamadas: cada chamada entra na fila de novo.
+    """
+
+    PRIORITIES = ('chat', 'analysis', 'batch')
+    INTERACTIVE = ('chat', 'analysis')
+
+    # janela (s) das esperas usadas para avaliar o risco de SLO
+    SLO_WINDOW = 60.0
+
+    _instances: Dict[str, "LLMScheduler"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        interactive_reserve: int = 1,
+        slo_seconds: Optional[Dict[str, float]] = None,
+        tenant_weights: Optional[Dict[str, float]] = None
+        ):
+        """
+        Inicializa o escalonador
+
+        Args:
+            max_concurrent: Chamadas simultâneas permitidas
+            interactive_reserve: Vagas que 'batch' nunca ocupa
+            slo_seconds: Espera máxima desejada por classe interativa
+            tenant_weights: Peso de cada tenant na fila justa (padrão 1.0)
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.interactive_reserve = min(interactive_reserve, self.max_concurrent - 1)
+        self.slo_seconds = dict(LATENCY_SLO_SECONDS if slo_seconds is None else slo_seconds)
+        self.tenant_weights = dict(TENANT_WEIGHTS if tenant_weights is None else tenant_weights)
+
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._queues = {priority: [] for priority in self.PRIORITIES}  # heap (finish, seq, ticket)
+        self._virtual_time = {priority: 0.0 for priority in self.PRIORITIES}
+        self._last_finish: Dict[tuple, float] = {}
+        self._running = {priority: 0 for priority in self.PRIORITIES}
+        self._served = {priority: 0 for priority in self.PRIORITIES}
+        self._deferred = {priority: 0 for priority in self.PRIORITIES}
+        self._waits = {priority: deque(maxlen=512) for priority in self.PRIORITIES}  # (instante, espera)
+
+    @classmethod
+    def for_provider(cls, provider: str) -> "LLMScheduler":
+        """Escalonador compartilhado por todas as instâncias que usam o provedor"""
+        with cls._instances_lock:
+            scheduler = cls._instances.get(provider)
+            if scheduler is None:
+                scheduler = cls(
+                    max_concurrent=PROVIDER_CONCURRENCY.get(provider, 4),
+                    interactive_reserve=INTERACTIVE_RESERVE
+                )
+                cls._instances[provider] = scheduler
+            return scheduler
+
+    def _slo_at_risk(self, now: float) -> bool:
+        """Espera recente de alguma classe interativa passou da metade do SLO"""
+        for priority in self.INTERACTIVE:
+            slo = self.slo_seconds.get(priority)
+            recent = [wait for at, wait in self._waits[priority] if now - at <= self.SLO_WINDOW]
+            if slo and recent and sum(recent) / len(recent) > slo / 2:
+                return True
+        return False
+
+    def _prune_finishes(self, priority: str) -> None:
+        """
+        Esquece tenants que o tempo virtual da classe já alcançou (chamado com o lock)
+
+        Para eles, `start` seria o próprio tempo virtual, com ou sem a entrada;
+        sem a poda, cada sessão deixaria uma entrada para sempre. Quando a fila
+        da classe esvazia, o tempo virtual avança até o maior `finish`: sem
+        ninguém esperando, não há atraso a compensar entre tenants.
+        """
+        if not self._queues[priority]:
+            finishes = [finish for key, finish in self._last_finish.items() if key[0] == priority]
+            self._virtual_time[priority] = max([self._virtual_time[priority], *finishes])
+        virtual_time = self._virtual_time[priority]
+        stale = [key for key, finish in self._last_finish.items() if key[0] == priority and finish <= virtual_time]
+        for key in stale:
+            del self._last_finish[key]
+
+    def _dispatch(self) -> None:
+        """Libera vagas para os tickets da frente, por prioridade (chamado com o lock)"""
+        now = time.monotonic()
+        while sum(self._running.values()) < self.max_concurrent:
+            chosen = None
+            for priority in self.PRIORITIES:
+                if not self._queues[priority]:
+                    continue
+                if priority == 'batch':
+                    interactive_waiting = any(self._queues[p] for p in self.INTERACTIVE)
+                    busy = sum(self._running.values()) >= self.max_concurrent - self.interactive_reserve
+                    if interactive_waiting or busy or self._slo_at_risk(now):
+                        self._deferred['batch'] += 1
+                        break
+                chosen = priority
+                break
+            if chosen is None:
+                return
+
+            _, _, ticket = heapq.heappop(self._queues[chosen])
+            ticket.granted = True
+            self._virtual_time[chosen] = max(self._virtual_time[chosen], ticket.start)
+            self._prune_finishes(chosen)
+            self._running[chosen] += 1
+            self._served[chosen] += 1
+            self._waits[chosen].append((now, now - ticket.enqueued_at))
+            self._cond.notify_all()
+
+    def acquire(
+        self,
+        priority: str = 'analysis',
+        tenant: Optional[str] = None,
+        cost: float = 1.0,
+        deadline: Optional[Deadline] = None,
+        poll: float = 0.25
+        ) -> Callable[[], None]:
+        """
+        Espera a vez na fila e ocupa uma vaga até a função devolvida ser chamada
+
+        Útil quando a vaga precisa durar mais que quem a pediu: uma chamada
+        abandonada pelo prazo continua ocupando o provedor até terminar.
+
+        Args:
+            priority: 'chat', 'analysis' ou 'batch'
+            tenant: Usuário/sessão, para a fila justa
+            cost: Peso da chamada na fila justa (ex.: tokens estimados / 1000)
+            deadline: Prazo da requisição; a espera na fila conta para ele
+
+        Returns:
+            Função que devolve a vaga (chamadas repetidas não têm efeito)
+
+        Raises:
+            ValueError: Classe de prioridade desconhecida
+            Cancelled, DeadlineExceeded: Prazo esgotado ou cancelado na fila
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Classe de prioridade desconhecida: {priority}")
+        tenant = tenant or 'default'
+
+        with self._cond:
+            key = (priority, tenant)
+            start = max(self._virtual_time[priority], self._last_finish.get(key, 0.0))
+            finish = start + cost / self.tenant_weights.get(tenant, 1.0)
+            self._last_finish[key] = finish
+            ticket = _Ticket(priority, tenant, start, finish)
+            heapq.heappush(self._queues[priority], (finish, next(self._seq), ticket))
+            self._dispatch()
+
+            try:
+                while not ticket.granted:
+                    if deadline is not None:
+                        deadline.check('fila do LLM')
+                    # reavalia periodicamente: o risco de SLO expira com o tempo
+                    self._cond.wait(timeout=poll)
+                    self._dispatch()
+            except BaseException:
+                if not ticket.granted:
+                    self._queues[priority] = [entry for entry in self._queues[priority] if entry[2] is not ticket]
+                    heapq.heapify(self._queues[priority])
+                    raise
+                # ganhou a vaga enquanto desistia: devolve
+                self._running[priority] -= 1
+                self._dispatch()
+                raise
+
+        released = []
+
+        def release() -> None:
+            with self._cond:
+                if released:
+                    return
+                released.append(True)
+                self._running[priority] -= 1
+                self._dispatch()
+
+        return release
+
+    @contextmanager
+    def slot(
+        self,
+        priority: str = 'analysis',
+        tenant: Optional[str] = None,
+        cost: float = 1.0,
+        deadline: Optional[Deadline] = None,
+        poll: float = 0.25
+        ) -> Iterator[None]:
+        """
+        Espera a vez na fila e ocupa uma vaga durante o bloco
+
+        Args e exceções como em `acquire`.
+        """
+        release = self.acquire(priority, tenant, cost, deadline, poll)
+        try:
+            yield
+        finally:
+            release()
+
+    def metrics(self) -> Dict[str, Dict[str, any]]:
+        """
+        Métricas por classe
+
+        Returns:
+            Dict classe -> 'queued', 'running', 'served', 'deferred', 'wait_avg' e
+            'wait_p95' (segundos, sobre as últimas esperas)
+        """
+        with self._cond:
+            result = {}
+            for priority in self.PRIORITIES:
+                waits = sorted(wait for _, wait in self._waits[priority])
+                result[priority] = {
+                    'queued': len(self._queues[priority]),
+                    'running': self._running[priority],
+                    'served': self._served[priority],
+                    'deferred': self._deferred[priority],
+                    'wait_avg': sum(waits) / len(waits) if waits else 0.0,
+                    'wait_p95': waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                }
+            return result
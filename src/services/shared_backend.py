@@ -0,0 +1,757 @@
+"""
+Backend compartilhado entre processos e réplicas: cache com validade, travas de
+execução única (single-flight) e fila de tarefas, em SQLite ou em um servidor Redis
+"""
+
+import json
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+from urllib.parse import unquote, urlparse
+
+from configs.backend_config import (
+    BACKEND_PREFIX,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_RESULT_TTL_SECONDS,
+    LOCK_POLL_SECONDS,
+    LOCK_TTL_SECONDS,
+    REDIS_SOCKET_TIMEOUT,
+    SHARED_BACKEND_URL,
+    SHARED_DB_PATH,
+)
+
+# apaga a trava só se ela ainda for de quem a pegou (outro dono pode tê-la pego após vencer)
+RELEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+# segura a reserva para concluir a tarefa, se ela ainda for de ARGV[1] (ou venceu sem ser retomada)
+FINISH_SCRIPT = (
+    "local owner = redis.call('get', KEYS[1]) "
+    "if owner == ARGV[1] or not owner then "
+    "redis.call('set', KEYS[1], ARGV[1], 'PX', ARGV[2]) return 1 end return 0"
+)
+
+FINISHED = ('done', 'failed')
+
+
+class BackendError(OSError):
+    """Backend compartilhado indisponível ou com resposta inválida"""
+
+
+def _dump(value: Any) -> bytes:
+    # JSON, e não pickle: o conteúdo vem de um servidor que outras máquinas também escrevem
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'), 3)
+
+
+def _load(data: Optional[bytes]) -> Any:
+    return None if data is None else json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+class SharedBackend(ABC):
+    """
+    Estado que as réplicas da interface dividem entre si
+
+    - cache: valores JSON com validade (`get`/`set`/`delete`);
+    - travas: `single_flight` garante que só um processo faz um trabalho caro
+      por vez; os outros esperam e depois leem o resultado do cache;
+    - fila: tarefas com reserva por tempo (`claim`); se o worker cair, a
+      tarefa volta para a fila quando a reserva vence.
+
+    Valores de tuplas voltam como listas (JSON).
+    """
+
+    name = 'base'
+
+    # cache
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Valor guardado em `key`, ou `default` se ausente ou vencido"""
+        value = _load(self._get(key))
+        return default if value is None else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Guarda um valor serializável em JSON
+
+        Args:
+            key: Chave (ex.: 'analysis:<id>:<provedor>:<modelo>:<versão>')
+            value: Valor
+            ttl: Validade em segundos (None = sem validade)
+        """
+        self._set(key, _dump(value), ttl)
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Apaga a chave, se existir"""
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        """Bytes guardados em `key`, ou None se ausente ou vencido"""
+
+    @abstractmethod
+    def _set(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        """Guarda os bytes em `key` com validade `ttl` (None = sem validade)"""
+
+    # travas
+
+    def acquire(self, name: str, ttl: float = LOCK_TTL_SECONDS) -> Optional[str]:
+        """Pega a trava sem esperar; retorna o token do dono ou None se ela já tem dono"""
+        token = uuid.uuid4().hex
+        return token if self._acquire(name, token, ttl) else None
+
+    @abstractmethod
+    def release(self, name: str, token: str) -> bool:
+        """Solta a trava, se ela ainda for de `token`"""
+
+    @abstractmethod
+    def _acquire(self, name: str, token: str, ttl: float) -> bool:
+        """Grava a trava com `token` se ela estiver livre ou vencida"""
+
+    @contextmanager
+    def single_flight(
+        self,
+        name: str,
+        ttl: float = LOCK_TTL_SECONDS,
+        wait: Optional[float] = None,
+        deadline=None
+        ) -> Iterator[bool]:
+        """
+        Executa o bloco com a trava `name`, esperando se outro processo a tiver
+
+        Quem esperou deve consultar o cache de novo ao entrar no bloco: o dono
+        anterior normalmente já guardou o resultado.
+
+        Args:
+            name: Nome da trava (ex.: a chave do resultado que o bloco produz)
+            ttl: Validade da trava; vence sozinha se o dono cair
+            wait: Espera máxima em segundos (None = até conseguir)
+            deadline: Deadline da requisição; cancelado ou vencido, para de esperar
+
+        Yields:
+            True com a trava; False se a espera acabou antes ou se o backend
+            está indisponível (o bloco roda sem ela)
+        """
+        give_up = time.monotonic() + wait if wait is not None else None
+        try:
+            token = self.acquire(name, ttl)
+            while token is None:
+                if deadline is not None and (deadline.cancelled or deadline.expired):
+                    break
+                if give_up is not None and time.monotonic() >= give_up:
+                    break
+                time.sleep(LOCK_POLL_SECONDS)
+                token = self.acquire(name, ttl)
+        except BackendError:
+            token = None  # sem coordenação, o trabalho pode se repetir, mas não falha
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                try:
+                    self.release(name, token)
+                except BackendError:
+                    pass  # a trava vence sozinha
+
+    # fila
+
+    @abstractmethod
+    def enqueue(self, queue: str, payload: Dict[str, any], job_id: Optional[str] = None) -> Dict[str, any]:
+        """
+        Põe uma tarefa na fila
+
+        Args:
+            queue: Nome da fila (ex.: 'analysis')
+            payload: Dados da tarefa (JSON)
+            job_id: ID da tarefa; uma tarefa com o mesmo ID ainda pendente não é duplicada
+
+        Returns:
+            Dict com 'id' e 'created' (False se a tarefa já estava pendente)
+        """
+
+    @abstractmethod
+    def claim(self, queue: str, worker: str, lease: float = JOB_LEASE_SECONDS) -> Optional[Dict[str, any]]:
+        """
+        Reserva a próxima tarefa da fila para `worker`
+
+        Tarefas cuja reserva venceu (worker caiu) voltam a ser entregues até
+        JOB_MAX_ATTEMPTS tentativas; depois ficam como 'failed'.
+
+        Returns:
+            Registro da tarefa ('id', 'queue', 'payload', 'status', 'attempts', ...) ou None
+        """
+
+    @abstractmethod
+    def complete(self, job_id: str, worker: str, result: Any = None) -> bool:
+        """
+        Marca a tarefa como concluída, guardando o resultado por JOB_RESULT_TTL_SECONDS
+
+        Só vale para quem ainda tem a reserva: um worker lento, cuja tarefa
+        foi retomada por outro depois de a reserva vencer, não sobrescreve nada.
+
+        Returns:
+            False se a tarefa não está mais reservada por `worker`
+        """
+
+    @abstractmethod
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> bool:
+        """
+        Registra a falha; com `retry`, a tarefa volta para a fila enquanto houver tentativas
+
+        Returns:
+            False se a tarefa não está mais reservada por `worker`
+        """
+
+    @abstractmethod
+    def job(self, job_id: str) -> Optional[Dict[str, any]]:
+        """
+        Estado de uma tarefa
+
+        Returns:
+            Dict com 'id', 'queue', 'payload', 'status' ('queued', 'running', 'done'
+            ou 'failed'), 'attempts', 'worker', 'result', 'error', 'created_at'
+            e 'updated_at', ou None
+        """
+
+    @abstractmethod
+    def pending(self, queue: str) -> Dict[str, int]:
+        """Tarefas da fila: 'queued' (esperando) e 'running' (reservadas)"""
+
+    def describe(self) -> str:
+        """Onde o estado compartilhado está (para a interface)"""
+        return self.name
+
+    @staticmethod
+    def _new_job(queue: str, payload: Dict[str, any], job_id: str) -> Dict[str, any]:
+        now = time.time()
+        return {
+            'id': job_id,
+            'queue': queue,
+            'payload': payload,
+            'status': 'queued',
+            'attempts': 0,
+            'worker': None,
+            'result': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now,
+        }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS locks (
+    name TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    payload BLOB,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    result BLOB,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(queue, status, created_at);
+"""
+
+
+class SQLiteBackend(SharedBackend):
+    """
+    Backend em um arquivo SQLite: processos do mesmo nó dividem caches, travas e fila
+
+    Cada operação é uma transação `BEGIN IMMEDIATE`, então as verificações
+    (trava livre, tarefa pendente) e as escritas acontecem juntas.
+    """
+
+    name = 'sqlite'
+
+    # a cada tantas escritas, apaga entradas vencidas e tarefas antigas
+    PURGE_EVERY = 256
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Inicializa o backend, criando o banco se necessário
+
+        Args:
+            db_path: Caminho do banco SQLite (padrão: SHARED_DB_PATH)
+        """
+        self.db_path = Path(db_path or SHARED_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # uma conexão por operação: seguro entre as threads do Streamlit
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        except sqlite3.Error as e:
+            raise BackendError(f"Falha no backend SQLite: {e}") from e
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY:
+            return
+        now = time.time()
+        conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        conn.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at <= ?",
+            (now - JOB_RESULT_TTL_SECONDS,)
+        )
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row['expires_at'] is not None and row['expires_at'] <= time.time()):
+            return None
+        return row['value']
+
+    def _set(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", (key, data, expires_at))
+            self._purge(conn)
+
+    def delete(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _acquire(self, name: str, token: str, ttl: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM locks WHERE name = ? AND expires_at <= ?", (name, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO locks (name, token, expires_at) VALUES (?, ?, ?)",
+                (name, token, now + ttl)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, name: str, token: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM locks WHERE name = ? AND token = ?", (name, token)).rowcount == 1
+
+    def enqueue(self, queue: str, payload: Dict[str, any], job_id: Optional[str] = None) -> Dict[str, any]:
+        job_id = job_id or uuid.uuid4().hex
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None and row['status'] not in FINISHED:
+                return {'id': job_id, 'created': False}
+            job = self._new_job(queue, payload, job_id)
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, queue, payload, status, attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', 0, ?, ?)",
+                (job_id, queue, _dump(payload), job['created_at'], job['updated_at'])
+            )
+            self._purge(conn)
+        return {'id': job_id, 'created': True}
+
+    def claim(self, queue: str, worker: str, lease: float = JOB_LEASE_SECONDS) -> Optional[Dict[str, any]]:
+        now = time.time()
+        with self._transaction() as conn:
+            # reservas vencidas sem tentativas restantes
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Reserva venceu sem conclusão', updated_at = ? "
+                "WHERE queue = ? AND status = 'running' AND lease_until <= ? AND attempts >= ?",
+                (now, queue, now, JOB_MAX_ATTEMPTS)
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE queue = ? AND (status = 'queued' OR (status = 'running' AND lease_until <= ?)) "
+                "ORDER BY created_at LIMIT 1",
+                (queue, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (worker, now + lease, now, row['id'])
+            )
+            return self._to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone())
+
+    def complete(self, job_id: str, worker: str, result: Any = None) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (_dump(result), time.time(), job_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND status = 'running'", (job_id, worker)
+            ).fetchone()
+            if row is None:
+                return False
+            status = 'queued' if retry and row['attempts'] < JOB_MAX_ATTEMPTS else 'failed'
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+            return True
+
+    def job(self, job_id: str) -> Optional[Dict[str, any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row is not None else None
+
+    def pending(self, queue: str) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs WHERE queue = ? AND status IN ('queued', 'running') GROUP BY status",
+                (queue,)
+            ).fetchall()
+        counts = {row['status']: row['n'] for row in rows}
+        return {'queued': counts.get('queued', 0), 'running': counts.get('running', 0)}
+
+    def describe(self) -> str:
+        return f"sqlite ({self.db_path})"
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Dict[str, any]:
+        return {
+            'id': row['id'],
+            'queue': row['queue'],
+            'payload': _load(row['payload']),
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'worker': row['worker'],
+            'result': _load(row['result']),
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+
+
+class _RespError(Exception):
+    """Resposta de erro do servidor (a conexão continua utilizável)"""
+
+
+class _RespConnection:
+    """Conexão com um servidor que fala o protocolo do Redis (RESP2)"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile('rb')
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read(self):
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Conexão encerrada pelo servidor")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode('utf-8')
+        if kind == b"-":
+            raise _RespError(body.decode('utf-8'))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self.reader.read(size + 2)
+            if len(data) != size + 2:
+                raise ConnectionError("Resposta incompleta do servidor")
+            return data[:-2]
+        if kind == b"*":
+            size = int(body)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise ConnectionError(f"Resposta inválida do servidor: {line[:32]!r}")
+
+    def execute(self, *args):
+        self.sock.sendall(self._encode(args))
+        return self._read()
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisBackend(SharedBackend):
+    """
+    Backend em um servidor Redis (ou compatível): réplicas em máquinas diferentes
+    dividem caches, travas e fila
+
+    Usa só comandos básicos (SET NX PX, LMOVE, LREM) e scripts para soltar
+    travas e concluir tarefas, sem depender de um cliente Redis instalado. Para testes, veja
+    `LocalRedisServer` em `tests/redis_standin.py`.
+
+    Fila: a lista `queue:<fila>` tem as tarefas esperando e `running:<fila>` as
+    reservadas; a chave `lease:<id>` (com validade) marca quem está com a tarefa.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url: str, prefix: str = BACKEND_PREFIX, timeout: float = REDIS_SOCKET_TIMEOUT):
+        """
+        Inicializa o backend (conecta sob demanda)
+
+        Args:
+            url: 'redis://[:senha@]host[:porta][/db]'
+            prefix: Prefixo de todas as chaves
+            timeout: Timeout de cada operação de rede
+        """
+        parsed = urlparse(url)
+        self.url = url
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.prefix = prefix
+        self.timeout = timeout
+        self._idle: List[_RespConnection] = []
+        self._lock = threading.Lock()
+
+    def _open(self) -> _RespConnection:
+        conn = _RespConnection(self.host, self.port, self.timeout)
+        if self.password:
+            conn.execute('AUTH', self.password)
+        if self.db:
+            conn.execute('SELECT', self.db)
+        return conn
+
+    def execute(self, *args):
+        """Executa um comando, reaproveitando as conexões livres"""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        # conexão antiga pode ter sido fechada pelo servidor: uma segunda tentativa com conexão nova
+        for attempt in range(2):
+            fresh = conn is None
+            try:
+                if fresh:
+                    conn = self._open()
+                reply = conn.execute(*args)
+            except _RespError as e:
+                self._checkin(conn)
+                raise BackendError(f"Redis: {e}") from e
+            except (OSError, ConnectionError) as e:
+                if conn is not None:
+                    conn.close()
+                conn = None
+                if fresh or attempt:
+                    raise BackendError(f"Redis indisponível em {self.host}:{self.port}: {e}") from e
+                continue
+            self._checkin(conn)
+            return reply
+
+    def _checkin(self, conn: _RespConnection) -> None:
+        with self._lock:
+            self._idle.append(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}{kind}:{name}"
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self.execute('GET', self._key('cache', key))
+
+    def _set(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        args = ['SET', self._key('cache', key), data]
+        if ttl is not None:
+            args += ['PX', max(1, int(ttl * 1000))]
+        self.execute(*args)
+
+    def delete(self, key: str) -> None:
+        self.execute('DEL', self._key('cache', key))
+
+    def _acquire(self, name: str, token: str, ttl: float) -> bool:
+        return self.execute('SET', self._key('lock', name), token, 'NX', 'PX', max(1, int(ttl * 1000))) is not None
+
+    def release(self, name: str, token: str) -> bool:
+        return self.execute('EVAL', RELEASE_SCRIPT, 1, self._key('lock', name), token) == 1
+
+    def _load_job(self, job_id: str) -> Optional[Dict[str, any]]:
+        return _load(self.execute('GET', self._key('job', job_id)))
+
+    def _save_job(self, job: Dict[str, any]) -> None:
+        job['updated_at'] = time.time()
+        args = ['SET', self._key('job', job['id']), _dump(job)]
+        if job['status'] in FINISHED:
+            args += ['EX', JOB_RESULT_TTL_SECONDS]
+        self.execute(*args)
+
+    def _drop(self, job: Dict[str, any]) -> None:
+        """Tira a tarefa da lista de reservadas e solta a reserva"""
+        self.execute('LREM', self._key('running', job['queue']), 0, job['id'])
+        self.execute('DEL', self._key('lease', job['id']))
+
+    def enqueue(self, queue: str, payload: Dict[str, any], job_id: Optional[str] = None) -> Dict[str, any]:
+        job_id = job_id or uuid.uuid4().hex
+        existing = self._load_job(job_id)
+        if existing is not None and existing['status'] not in FINISHED:
+            return {'id': job_id, 'created': False}
+        self._save_job(self._new_job(queue, payload, job_id))
+        self.execute('RPUSH', self._key('queue', queue), job_id)
+        return {'id': job_id, 'created': True}
+
+    def _reclaim(self, queue: str, worker: str, lease: float) -> Optional[str]:
+        """Tarefa reservada cuja reserva venceu, já com a nova reserva"""
+        for raw in self.execute('LRANGE', self._key('running', queue), 0, -1) or []:
+            job_id = raw.decode('utf-8')
+            if self.execute('SET', self._key('lease', job_id), worker, 'NX', 'PX', max(1, int(lease * 1000))) is not None:
+                return job_id
+        return None
+
+    def claim(self, queue: str, worker: str, lease: float = JOB_LEASE_SECONDS) -> Optional[Dict[str, any]]:
+        running = self._key('running', queue)
+        while True:
+            raw = self.execute('LMOVE', self._key('queue', queue), running, 'LEFT', 'RIGHT')
+            if raw is None:
+                job_id = self._reclaim(queue, worker, lease)
+                if job_id is None:
+                    return None
+            else:
+                job_id = raw.decode('utf-8')
+                lease_key = self._key('lease', job_id)
+                if self.execute('SET', lease_key, worker, 'NX', 'PX', max(1, int(lease * 1000))) is None:
+                    # entrada repetida de uma tarefa que outro worker já tem
+                    self.execute('LREM', running, 1, job_id)
+                    continue
+
+            job = self._load_job(job_id)
+            if job is None or job['status'] in FINISHED:
+                self._drop({'id': job_id, 'queue': queue})
+                continue
+            if job['status'] == 'running' and job['attempts'] >= JOB_MAX_ATTEMPTS:
+                job.update(status='failed', error="Reserva venceu sem conclusão")
+                self._save_job(job)
+                self._drop(job)
+                continue
+            job.update(status='running', worker=worker, attempts=job['attempts'] + 1)
+            self._save_job(job)
+            return job
+
+    def _owned(self, job_id: str, worker: str) -> Optional[Dict[str, any]]:
+        """Tarefa ainda reservada por `worker`, com a reserva segura até ela ser concluída; None se não for mais dele"""
+        job = self._load_job(job_id)
+        if job is None or job['status'] != 'running' or job['worker'] != worker:
+            return None
+        held = self.execute(
+            'EVAL', FINISH_SCRIPT, 1, self._key('lease', job_id), worker, max(1, int(JOB_LEASE_SECONDS * 1000))
+        )
+        return job if held == 1 else None
+
+    def complete(self, job_id: str, worker: str, result: Any = None) -> bool:
+        job = self._owned(job_id, worker)
+        if job is None:
+            return False
+        job.update(status='done', result=result, error=None)
+        self._save_job(job)
+        self._drop(job)
+        return True
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> bool:
+        job = self._owned(job_id, worker)
+        if job is None:
+            return False
+        retrying = retry and job['attempts'] < JOB_MAX_ATTEMPTS
+        job.update(status='queued' if retrying else 'failed', error=error)
+        self._save_job(job)
+        self._drop(job)
+        if retrying:
+            self.execute('RPUSH', self._key('queue', job['queue']), job_id)
+        return True
+
+    def job(self, job_id: str) -> Optional[Dict[str, any]]:
+        return self._load_job(job_id)
+
+    def pending(self, queue: str) -> Dict[str, int]:
+        return {
+            'queued': self.execute('LLEN', self._key('queue', queue)),
+            'running': self.execute('LLEN', self._key('running', queue)),
+        }
+
+    def describe(self) -> str:
+        return f"redis ({self.host}:{self.port}/{self.db})"
+
+
+def open_backend(url: Optional[str] = None) -> SharedBackend:
+    """
+    Cria o backend descrito por `url`
+
+    Args:
+        url: '' (SQLite em SHARED_DB_PATH), 'sqlite:///caminho.db' ou 'redis://host:porta/db'
+
+    Returns:
+        SharedBackend
+
+    Raises:
+        ValueError: Esquema de URL não suportado
+    """
+    url = url or ""
+    if not url:
+        return SQLiteBackend()
+    scheme = urlparse(url).scheme
+    if scheme == 'sqlite':
+        return SQLiteBackend(url[len("sqlite:///"):] or None)
+    if scheme in ('redis', 'tcp'):
+        return RedisBackend(url)
+    raise ValueError(f"Backend compartilhado não suportado: {url}")
+
+
+_default: Optional[SharedBackend] = None
+_default_lock = threading.Lock()
+
+
+def shared_backend() -> SharedBackend:
+    """Backend do processo, configurado por TUBETALK_BACKEND_URL"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = open_backend(SHARED_BACKEND_URL)
+        return _default
@@ -0,0 +1,231 @@
+"""
+Armazenamento compartilhado entre sessões, limitado em bytes, com descarte LRU e spill em disco
+"""
+
+import hashlib
+import pickle
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Estima a memória ocupada por um objeto e tudo que ele referencia
+
+    Args:
+        obj: Objeto medido (dicts, listas, strings, objetos com __dict__...)
+
+    Returns:
+        Tamanho aproximado em bytes
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+class SharedStore:
+    """
+    Guarda valores grandes (transcrições, análises) uma única vez por processo
+
+    O total em memória é limitado por `max_bytes`. Ao estourar o limite, as
+    entradas menos usadas vão para o disco (se houver `spill_dir`) ou são
+    descartadas. Sessões reservam as entradas que estão exibindo com
+    `acquire`: com `spill_dir`, a reserva só faz a entrada sair da memória
+    depois das que não têm reserva (a leitura do disco é transparente); sem
+    ele, entradas reservadas nunca são descartadas. A reserva expira após
+    `lease_seconds` sem renovação, e os arquivos de spill com mais de
+    `spill_ttl` segundos são apagados, inclusive os deixados por execuções
+    anteriores.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        spill_dir: Optional[Union[str, Path]] = None,
+        lease_seconds: float = 300,
+        spill_ttl: float = 24 * 3600
+        ):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            max_bytes: Limite de memória para os valores guardados
+            spill_dir: Diretório para onde as entradas descartadas vão (None = descartar)
+            lease_seconds: Validade de uma reserva sem renovação
+            spill_ttl: Idade máxima de um arquivo de spill
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.lease_seconds = lease_seconds
+        self.spill_ttl = spill_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # chave -> (valor, bytes)
+        self._pins: Dict[str, Dict[str, float]] = {}  # chave -> {dono: expira_em}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'spilled': 0, 'reloaded': 0, 'evicted': 0, 'expired': 0}
+        self._next_sweep = 0.0
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self._sweep()
+
+    def _spill_path(self, key: str) -> Path:
+        return self.spill_dir / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl.z")
+
+    def _sweep(self) -> None:
+        """Apaga arquivos de spill mais velhos que `spill_ttl` (no máximo uma vez por minuto)"""
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + min(60.0, self.spill_ttl)
+        cutoff = time.time() - self.spill_ttl
+        for path in self.spill_dir.glob("*.pkl.z"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    self.stats['expired'] += 1
+            except FileNotFoundError:
+                pass
+
+    def _is_pinned(self, key: str) -> bool:
+        pins = self._pins.get(key)
+        if not pins:
+            return False
+        now = time.monotonic()
+        for owner in [owner for owner, expires_at in pins.items() if expires_at <= now]:
+            del pins[owner]
+        if not pins:
+            del self._pins[key]
+        return bool(pins)
+
+    def _evict(self) -> None:
+        """Tira da memória entradas LRU até caber no limite, começando pelas sem reserva"""
+        if self._bytes <= self.max_bytes:
+            return
+        candidates = [key for key in self._entries if not self._is_pinned(key)]
+        if self.spill_dir:
+            # no disco a entrada reservada continua disponível: também pode sair
+            candidates += [key for key in self._entries if key not in candidates]
+            self._sweep()
+        for key in candidates:
+            if self._bytes <= self.max_bytes:
+                break
+            value, size = self._entries.pop(key)
+            self._bytes -= size
+            if self.spill_dir:
+                self._spill_path(key).write_bytes(zlib.compress(pickle.dumps(value), 3))
+                self.stats['spilled'] += 1
+            else:
+                self.stats['evicted'] += 1
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Guarda um valor
+
+        Args:
+            key: Chave (ex.: 'video:<id>', 'analysis:<id>')
+            value: Valor serializável com pickle
+        """
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Retorna um valor, recarregando do disco se ele tiver sido descartado da memória
+
+        Args:
+            key: Chave
+            default: Valor retornado se a chave não existir
+
+        Returns:
+            Valor guardado ou `default`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[0]
+
+            if self.spill_dir:
+                path = self._spill_path(key)
+                try:
+                    expired = time.time() - path.stat().st_mtime > self.spill_ttl
+                    raw = None if expired else path.read_bytes()
+                    path.unlink()
+                except FileNotFoundError:
+                    raw = None
+                if raw is not None:
+                    value = pickle.loads(zlib.decompress(raw))
+                    self.stats['reloaded'] += 1
+                    self.put(key, value)
+                    return value
+
+            self.stats['misses'] += 1
+            return default
+
+    def acquire(self, key: str, owner: str) -> None:
+        """Reserva (ou renova a reserva de) uma entrada para uma sessão"""
+        with self._lock:
+            self._pins.setdefault(key, {})[owner] = time.monotonic() + self.lease_seconds
+
+    def release(self, key: str, owner: str) -> None:
+        """Libera a reserva de uma sessão"""
+        with self._lock:
+            pins = self._pins.get(key)
+            if pins:
+                pins.pop(owner, None)
+                if not pins:
+                    del self._pins[key]
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove uma entrada da memória e do disco"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+            self._pins.pop(key, None)
+            if self.spill_dir:
+                self._spill_path(key).unlink(missing_ok=True)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries or bool(self.spill_dir and self._spill_path(key).exists())
+
+    def usage(self) -> Dict[str, any]:
+        """
+        Resumo de uso do armazenamento
+
+        Returns:
+            Dict com 'items', 'bytes', 'max_bytes', 'pinned', 'pinned_bytes' e os contadores de `stats`
+        """
+        with self._lock:
+            pinned = [key for key in list(self._pins) if self._is_pinned(key)]
+            return {
+                'items': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'pinned': len(pinned),
+                'pinned_bytes': sum(self._entries[key][1] for key in pinned if key in self._entries),
+                **self.stats,
+            }
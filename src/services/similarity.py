@@ -0,0 +1,154 @@
+"""
+Detecção de transcrições quase duplicadas usando MinHash + LSH
+"""
+
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_PRIME = np.uint64(4294967311)  # primo > 2^32
+
+
+class MinHasher:
+    """Calcula assinaturas MinHash de textos a partir de shingles de palavras"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 42):
+        """
+        Inicializa o gerador de assinaturas
+
+        Args:
+            num_perm: Número de permutações (tamanho da assinatura)
+            shingle_size: Palavras por shingle
+            seed: Semente das permutações (assinaturas só são comparáveis com a mesma semente)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a < 2^31 mantém a * hash (< 2^32) dentro de uint64 sem overflow
+        self._a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """Hashes (crc32) dos shingles de palavras do texto normalizado"""
+        words = _WORD_RE.findall(text.lower())
+        k = self.shingle_size
+        if len(words) < k:
+            shingles = {" ".join(words)} if words else set()
+        else:
+            shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+        return np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Calcula a assinatura MinHash de um texto
+
+        Args:
+            text: Texto (transcrição)
+
+        Returns:
+            Vetor uint32 de tamanho `num_perm`, ou None para texto vazio
+        """
+        hashes = self._shingle_hashes(text or "")
+        if hashes.size == 0:
+            return None
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimativa de similaridade de Jaccard entre duas assinaturas"""
+        return float(np.mean(sig_a == sig_b))
+
+
+class SimilarityIndex:
+    """Índice LSH de assinaturas MinHash para buscar vídeos quase duplicados"""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        """
+        Inicializa o índice
+
+        Args:
+            num_perm: Tamanho das assinaturas indexadas
+            bands: Número de bandas LSH (num_perm deve ser divisível por bands)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser divisível por bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, video_id: str, signature: np.ndarray) -> None:
+        """
+        Indexa (ou reindexa) a assinatura de um vídeo
+
+        Args:
+            video_id: ID do vídeo
+            signature: Assinatura MinHash da transcrição
+        """
+        with self._lock:
+            if video_id in self._signatures:
+                self._remove(video_id)
+            self._signatures[video_id] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(video_id)
+
+    def _remove(self, video_id: str) -> None:
+        signature = self._signatures.pop(video_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket:
+                bucket.discard(video_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def query(
+        self,
+        signature: np.ndarray,
+        threshold: float = 0.8,
+        exclude: Optional[str] = None
+        ) -> List[Dict[str, any]]:
+        """
+        Busca vídeos com transcrição quase idêntica
+
+        Args:
+            signature: Assinatura MinHash da transcrição consultada
+            threshold: Similaridade mínima (Jaccard estimado)
+            exclude: ID a ignorar (normalmente o próprio vídeo)
+
+        Returns:
+            Lista de dicts com 'video_id' e 'similarity', da mais similar para a menos
+        """
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates |= self._buckets[band].get(key, set())
+            candidates.discard(exclude)
+
+            matches = []
+            for video_id in candidates:
+                score = MinHasher.similarity(signature, self._signatures[video_id])
+                if score >= threshold:
+                    matches.append({'video_id': video_id, 'similarity': score})
+
+        return sorted(matches, key=lambda match: match['similarity'], reverse=True)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
@@ -0,0 +1,267 @@
+"""
+Contagem de tokens, janelas de contexto e estimativa de custo por provedor/modelo
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# janela de contexto (tokens) por modelo; nomes são comparados por prefixo
+CONTEXT_WINDOWS = {
+    'gpt-3.5-turbo': 16385,
+    'gpt-4o-mini': 128000,
+    'gpt-4o': 128000,
+    'gpt-4.1': 1047576,
+    'gpt-4-turbo': 128000,
+    'gpt-4': 8192,
+    'llama-3.3-70b-versatile': 131072,
+    'llama-3.1-8b-instant': 131072,
+    'mixtral-8x7b-32768': 32768,
+    'gemma2-9b-it': 8192,
+    'llama3': 8192,
+    'llama2': 4096,
+    'phi3': 4096,
+    'mistral': 32768,
+    'mistralai/Mistral-7B-Instruct': 32768,
+}
+
+# janela usada quando o modelo não está na tabela
+DEFAULT_CONTEXT_WINDOWS = {
+    'openai': 16385,
+    'groq': 8192,
+    'ollama': 4096,
+    'huggingface': 4096,
+}
+
+# preço em USD por 1M de tokens: (entrada, saída)
+PRICING = {
+    'gpt-3.5-turbo': (0.50, 1.50),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4.1': (2.00, 8.00),
+    'gpt-4-turbo': (10.00, 30.00),
+    'llama-3.3-70b-versatile': (0.59, 0.79),
+    'llama-3.1-8b-instant': (0.05, 0.08),
+    'gemma2-9b-it': (0.20, 0.20),
+}
+
+# média aproximada de caracteres por token (texto em pt/en) para o modo offline
+CHARS_PER_TOKEN = 3.5
+
+# teto de caracteres por token em texto corrido: ler `tokens * MAX_CHARS_PER_TOKEN`
+# caracteres antes de `clip` basta para preencher o orçamento
+MAX_CHARS_PER_TOKEN = 8
+
+
+def _lookup(table: Dict[str, any], model: Optional[str]) -> Optional[any]:
+    """Busca um modelo na tabela pelo prefixo mais longo que casar"""
+    if not model:
+        return None
+    if model in table:
+        return table[model]
+    matches = [name for name in table if model.startswith(name)]
+    if matches:
+        return table[max(matches, key=len)]
+    return None
+
+
+def context_window(provider: str, model: Optional[str]) -> int:
+    """
+    Retorna a janela de contexto de um modelo
+
+    Args:
+        provider: Provedor do LLM
+        model: Nome do modelo
+
+    Returns:
+        Número máximo de tokens (prompt + resposta)
+    """
+    return _lookup(CONTEXT_WINDOWS, model) or DEFAULT_CONTEXT_WINDOWS.get(provider, 4096)
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Estima o custo de uma chamada em USD
+
+    Args:
+        model: Nome do modelo
+        prompt_tokens: Tokens de entrada
+        completion_tokens: Tokens de saída
+
+    Returns:
+        Custo estimado ou None se o modelo não tiver preço conhecido
+    """
+    price = _lookup(PRICING, model)
+    if price is None:
+        return None
+    input_price, output_price = price
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: str):
+    """Carrega (uma vez) o encoding tiktoken de um modelo"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+class TokenCounter:
+    """Conta e corta textos em tokens para um provedor/modelo"""
+
+    def __init__(self, provider: str, model: Optional[str] = None):
+        """
+        Inicializa o contador
+
+        Args:
+            provider: Provedor do LLM
+            model: Nome do modelo
+        """
+        self.provider = provider
+        self.model = model
+        self.encoding = None
+
+        # tokenizer exato só existe para OpenAI; demais usam a heurística
+        if tiktoken is not None and provider == 'openai':
+            try:
+                self.encoding = _get_encoding(model or 'gpt-3.5-turbo')
+            except Exception:
+                # sem rede para baixar o vocabulário: cai na heurística
+                self.encoding = None
+
+    @property
+    def is_exact(self) -> bool:
+        """Indica se a contagem vem de um tokenizer real"""
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        """
+        Conta os tokens de um texto
+
+        Args:
+            text: Texto a contar
+
+        Returns:
+            Número de tokens (exato ou estimado)
+        """
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Divide um texto em pedaços de até `max_tokens` tokens
+
+        Args:
+            text: Texto a dividir
+            max_tokens: Tamanho máximo de cada pedaço
+
+        Returns:
+            Lista de pedaços na ordem original
+        """
+        if not text:
+            return []
+        max_tokens = max(1, max_tokens)
+
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return [
+                self.encoding.decode(tokens[i:i + max_tokens])
+                for i in range(0, len(tokens), max_tokens)
+            ]
+
+        max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(len(text), start + max_chars)
+            if end < len(text):
+                # corta no último espaço para não partir palavras
+                space = text.rfind(" ", start, end)
+                if space > start:
+                    end = space
+            chunks.append(text[start:end].strip())
+            start = end
+        return [chunk for chunk in chunks if chunk]
+
+    def clip(self, text: str, max_tokens: int) -> str:
+        """
+        Corta um texto para caber em `max_tokens` tokens
+
+        Args:
+            text: Texto a cortar
+            max_tokens: Limite de tokens
+
+        Returns:
+            Início do texto que cabe no limite
+        """
+        if self.count(text) <= max_tokens:
+            return text
+        chunks = self.split(text, max_tokens)
+        return chunks[0] if chunks else ""
+
+
+def usage_summary(
+    counter: TokenCounter,
+    prompt_tokens: int,
+    completion_tokens: int,
+    estimated: Optional[bool] = None,
+    ) -> Dict[str, any]:
+    """
+    Monta o dicionário de uso de tokens de uma chamada
+
+    Args:
+        counter: Contador usado na chamada (define modelo e exatidão)
+        prompt_tokens: Tokens de entrada
+        completion_tokens: Tokens de saída
+        estimated: Se a contagem é estimada (padrão: depende do contador)
+
+    Returns:
+        Dict com 'prompt_tokens', 'completion_tokens', 'total_tokens', 'cost' e 'estimated'
+    """
+    return {
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': prompt_tokens + completion_tokens,
+        'cost': estimate_cost(counter.model, prompt_tokens, completion_tokens),
+        'estimated': (not counter.is_exact) if estimated is None else estimated,
+    }
+
+
+def add_usage(total: Dict[str, any], usage: Optional[Dict[str, any]]) -> Dict[str, any]:
+    """
+    Acumula o uso de uma chamada em um total
+
+    Args:
+        total: Acumulado (é modificado e retornado)
+        usage: Uso de uma chamada (ignorado se None)
+
+    Returns:
+        O acumulado atualizado
+    """
+    if not usage:
+        return total
+    for key in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+        total[key] = total.get(key, 0) + usage.get(key, 0)
+    if usage.get('cost') is not None:
+        total['cost'] = (total.get('cost') or 0.0) + usage['cost']
+    else:
+        total.setdefault('cost', None)
+    if usage.get('generation_seconds'):
+        # vazão: só chamadas com tempo de geração medido (Ollama) entram na conta
+        total['generation_seconds'] = total.get('generation_seconds', 0.0) + usage['generation_seconds']
+        total['timed_tokens'] = total.get('timed_tokens', 0) + usage.get('completion_tokens', 0)
+        total['tokens_per_second'] = total['timed_tokens'] / total['generation_seconds']
+    if usage.get('load_seconds'):
+        total['load_seconds'] = total.get('load_seconds', 0.0) + usage['load_seconds']
+    total['calls'] = total.get('calls', 0) + 1
+    return total
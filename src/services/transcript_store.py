@@ -0,0 +1,387 @@
+"""
+Transcrições em disco comprimidas por bloco, com índice de offsets e leitura parcial via mmap
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from configs.storage_config import TRANSCRIPT_DIR, TRANSCRIPT_TTL_SECONDS
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# layout: MAGIC | bloco 0 | bloco 1 | ... | índice JSON | rodapé (offset do índice, tamanho, MAGIC)
+MAGIC = b"TTS1"
+_FOOTER = struct.Struct("<QI4s")
+
+TrackKey = Tuple[str, str, bool]  # (video_id, idioma, gerada automaticamente)
+
+
+def _compressor(codec: str, level: int):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress
+    return lambda data: zlib.compress(data, level)
+
+
+def _decompressor(codec: str):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError("Transcrição comprimida com zstd; instale o pacote zstandard")
+        return zstandard.ZstdDecompressor().decompress
+    if codec == 'zlib':
+        return zlib.decompress
+    raise ValueError(f"Codec desconhecido: {codec}")
+
+
+def content_hash(text: str) -> str:
+    """Hash do texto da transcrição; muda só quando o conteúdo muda"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _join(texts: Iterable[str]) -> str:
+    # mesmo texto que o TextFormatter produz (segmentos unidos, quebras viram espaço)
+    return " ".join(texts).replace("\n", " ")
+
+
+class TranscriptFile:
+    """
+    Transcrição mapeada em memória; só os blocos lidos são descomprimidos
+
+    O índice (offsets, intervalo de tempo e tamanho de cada bloco) fica no fim
+    do arquivo, então abrir custa uma leitura pequena e nenhum texto é
+    carregado até ser pedido.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Abre e mapeia o arquivo
+
+        Args:
+            path: Arquivo gravado por `TranscriptStore.put`
+
+        Raises:
+            ValueError: Arquivo truncado ou em formato desconhecido
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as source:
+            self._mm = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < len(MAGIC) + _FOOTER.size or self._mm[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Arquivo de transcrição inválido: {self.path}")
+            index_offset, index_length, magic = _FOOTER.unpack_from(self._mm, len(self._mm) - _FOOTER.size)
+            if magic != MAGIC:
+                raise ValueError(f"Arquivo de transcrição incompleto: {self.path}")
+            self._index = json.loads(self._mm[index_offset:index_offset + index_length])
+        except Exception:
+            self._mm.close()
+            raise
+
+        self.codec: str = self._index['codec']
+        self.language: Optional[str] = self._index.get('language')
+        self.is_generated: Optional[bool] = self._index.get('is_generated')
+        self.segment_count: int = self._index['segments']
+        self.char_count: int = self._index['chars']
+        # cada bloco: [offset, tamanho, início (s), fim (s), caracteres do texto]
+        self._chunks: List[list] = self._index['chunks']
+        self._decompress = _decompressor(self.codec)
+
+    @property
+    def minhash(self) -> Optional[np.ndarray]:
+        signature = self._index.get('minhash')
+        return None if signature is None else np.asarray(signature, dtype=np.uint32)
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        return self._index.get('content_hash')
+
+    @property
+    def metadata(self) -> Dict[str, any]:
+        """Dados extras gravados com a faixa (ex.: origem de uma tradução)"""
+        return self._index.get('metadata') or {}
+
+    @property
+    def compressed_size(self) -> int:
+        return len(self._mm)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def chunk_segments(self, i: int) -> List[Dict[str, any]]:
+        """Segmentos do bloco `i` (descomprime só esse bloco, direto do mapeamento)"""
+        offset, length = self._chunks[i][0], self._chunks[i][1]
+        with memoryview(self._mm) as view:
+            rows = json.loads(self._decompress(view[offset:offset + length]))
+        return [{'text': text, 'start': start, 'duration': duration} for text, start, duration in rows]
+
+    def chunk_text(self, i: int) -> str:
+        """Texto do bloco `i`"""
+        return _join(segment['text'] for segment in self.chunk_segments(i))
+
+    def chunk_range(self, i: int) -> Tuple[float, float]:
+        """Intervalo de tempo (início, fim) coberto pelo bloco `i`, sem descomprimir"""
+        return self._chunks[i][2], self._chunks[i][3]
+
+    def _overlapping(self, start: Optional[float], end: Optional[float]) -> Iterator[int]:
+        for i, chunk in enumerate(self._chunks):
+            if start is not None and chunk[3] < start:
+                continue
+            if end is not None and chunk[2] > end:
+                break
+            yield i
+
+    def iter_segments(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict[str, any]]:
+        """
+        Percorre os segmentos, descomprimindo um bloco por vez
+
+        Args:
+            start: Só segmentos que terminam depois deste instante (s)
+            end: Só segmentos que começam antes deste instante (s)
+        """
+        for i in self._overlapping(start, end):
+            for segment in self.chunk_segments(i):
+                if start is not None and segment['start'] + segment['duration'] < start:
+                    continue
+                if end is not None and segment['start'] > end:
+                    return
+                yield segment
+
+    def segments(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, any]]:
+        """Segmentos de um trecho (ou todos), no formato de `get_transcript`"""
+        return list(self.iter_segments(start, end))
+
+    def text(self, start: Optional[float] = None, end: Optional[float] = None) -> str:
+        """Texto de um trecho (ou a transcrição inteira)"""
+        return _join(segment['text'] for segment in self.iter_segments(start, end))
+
+    def head(self, max_chars: int) -> str:
+        """
+        Início da transcrição com pelo menos `max_chars` caracteres (ou tudo)
+
+        Descomprime só os primeiros blocos; útil para recortes por orçamento.
+        """
+        parts, total = [], 0
+        for i in range(len(self._chunks)):
+            if total >= max_chars:
+                break
+            parts.append(self.chunk_text(i))
+            total += self._chunks[i][4] + 1
+        return " ".join(parts)
+
+    def to_dict(self) -> Dict[str, any]:
+        """Transcrição completa no formato do cache de `YouTubeService`"""
+        segments = self.segments()
+        transcript = _join(segment['text'] for segment in segments)
+        return {
+            'transcript': transcript,
+            'segments': segments,
+            'language': self.language,
+            'is_generated': self.is_generated,
+            'minhash': self.minhash,
+            'content_hash': self.content_hash or content_hash(transcript),
+        }
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> "TranscriptFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TranscriptStore:
+    """Um arquivo comprimido por faixa (vídeo, idioma, tipo), com expiração por idade"""
+
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = TRANSCRIPT_TTL_SECONDS,
+        chunk_chars: int = 16 * 1024,
+        level: int = 3
+        ):
+        """
+        Inicializa o armazenamento (o diretório só é criado na primeira gravação)
+
+        Args:
+            root: Diretório dos arquivos (padrão: TRANSCRIPT_DIR)
+            ttl: Idade máxima (s) de um arquivo antes de ser baixado de novo
+                (None = sem expiração)
+            chunk_chars: Caracteres de texto (aproximados) por bloco comprimido
+            level: Nível de compressão
+        """
+        self.root = Path(root or TRANSCRIPT_DIR)
+        self.ttl = ttl
+        self.chunk_chars = chunk_chars
+        self.level = level
+        self.codec = 'zstd' if zstandard is not None else 'zlib'
+
+    _UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+    def path(self, key: TrackKey) -> Path:
+        """Arquivo de uma faixa"""
+        video_id, language, is_generated = key
+        parts = (video_id, language, 'auto' if is_generated else 'manual')
+        return self.root / (".".join(self._UNSAFE.sub("_", part) for part in parts) + ".tts")
+
+    def put(
+        self,
+        key: TrackKey,
+        segments: Iterable[Dict[str, any]],
+        minhash: Optional[np.ndarray] = None,
+        content_hash: Optional[str] = None,
+        metadata: Optional[Dict[str, any]] = None
+        ) -> Path:
+        """
+        Grava uma faixa, comprimindo os segmentos em blocos de ~`chunk_chars`
+
+        A gravação é atômica (arquivo temporário + rename): leitores com o
+        arquivo antigo mapeado continuam lendo a versão antiga.
+
+        Args:
+            key: (video_id, idioma, gerada automaticamente)
+            segments: Segmentos com 'text', 'start' e 'duration'
+            minhash: Assinatura MinHash da transcrição, guardada no índice
+            content_hash: Hash do texto (`content_hash`), guardado no índice
+            metadata: Dados extras (serializáveis em JSON), guardados no índice
+
+        Returns:
+            Caminho do arquivo gravado
+        """
+        compress = _compressor(self.codec, self.level)
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self.path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                output.write(MAGIC)
+                offset = len(MAGIC)
+                chunks, count, chars = [], 0, 0
+                block: List[list] = []
+                block_chars = 0
+
+                def flush():
+                    nonlocal offset
+                    payload = compress(json.dumps(block, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+                    output.write(payload)
+                    last = block[-1]
+                    text_chars = len(_join(row[0] for row in block))
+                    chunks.append([offset, len(payload), block[0][1], last[1] + last[2], text_chars])
+                    offset += len(payload)
+
+                for segment in segments:
+                    row = [segment['text'], segment['start'], segment.get('duration', 0.0)]
+                    block.append(row)
+                    block_chars += len(row[0]) + 1
+                    chars += len(row[0]) + (1 if count else 0)
+                    count += 1
+                    if block_chars >= self.chunk_chars:
+                        flush()
+                        block, block_chars = [], 0
+                if block:
+                    flush()
+
+                index = json.dumps({
+                    'codec': self.codec,
+                    'language': key[1],
+                    'is_generated': key[2],
+                    'segments': count,
+                    'chars': chars,
+                    'minhash': None if minhash is None else [int(value) for value in minhash],
+                    'content_hash': content_hash,
+                    'metadata': metadata,
+                    'chunks': chunks,
+                }).encode('utf-8')
+                output.write(index)
+                output.write(_FOOTER.pack(offset, len(index), MAGIC))
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return target
+
+    def open(self, key: TrackKey) -> Optional[TranscriptFile]:
+        """
+        Abre a faixa gravada
+
+        Returns:
+            TranscriptFile, ou None se ausente, expirada ou ilegível (arquivos
+            expirados ou corrompidos são removidos)
+        """
+        path = self.path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if self.ttl is not None and age > self.ttl:
+            self._unlink(path)
+            return None
+        try:
+            return TranscriptFile(path)
+        except ImportError:
+            return None
+        except (OSError, ValueError):
+            self._unlink(path)
+            return None
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def paths(self, video_id: str) -> List[Path]:
+        """Arquivos de todas as faixas gravadas de um vídeo (legendas manuais primeiro)"""
+        prefix = self._UNSAFE.sub("_", video_id) + "."
+        if not self.root.exists():
+            return []
+        found = [path for path in self.root.glob("*.tts") if path.name.startswith(prefix)]
+        return sorted(found, key=lambda path: (path.name.endswith(".auto.tts"), path.name))
+
+    def signatures(self) -> Iterator[Tuple[str, np.ndarray]]:
+        """
+        (video_id, assinatura MinHash) das faixas gravadas e ainda válidas
+
+        Lê só o índice de cada arquivo; faixas sem assinatura são ignoradas.
+        """
+        if not self.root.exists():
+            return
+        now = time.time()
+        for path in self.root.glob("*.tts"):
+            try:
+                if self.ttl is not None and now - path.stat().st_mtime > self.ttl:
+                    continue
+                with TranscriptFile(path) as track:
+                    signature = track.minhash
+            except (ImportError, OSError, ValueError):
+                continue
+            if signature is not None:
+                yield path.name.split(".", 1)[0], signature
+
+    def remove_video(self, video_id: str) -> None:
+        """Remove todas as faixas de um vídeo"""
+        for path in self.paths(video_id):
+            self._unlink(path)
+
+    def usage(self) -> Dict[str, int]:
+        """Número de faixas e bytes ocupados em disco"""
+        files = list(self.root.glob("*.tts")) if self.root.exists() else []
+        return {'files': len(files), 'bytes': sum(path.stat().st_size for path in files if path.exists())}
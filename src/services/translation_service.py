@@ -0,0 +1,268 @@
+"""
+Tradução da transcrição para o idioma da análise, feita uma vez por (vídeo, idioma) e guardada em disco
+"""
+
+from typing import Dict, List, Optional
+
+from configs.backend_config import SHARED_CACHE_TTL_SECONDS
+from configs.storage_config import TRANSLATION_DIR
+from configs.translation_config import LANGUAGE_NAMES, TARGET_LANGUAGE
+from .profiler import profiled
+from .shared_backend import BackendError, SharedBackend, shared_backend
+from .transcript_store import TranscriptFile, TranscriptStore, content_hash
+
+
+def base_language(code: Optional[str]) -> str:
+    """Código base do idioma ('pt-BR' -> 'pt', 'en_US' -> 'en')"""
+    return (code or "").replace("_", "-").split("-")[0].lower()
+
+
+def language_name(code: Optional[str]) -> str:
+    """Nome do idioma para o prompt de tradução (o próprio código se desconhecido)"""
+    if not code:
+        return "o idioma original"
+    return LANGUAGE_NAMES.get(base_language(code), code)
+
+
+class TranslationService:
+    """
+    Traduz a transcrição antes das etapas de análise, em vez de cada prompt traduzir de novo
+
+    Os prompts pedem resumo, tópicos, artigo e respostas em `TARGET_LANGUAGE`;
+    com uma transcrição em outro idioma, cada chamada traduziria o texto
+    inteiro implicitamente. Aqui a tradução é feita uma vez, em partes
+    enviadas juntas ao LLM, e guardada por (vídeo, idioma de destino) no
+    formato do `TranscriptStore`, com o intervalo de tempo de cada parte.
+    A tradução também vai para o backend compartilhado, e uma trava por
+    (vídeo, idioma) nele faz as outras sessões e réplicas esperarem a
+    primeira tradução em vez de traduzir de novo.
+    """
+
+    def __init__(
+        self,
+        store: Optional[TranscriptStore] = None,
+        target_language: str = TARGET_LANGUAGE,
+        backend: Optional[SharedBackend] = None
+        ):
+        """
+        Inicializa o serviço
+
+        Args:
+            store: Armazenamento das traduções (padrão: TranscriptStore em TRANSLATION_DIR)
+            target_language: Idioma de destino padrão
+            backend: Backend compartilhado entre réplicas (padrão: o do processo)
+        """
+        self.store = store or TranscriptStore(root=TRANSLATION_DIR)
+        self.target_language = target_language
+        self.backend = backend or shared_backend()
+
+    def needs_translation(self, language: Optional[str], target_language: Optional[str] = None) -> bool:
+        """Transcrição em `language` precisa ser traduzida (idioma desconhecido: não)"""
+        return bool(language) and base_language(language) != base_language(target_language or self.target_language)
+
+    @staticmethod
+    def _shared_key(video_id: str, target_language: str) -> str:
+        return f"translation:{video_id}:{target_language}"
+
+    def cached(
+        self,
+        video_id: str,
+        source_hash: Optional[str] = None,
+        target_language: Optional[str] = None
+        ) -> Optional[Dict[str, any]]:
+        """
+        Tradução guardada, em disco ou (feita por outra réplica) no backend compartilhado
+
+        Args:
+            video_id: ID do vídeo
+            source_hash: Hash da transcrição original; traduções de outro conteúdo são ignoradas
+            target_language: Idioma de destino (padrão: o do serviço)
+
+        Returns:
+            Dict com 'transcript', 'segments', 'language' e 'source_language', ou None
+        """
+        target = target_language or self.target_language
+        handle = self.open(video_id, source_hash, target)
+        if handle is None:
+            return self._cached_shared(video_id, source_hash, target)
+        with handle:
+            return {
+                'transcript': handle.text(),
+                'segments': handle.segments(),
+                'language': target,
+                'source_language': handle.metadata.get('source_language'),
+            }
+
+    def open(
+        self,
+        video_id: str,
+        source_hash: Optional[str] = None,
+        target_language: Optional[str] = None
+        ) -> Optional[TranscriptFile]:
+        """
+        Tradução guardada em disco, para leitura parcial (só o índice é lido ao abrir)
+
+        Args:
+            video_id: ID do vídeo
+            source_hash: Hash da transcrição original; traduções de outro conteúdo são ignoradas
+            target_language: Idioma de destino (padrão: o do serviço)
+
+        Returns:
+            TranscriptFile aberto só para quem chamou (feche com `close()` ou `with`), ou None
+        """
+        handle = self.store.open((video_id, target_language or self.target_language, True))
+        if handle is not None and source_hash and handle.metadata.get('source_hash') not in (None, source_hash):
+            handle.close()
+            return None
+        return handle
+
+    def _cached_shared(self, video_id: str, source_hash: Optional[str], target: str) -> Optional[Dict[str, any]]:
+        try:
+            shared = self.backend.get(self._shared_key(video_id, target))
+        except BackendError:
+            return None
+        if shared is None or (source_hash and shared.get('source_hash') not in (None, source_hash)):
+            return None
+        self._remember(video_id, target, shared['segments'], shared.get('source_language'), shared.get('source_hash'))
+        return {
+            'transcript': " ".join(segment['text'] for segment in shared['segments']).replace("\n", " "),
+            'segments': shared['segments'],
+            'language': target,
+            'source_language': shared.get('source_language'),
+        }
+
+    def _remember(
+        self,
+        video_id: str,
+        target: str,
+        segments: List[Dict[str, any]],
+        source_language: Optional[str],
+        source_hash: Optional[str]
+        ) -> str:
+        """Grava a tradução em disco e retorna o texto completo"""
+        transcript = " ".join(segment['text'] for segment in segments).replace("\n", " ")
+        try:
+            self.store.put(
+                (video_id, target, True),
+                segments,
+                content_hash=content_hash(transcript),
+                metadata={'source_language': source_language, 'source_hash': source_hash},
+            )
+        except OSError:
+            pass  # a tradução vale para esta análise mesmo sem o cache em disco
+        return transcript
+
+    @staticmethod
+    def _parts(video_data: Dict[str, any], llm_service) -> List[Dict[str, any]]:
+        """Agrupa os segmentos em partes que cabem em uma chamada, com o intervalo de tempo de cada uma"""
+        budget = llm_service.translation_budget()
+        segments = video_data.get('transcript_segments') or [
+            {'text': video_data.get('transcript') or "", 'start': 0.0, 'duration': 0.0}
+        ]
+
+        parts, texts, tokens, start, end = [], [], 0, None, 0.0
+
+        def flush():
+            if texts:
+                parts.append({'text': " ".join(texts).replace("\n", " "), 'start': start, 'duration': max(0.0, end - start)})
+
+        for segment in segments:
+            segment_tokens = llm_service.count_tokens(segment['text'])
+            segment_end = segment['start'] + segment.get('duration', 0.0)
+            if segment_tokens > budget:
+                # segmento maior que uma parte (ex.: transcrição sem segmentos): divide o texto
+                flush()
+                texts, tokens, start = [], 0, None
+                for piece in llm_service.token_counter.split(segment['text'], budget):
+                    parts.append({'text': piece, 'start': segment['start'], 'duration': segment.get('duration', 0.0)})
+                continue
+            if texts and tokens + segment_tokens > budget:
+                flush()
+                texts, tokens, start = [], 0, None
+            if start is None:
+                start = segment['start']
+            texts.append(segment['text'])
+            tokens += segment_tokens
+            end = segment_end
+        flush()
+        return [part for part in parts if part['text'].strip()]
+
+    @profiled
+    def translate(
+        self,
+        video_data: Dict[str, any],
+        llm_service=None,
+        target_language: Optional[str] = None
+        ) -> Dict[str, any]:
+        """
+        Transcrição no idioma de destino: a original, a tradução guardada ou uma nova tradução
+
+        Sessões e réplicas que pedem o mesmo vídeo ao mesmo tempo esperam a
+        primeira tradução em vez de traduzir de novo.
+
+        Args:
+            video_data: Dados de `YouTubeService.get_complete_data`
+            llm_service: LLMService usado para traduzir (None = só consulta o cache)
+            target_language: Idioma de destino (padrão: o do serviço)
+
+        Returns:
+            Dict com 'success', 'transcript', 'segments', 'language', 'source_language',
+            'translated' (False se a transcrição já estava no idioma), 'cached',
+            'parts' (chamadas feitas) e 'error'
+        """
+        target = target_language or self.target_language
+        source = video_data.get('transcript_language')
+        result = {
+            'success': True,
+            'transcript': video_data.get('transcript'),
+            'segments': video_data.get('transcript_segments'),
+            'language': source,
+            'source_language': source,
+            'translated': False,
+            'cached': False,
+            'parts': 0,
+            'error': None,
+        }
+        if not self.needs_translation(source, target):
+            return result
+
+        video_id = video_data['video_id']
+        source_hash = video_data.get('transcript_hash')
+        if llm_service is None:
+            # só consulta: não espera uma tradução em andamento
+            cached = self.cached(video_id, source_hash, target)
+            if cached is None:
+                return {**result, 'success': False, 'error': "Tradução ainda não disponível"}
+            return {**result, **cached, 'translated': True, 'cached': True}
+
+        with self.backend.single_flight(self._shared_key(video_id, target), deadline=llm_service.deadline):
+            cached = self.cached(video_id, source_hash, target)
+            if cached is not None:
+                return {**result, **cached, 'translated': True, 'cached': True}
+
+            parts = self._parts(video_data, llm_service)
+            translated = llm_service.translate_chunks([part['text'] for part in parts], target, source)
+            if not translated['success']:
+                return {**result, 'success': False, 'error': translated['error']}
+
+            segments = [
+                {'text': text, 'start': part['start'], 'duration': part['duration']}
+                for part, text in zip(parts, translated['chunks'])
+            ]
+            transcript = self._remember(video_id, target, segments, source, source_hash)
+            try:
+                self.backend.set(
+                    self._shared_key(video_id, target),
+                    {'segments': segments, 'source_language': source, 'source_hash': source_hash},
+                    ttl=SHARED_CACHE_TTL_SECONDS
+                )
+            except BackendError:
+                pass
+            return {
+                **result,
+                'transcript': transcript,
+                'segments': segments,
+                'language': target,
+                'translated': True,
+                'parts': len(parts),
+            }
@@ -0,0 +1,404 @@
+"""
+Índice vetorial persistente (FAISS) com trechos de todos os vídeos analisados
+"""
+
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import faiss
+import numpy as np
+
+from configs.storage_config import CORPUS_DIR
+from .profiler import profiled
+from .prompt_registry import PROMPTS
+
+
+_CITATION_RE = re.compile(r"\[(\d+)\]")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    title TEXT,
+    channel TEXT,
+    publish_date TEXT,
+    start REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_video ON chunks(video_id);
+CREATE INDEX IF NOT EXISTS idx_chunks_channel ON chunks(channel);
+CREATE INDEX IF NOT EXISTS idx_chunks_publish_date ON chunks(publish_date);
+"""
+
+
+def chunk_transcript(
+    segments: Optional[Iterable[Dict[str, any]]],
+    transcript: Optional[str] = None,
+    max_words: int = 150
+    ) -> List[Dict[str, any]]:
+    """
+    Divide a transcrição em trechos de até `max_words` palavras
+
+    Usa os segmentos com tempo quando existem (cada trecho guarda o início);
+    caso contrário, divide o texto corrido.
+
+    Args:
+        segments: Segmentos com 'text', 'start' e 'duration' (lista ou iterador)
+        transcript: Texto corrido, usado se não houver segmentos
+        max_words: Palavras por trecho
+
+    Returns:
+        Lista de dicts com 'start' (segundos ou None) e 'text'
+    """
+    chunks = []
+    if segments is not None:
+        start, words = None, []
+        for segment in segments:
+            if start is None:
+                start = segment['start']
+            words.extend(segment['text'].split())
+            if len(words) >= max_words:
+                chunks.append({'start': start, 'text': " ".join(words)})
+                start, words = None, []
+        if words:
+            chunks.append({'start': start, 'text': " ".join(words)})
+        if chunks or not transcript:
+            return chunks
+
+    words = (transcript or "").split()
+    return [
+        {'start': None, 'text': " ".join(words[i:i + max_words])}
+        for i in range(0, len(words), max_words)
+    ]
+
+
+class CorpusIndex:
+    """Índice HNSW de trechos de vídeos com metadados filtráveis em SQLite"""
+
+    def __init__(
+        self,
+        embeddings,
+        index_dir: Optional[Union[str, Path]] = None,
+        hnsw_m: int = 32,
+        ef_construction: int = 80,
+        ef_search: int = 64
+        ):
+        """
+        Abre (ou cria) o índice
+
+        Args:
+            embeddings: Objeto com `embed_documents(textos)` e `embed_query(texto)`
+            index_dir: Diretório do índice (padrão: CORPUS_DIR)
+            hnsw_m: Vizinhos por nó do grafo HNSW
+            ef_construction: Largura da busca na construção do grafo
+            ef_search: Largura da busca nas consultas (recall x latência)
+        """
+        self.embeddings = embeddings
+        self.index_dir = Path(index_dir or CORPUS_DIR)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.index_dir / "index.faiss"
+        self.db_path = self.index_dir / "chunks.db"
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._lock = threading.RLock()
+        self.index = None
+        self._signature = ()  # arquivo lido por último: (inode, mtime, tamanho), None = sem arquivo, () = reler
+        self._unsaved = []  # (vetores, IDs) incluídos desde o último `save`
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+        self._reconcile()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[sqlite3.Connection]:
+        """
+        Transação de escrita que também serializa o arquivo do índice entre processos
+
+        Processos do mesmo nó compartilham `index.faiss` e `chunks.db`; a trava
+        de escrita do SQLite (`BEGIN IMMEDIATE`) cobre ler, alterar e gravar o
+        índice, e o índice em memória é relido se outro processo o gravou.
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._refresh()
+            yield conn
+
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> None:
+        """Relê o índice gravado se ele mudou desde a última leitura (chamado com `_lock`)"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        index = faiss.read_index(str(self.index_path)) if signature is not None else None
+        # vetores ainda não gravados por este processo continuam valendo
+        for vectors, ids in self._unsaved:
+            if index is None:
+                index = self._new_index(vectors.shape[1])
+            index.add_with_ids(vectors, ids)
+        self.index, self._signature = index, signature
+
+    def _reconcile(self) -> None:
+        """Remove trechos do SQLite sem vetor no índice gravado (o processo caiu antes de `save`)"""
+        with self._exclusive() as conn:
+            indexed = faiss.vector_to_array(self.index.id_map) if self.index is not None else np.empty(0, dtype=np.int64)
+            conn.execute("CREATE TEMP TABLE indexed_ids (id INTEGER PRIMARY KEY)")
+            conn.executemany("INSERT INTO indexed_ids VALUES (?)", ((int(chunk_id),) for chunk_id in indexed))
+            conn.execute("DELETE FROM chunks WHERE id NOT IN (SELECT id FROM indexed_ids)")
+            conn.execute("DROP TABLE indexed_ids")
+
+    def _new_index(self, dim: int):
+        hnsw = faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = self.ef_construction
+        return faiss.IndexIDMap2(hnsw)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        faiss.normalize_L2(vectors)  # produto interno vira similaridade de cosseno
+        return vectors
+
+    def has_video(self, video_id: str) -> bool:
+        """Indica se o vídeo já está no índice"""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM chunks WHERE video_id = ? LIMIT 1", (video_id,)).fetchone() is not None
+
+    @profiled
+    def add_video(
+        self,
+        video_data: Dict[str, any],
+        persist: bool = True,
+        segments: Optional[Iterable[Dict[str, any]]] = None
+        ) -> Dict[str, any]:
+        """
+        Adiciona os trechos de um vídeo ao índice (vídeos já indexados são ignorados)
+
+        Args:
+            video_data: Dados do vídeo (formato de `YouTubeService.get_complete_data`)
+            persist: Grava o índice em disco após a inclusão
+            segments: Segmentos no lugar de 'transcript_segments' (ex.:
+                `TranscriptFile.iter_segments()`, sem carregar a transcrição inteira)
+
+        Returns:
+            Dict com 'success', 'added' (trechos incluídos) e 'error'
+        """
+        video_id = video_data.get('video_id')
+        if not video_id:
+            return {'success': False, 'added': 0, 'error': 'Vídeo sem video_id'}
+        if self.has_video(video_id):
+            return {'success': True, 'added': 0, 'error': None}
+
+        if segments is None:
+            segments = video_data.get('transcript_segments')
+        chunks = chunk_transcript(segments, video_data.get('transcript'))
+        if not chunks:
+            return {'success': True, 'added': 0, 'error': None}
+
+        publish_date = video_data.get('publish_date')
+        if isinstance(publish_date, date):
+            publish_date = publish_date.isoformat()
+
+        try:
+            vectors = self._embed([chunk['text'] for chunk in chunks])
+            with self._exclusive() as conn:
+                # outro processo pode ter indexado o vídeo enquanto os trechos eram embutidos
+                if conn.execute("SELECT 1 FROM chunks WHERE video_id = ? LIMIT 1", (video_id,)).fetchone():
+                    return {'success': True, 'added': 0, 'error': None}
+                # IDs vêm do SQLite e do índice relido, não da memória do processo
+                top = conn.execute("SELECT COALESCE(MAX(id), 0) FROM chunks").fetchone()[0]
+                if self.index is not None and self.index.ntotal:
+                    top = max(top, int(faiss.vector_to_array(self.index.id_map).max()))
+                ids = np.arange(top + 1, top + 1 + len(chunks), dtype=np.int64)
+                if self.index is None:
+                    self.index = self._new_index(vectors.shape[1])
+                self.index.add_with_ids(vectors, ids)
+                self._unsaved.append((vectors, ids))
+                if persist:
+                    try:
+                        self._write()
+                    except Exception:
+                        # descarta os vetores da memória: o índice é relido do disco na próxima operação
+                        self._unsaved.pop()
+                        self._signature = ()
+                        raise
+                # as linhas vão por último: o vídeo só conta como indexado (`has_video`) com os vetores gravados
+                conn.executemany(
+                    "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (int(chunk_id), video_id, video_data.get('title'), video_data.get('channel'),
+                         publish_date, chunk['start'], chunk['text'])
+                        for chunk_id, chunk in zip(ids, chunks)
+                    ]
+                )
+            return {'success': True, 'added': len(chunks), 'error': None}
+        except Exception as e:
+            return {'success': False, 'added': 0, 'error': f'Falha ao indexar vídeo: {e}'}
+
+    def _write(self) -> None:
+        """Grava o índice em memória (chamado dentro de `_exclusive`)"""
+        if self.index is not None:
+            tmp_path = self.index_path.with_suffix(".tmp")
+            faiss.write_index(self.index, str(tmp_path))
+            tmp_path.replace(self.index_path)
+            self._signature = self._file_signature()
+        self._unsaved.clear()
+
+    def save(self) -> None:
+        """Grava o índice FAISS em disco, junto com o que outros processos já gravaram"""
+        with self._exclusive():
+            self._write()
+
+    def _allowed_ids(self, channel, date_from, date_to, video_ids) -> Optional[np.ndarray]:
+        """IDs de trechos que passam nos filtros (None = sem filtro)"""
+        filters, params = [], []
+        if channel:
+            filters.append("channel = ?")
+            params.append(channel)
+        if date_from:
+            filters.append("publish_date >= ?")
+            params.append(str(date_from))
+        if date_to:
+            filters.append("publish_date <= ?")
+            params.append(str(date_to))
+        if video_ids:
+            filters.append(f"video_id IN ({', '.join('?' * len(video_ids))})")
+            params.extend(video_ids)
+        if not filters:
+            return None
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT id FROM chunks WHERE {' AND '.join(filters)}", params).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    @profiled
+    def search(
+        self,
+        query: str,
+        k: int = 8,
+        channel: Optional[str] = None,
+        date_from: Optional[Union[str, date]] = None,
+        date_to: Optional[Union[str, date]] = None,
+        video_ids: Optional[List[str]] = None
+        ) -> List[Dict[str, any]]:
+        """
+        Busca os trechos mais próximos da pergunta em todo o corpus
+
+        Args:
+            query: Pergunta ou texto de busca
+            k: Número de trechos retornados
+            channel: Filtra por canal
+            date_from: Data de publicação mínima (YYYY-MM-DD)
+            date_to: Data de publicação máxima (YYYY-MM-DD)
+            video_ids: Restringe a estes vídeos
+
+        Returns:
+            Lista de dicts com 'id', 'video_id', 'title', 'channel', 'publish_date',
+            'start', 'text' e 'score', do mais para o menos similar
+        """
+        with self._lock:
+            self._refresh()  # inclui o que outros processos gravaram
+            if self.index is None or self.index.ntotal == 0:
+                return []
+
+        vector = np.asarray([self.embeddings.embed_query(query)], dtype=np.float32)
+        faiss.normalize_L2(vector)
+
+        allowed = self._allowed_ids(channel, date_from, date_to, video_ids)
+        if allowed is not None and allowed.size == 0:
+            return []
+        params = faiss.SearchParametersHNSW(efSearch=max(self.ef_search, k))
+        if allowed is not None:
+            params.sel = faiss.IDSelectorBatch(allowed)
+
+        with self._lock:
+            scores, ids = self.index.search(vector, k, params=params)
+
+        hits = [(int(chunk_id), float(score)) for chunk_id, score in zip(ids[0], scores[0]) if chunk_id != -1]
+        if not hits:
+            return []
+        with self._connect() as conn:
+            rows = {
+                row['id']: dict(row)
+                for row in conn.execute(
+                    f"SELECT * FROM chunks WHERE id IN ({', '.join('?' * len(hits))})",
+                    [chunk_id for chunk_id, _ in hits]
+                )
+            }
+        return [{**rows[chunk_id], 'score': score} for chunk_id, score in hits if chunk_id in rows]
+
+    @profiled
+    def answer(self, question: str, llm_service, k: int = 8, **filters) -> Dict[str, any]:
+        """
+        Responde uma pergunta com os trechos mais relevantes de todo o corpus
+
+        Args:
+            question: Pergunta do usuário
+            llm_service: LLMService usado na resposta
+            k: Número de trechos usados como contexto
+            **filters: Filtros repassados para `search` (channel, date_from, date_to, video_ids)
+
+        Returns:
+            Dict com 'success', 'answer', 'citations' (número, vídeo, título, início e url),
+            'usage' e 'error'
+        """
+        try:
+            hits = self.search(question, k=k, **filters)
+        except Exception as e:
+            return {'success': False, 'answer': None, 'citations': [], 'usage': None, 'error': f'Falha na busca: {e}'}
+        if not hits:
+            return {'success': False, 'answer': None, 'citations': [], 'usage': None,
+                    'error': 'Nenhum trecho encontrado nos vídeos analisados'}
+
+        sources = []
+        for number, hit in enumerate(hits, start=1):
+            start = int(hit['start']) if hit['start'] is not None else None
+            url = f"https://youtu.be/{hit['video_id']}" + (f"?t={start}" if start is not None else "")
+            sources.append({'number': number, 'video_id': hit['video_id'], 'title': hit['title'], 'start': start, 'url': url})
+
+        context = "\n\n".join(
+            f"[{source['number']}] {source['title']}"
+            + (f" (t={source['start']}s)" if source['start'] is not None else "")
+            + f"\n{hit['text']}"
+            for source, hit in zip(sources, hits)
+        )
+        template = PROMPTS.get('corpus_qa', llm_service.provider)
+        budget = llm_service.transcript_budget(template)
+        context = llm_service.token_counter.clip(context, budget)
+        result = llm_service.generate(template.render(context=context, question=question))
+        if not result['success']:
+            return {'success': False, 'answer': None, 'citations': [], 'usage': None, 'error': result['error']}
+
+        cited = {int(number) for number in _CITATION_RE.findall(result['text'])}
+        return {
+            'success': True,
+            'answer': result['text'],
+            'citations': [source for source in sources if source['number'] in cited],
+            'usage': result['usage'],
+            'error': None
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return 0 if self.index is None else self.index.ntotal
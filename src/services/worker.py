@@ -0,0 +1,290 @@
+"""
+Worker da fila de análises: qualquer processo, em qualquer réplica, pega vídeos
+enfileirados no backend compartilhado, analisa e publica o resultado
+"""
+
+import argparse
+import os
+import socket
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from configs.backend_config import ANALYSIS_QUEUE, WORKER_POLL_SECONDS
+from configs.timeout_config import FETCH_DEADLINE_SHARE, REQUEST_DEADLINE_SECONDS
+from .analysis_service import analysis_identity, analysis_key, run_analysis, share_analysis, shared_analysis
+from .deadline import Deadline
+from .embedding_service import EmbeddingService
+from .library_service import LibraryService
+from .llm_service import LLMService
+from .result_store import ResultStore
+from .shared_backend import SharedBackend, shared_backend
+from .translation_service import TranslationService
+from .vector_store import CorpusIndex
+from .youtube_service import YouTubeService
+
+
+def enqueue_analysis(
+    url: str,
+    provider: str,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1000,
+    limit: Optional[int] = None,
+    backend: Optional[SharedBackend] = None
+    ) -> Dict[str, any]:
+    """
+    Enfileira a análise de um vídeo, ou de todos os vídeos de uma playlist ou canal
+
+    A tarefa tem o ID da chave da análise: um vídeo já pendente com a mesma
+    configuração não é enfileirado de novo. Chaves de API não vão para a fila;
+    cada worker usa as do próprio ambiente.
+
+    Args:
+        url: URL de vídeo, playlist ou canal
+        provider: Provedor de LLM
+        model: Modelo (None = padrão do provedor)
+        temperature: Temperatura
+        max_tokens: Máximo de tokens por resposta
+        limit: Máximo de vídeos de uma playlist ou canal
+        backend: Backend compartilhado (padrão: o do processo)
+
+    Returns:
+        Dict com 'success', 'queued' (tarefas novas), 'pending' (já estavam na fila) e 'error'
+    """
+    backend = backend or shared_backend()
+    video_id = YouTubeService.extract_video_id(url)
+    if video_id:
+        video_ids = [video_id]
+    else:
+        listing = YouTubeService().list_collection_videos(url, limit=limit)
+        if not listing['success']:
+            return {'success': False, 'queued': 0, 'pending': 0, 'error': listing['error']}
+        video_ids = [entry['video_id'] for entry in listing['entries']]
+
+    identity = analysis_identity(provider, model)
+    queued = pending = 0
+    for video_id in video_ids:
+        created = backend.enqueue(
+            ANALYSIS_QUEUE,
+            {
+                'url': f"https://www.youtube.com/watch?v={video_id}",
+                'provider': provider,
+                'model': identity[1],
+                'temperature': temperature,
+                'max_tokens': max_tokens,
+            },
+            job_id=analysis_key(video_id, *identity)
+        )['created']
+        queued += created
+        pending += not created
+    return {'success': True, 'queued': queued, 'pending': pending, 'error': None}
+
+
+class AnalysisWorker:
+    """
+    Consome a fila de análises
+
+    Cada tarefa roda com a mesma trava (a chave da análise) que a interface usa,
+    então um vídeo aberto na interface enquanto está na fila é analisado uma vez só.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[SharedBackend] = None,
+        worker_id: Optional[str] = None,
+        results: Optional[ResultStore] = None,
+        library: Optional[LibraryService] = None,
+        corpus: Optional[CorpusIndex] = None
+        ):
+        """
+        Inicializa o worker
+
+        Args:
+            backend: Backend compartilhado (padrão: o do processo)
+            worker_id: Identificação nas tarefas reservadas (padrão: host, PID e sufixo aleatório)
+            results: Resultados duráveis deste nó (padrão: ResultStore)
+            library: Biblioteca deste nó (padrão: LibraryService)
+            corpus: Índice entre vídeos deste nó (padrão: CorpusIndex com o
+                EmbeddingService local, criado na primeira análise)
+        """
+        self.backend = backend or shared_backend()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.results = results or ResultStore()
+        self.library = library or LibraryService()
+        self.translations = TranslationService(backend=self.backend)
+        self._corpus = corpus
+
+    @property
+    def corpus(self) -> CorpusIndex:
+        """Índice entre vídeos, o mesmo que a interface usa (modelo local fixo)"""
+        if self._corpus is None:
+            self._corpus = CorpusIndex(EmbeddingService())
+        return self._corpus
+
+    def process(self, payload: Dict[str, any]) -> Dict[str, any]:
+        """
+        Analisa um vídeo da fila (ou reaproveita uma análise já publicada)
+
+        Args:
+            payload: Dados da tarefa ('url', 'provider', 'model', 'temperature', 'max_tokens')
+
+        Returns:
+            Dict com 'success', 'video_id', 'key', 'reused' e 'error'
+        """
+        url = payload['url']
+        video_id = YouTubeService.extract_video_id(url)
+        identity = analysis_identity(payload['provider'], payload.get('model'))
+        key = analysis_key(video_id, *identity)
+        result = {'success': False, 'video_id': video_id, 'key': key, 'reused': False, 'error': None}
+
+        deadline = Deadline(REQUEST_DEADLINE_SECONDS)
+        with self.backend.single_flight(key, deadline=deadline):
+            video_data = YouTubeService(deadline=deadline.child(FETCH_DEADLINE_SHARE)).get_complete_data(url)
+            if not video_data['success']:
+                return {**result, 'error': video_data['error']}
+
+            # só vale a análise feita sobre a transcrição atual (como na interface)
+            if shared_analysis(key, video_data.get('transcript_hash'), backend=self.backend) is not None:
+                return {**result, 'success': True, 'reused': True}
+
+            stored = self.results.get(video_id, *identity, transcript_hash=video_data.get('transcript_hash'))
+            if stored is not None:
+                share_analysis(key, stored, self.backend)
+                return {**result, 'success': True, 'reused': True}
+
+            llm_service = LLMService(
+                provider=payload['provider'],
+                model_name=payload.get('model'),
+                temperature=payload.get('temperature', 0.7),
+                max_tokens=payload.get('max_tokens', 1000),
+                deadline=deadline,
+                priority='batch',
+                tenant='worker'
+            )
+            translated = self.translations.translate(video_data, llm_service)
+            if not translated['success']:
+                return {**result, 'error': translated['error']}
+            if translated['translated']:
+                video_data = {
+                    **video_data,
+                    'transcript': translated['transcript'],
+                    'transcript_segments': translated['segments'],
+                    'chapter_segments': video_data.get('transcript_segments'),
+                }
+
+            analyzed = run_analysis(video_data['transcript'], video_data, llm_service)
+            if not analyzed['success']:
+                return {**result, 'error': analyzed['error']}
+            analysis = analyzed['analysis']
+            video_data.pop('chapter_segments', None)
+
+            self.results.put(video_data, analysis, *identity)
+            self.library.add_video(video_data, analysis)
+            self.index_corpus(video_data)
+            share_analysis(key, analysis, self.backend)
+        return {**result, 'success': True}
+
+    def index_corpus(self, video_data: Dict[str, any]) -> bool:
+        """
+        Indexa os trechos do vídeo para perguntas entre vídeos
+
+        Uma falha (ex.: modelo de embeddings indisponível) não derruba a
+        tarefa: a análise já está gravada e o vídeo entra no índice quando
+        for aberto na interface.
+
+        Args:
+            video_data: Dados do vídeo, com a transcrição usada na análise
+
+        Returns:
+            True se o vídeo ficou no índice
+        """
+        try:
+            return self.corpus.add_video(video_data)['success']
+        except Exception:
+            return False
+
+    def run_once(self) -> Optional[Dict[str, any]]:
+        """
+        Processa a próxima tarefa da fila
+
+        Returns:
+            Resultado de `process` (com 'job_id' e 'recorded', False se a reserva
+            já era de outro worker), ou None se a fila estava vazia
+        """
+        job = self.backend.claim(ANALYSIS_QUEUE, self.worker_id)
+        if job is None:
+            return None
+        try:
+            result = self.process(job['payload'])
+        except Exception as e:
+            result = {'success': False, 'error': f"Falha ao analisar: {e}"}
+        # a reserva pode ter vencido e a tarefa ter sido retomada por outro worker: o resultado dele vale
+        if result['success']:
+            owned = self.backend.complete(job['id'], self.worker_id, result)
+        else:
+            owned = self.backend.fail(job['id'], self.worker_id, result['error'])
+        return {**result, 'job_id': job['id'], 'recorded': owned}
+
+    def run(self, max_jobs: Optional[int] = None, poll: float = WORKER_POLL_SECONDS, stop_when_empty: bool = False) -> int:
+        """
+        Processa tarefas até `max_jobs` (ou para sempre)
+
+        Args:
+            max_jobs: Número máximo de tarefas (None = sem limite)
+            poll: Espera entre consultas com a fila vazia
+            stop_when_empty: Termina quando a fila estiver vazia
+
+        Returns:
+            Número de tarefas processadas
+        """
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            result = self.run_once()
+            if result is None:
+                if stop_when_empty:
+                    break
+                time.sleep(poll)
+                continue
+            processed += 1
+            status = "ok" if result['success'] else f"falhou: {result['error']}"
+            print(f"{result['job_id']}: {status}", flush=True)
+        return processed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fila de análises no backend compartilhado")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Processa a fila")
+    run.add_argument('--max-jobs', type=int)
+    run.add_argument('--until-empty', action='store_true', help="Termina quando a fila esvaziar")
+
+    enqueue = commands.add_parser('enqueue', help="Enfileira vídeos, playlists ou canais")
+    enqueue.add_argument('urls', nargs='+')
+    enqueue.add_argument('--provider', default='ollama')
+    enqueue.add_argument('--model')
+    enqueue.add_argument('--limit', type=int, help="Máximo de vídeos por playlist ou canal")
+
+    commands.add_parser('status', help="Mostra o backend e as tarefas pendentes")
+    args = parser.parse_args(argv)
+
+    backend = shared_backend()
+    if args.command == 'run':
+        worker = AnalysisWorker(backend)
+        print(f"Worker {worker.worker_id} em {backend.describe()}", flush=True)
+        worker.run(max_jobs=args.max_jobs, stop_when_empty=args.until_empty)
+    elif args.command == 'enqueue':
+        for url in args.urls:
+            queued = enqueue_analysis(url, args.provider, args.model, limit=args.limit, backend=backend)
+            if queued['success']:
+                print(f"{url}: {queued['queued']} enfileirados, {queued['pending']} já pendentes")
+            else:
+                print(f"{url}: {queued['error']}")
+    else:
+        pending = backend.pending(ANALYSIS_QUEUE)
+        print(f"{backend.describe()}: {pending['queued']} na fila, {pending['running']} em andamento")
+
+
+if __name__ == '__main__':
+    main()
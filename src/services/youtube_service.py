@@ -3,23 +3,102 @@ Serviço para extração de transcrições e informações de vídeos do YouTube
 """
 
 from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import NoTranscriptFound
 from youtube_transcript_api.formatters import TextFormatter
 import yt_dlp
-from datetime import datetime
-from typing import Optional, Dict
+import re
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from html import unescape
+from typing import Optional, Dict, Iterator, List, Union
+from xml.etree import ElementTree
+
+import numpy as np
+
+from configs.freshness_config import (
+    METADATA_TTL_SECONDS,
+    STATS_BATCH_SIZE,
+    VOLATILE_FIELDS,
+    VOLATILE_TTL_SECONDS,
+    YOUTUBE_API_KEY,
+)
+from configs.storage_config import TRANSCRIPT_TTL_SECONDS
+from configs.timeout_config import STATS_DEADLINE_SECONDS, YOUTUBE_SOCKET_TIMEOUT
+from .cache import TTLCache
+from .deadline import Deadline, run_with_deadline
+from .profiler import profiled
+from .shared_backend import BackendError, shared_backend
+from .similarity import MinHasher, SimilarityIndex
+from .transcript_store import TranscriptFile, TranscriptStore, content_hash
+
+
+class _TimeoutSession(requests.Session):
+    """Sessão HTTP com timeout padrão (o youtube_transcript_api não define nenhum)"""
+
+    def __init__(self, timeout: Optional[float]):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
 
 
 class YouTubeService:
     """Serviço para interagir com vídeos do YouTube"""
+
+    # caches compartilhados entre instâncias (a UI cria um serviço por análise)
+    _track_list_cache = TTLCache(maxsize=512, ttl=6 * 3600)
+    # transcrições que não puderam ir para o disco; as gravadas são abertas (mapeadas) a cada uso
+    _transcript_cache = TTLCache(maxsize=128, ttl=24 * 3600)
+    _transcript_store = TranscriptStore()
+    # metadados estáveis e contadores (views/likes) expiram em prazos diferentes
+    _metadata_cache = TTLCache(maxsize=4096, ttl=METADATA_TTL_SECONDS)
+    _stats_cache = TTLCache(maxsize=4096, ttl=VOLATILE_TTL_SECONDS)
+    # últimos contadores conhecidos, mostrados enquanto os vencidos são atualizados
+    _last_stats = TTLCache(maxsize=4096, ttl=METADATA_TTL_SECONDS)
+    # vídeos cuja atualização falhou: nova tentativa só depois de VOLATILE_TTL_SECONDS
+    _stats_failures = TTLCache(maxsize=4096, ttl=VOLATILE_TTL_SECONDS)
+    _stats_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stats")
+    _stats_pending = set()
+    _stats_lock = threading.Lock()
+
+    STATS_API_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+    # assinaturas MinHash das transcrições para achar re-uploads, cortes e espelhos
+    _minhasher = MinHasher()
+    _similarity_index = SimilarityIndex()
+    _similarity_loaded = False
+    _similarity_lock = threading.Lock()
+    NEAR_DUPLICATE_THRESHOLD = 0.8
+
+    # mesma limpeza de tags que o youtube_transcript_api aplica a cada segmento
+    _TAG_RE = re.compile(r"<[^>]*>")
     
-    def __init__(self, languages: list = None):
+    def __init__(
+        self,
+        languages: list = None,
+        timeout: Optional[float] = YOUTUBE_SOCKET_TIMEOUT,
+        deadline: Optional[Deadline] = None
+        ):
         """
         Inicializa o serviço
         
         Args:
             languages: Lista de idiomas preferidos para transcrições
+            timeout: Timeout (s) de cada conexão com o YouTube
+            deadline: Prazo da requisição; as chamadas desistem quando ele acaba
+                ou é cancelado
         """
         self.languages = languages or ["pt", "pt-BR", "en", "en-US"]
+        self.timeout = timeout
+        self.deadline = deadline
+
+    def _socket_timeout(self) -> Optional[float]:
+        return self.deadline.timeout(self.timeout) if self.deadline else self.timeout
     
     @staticmethod
     def extract_video_id(url: str) -> Optional[str]:
@@ -47,43 +126,675 @@ class YouTubeService:
         except Exception:
             return None
     
-    def get_transcript(self, video_url: str) -> Dict[str, any]:
+    def list_transcripts(self, video_id: str):
+        """
+        Lista as faixas de transcrição disponíveis para um vídeo
+
+        A listagem é feita uma única vez por vídeo e reaproveitada pelas
+        chamadas seguintes (cache compartilhado entre instâncias).
+
+        Args:
+            video_id: ID do vídeo do YouTube
+
+        Returns:
+            TranscriptList do youtube_transcript_api
+        """
+        transcript_list = self._track_list_cache.get(video_id)
+        if transcript_list is None:
+            # a listagem fica em cache e é reusada por outras requisições: o timeout da sessão é
+            # fixo, e o prazo de cada requisição é aplicado por `run_with_deadline`
+            api = YouTubeTranscriptApi(http_client=_TimeoutSession(YOUTUBE_SOCKET_TIMEOUT))
+            transcript_list = run_with_deadline(lambda: api.list(video_id), self.deadline, 'lista de transcrições')
+            self._track_list_cache.set(video_id, transcript_list)
+        return transcript_list
+
+    @staticmethod
+    def select_track(transcript_list, languages: list):
+        """
+        Escolhe a melhor faixa para os idiomas pedidos
+
+        Faixas manuais têm prioridade sobre as geradas automaticamente; dentro
+        de cada grupo vale a ordem de preferência de `languages`.
+
+        Args:
+            transcript_list: TranscriptList retornado por `list_transcripts`
+            languages: Idiomas em ordem de preferência
+
+        Returns:
+            Transcript escolhido
+
+        Raises:
+            NoTranscriptFound: se nenhuma faixa atender aos idiomas
+        """
+        try:
+            return transcript_list.find_manually_created_transcript(languages)
+        except NoTranscriptFound:
+            return transcript_list.find_generated_transcript(languages)
+
+    def _fetch_track(self, video_id: str, track) -> Dict[str, any]:
+        """
+        Baixa e formata uma faixa, usando o cache por (vídeo, idioma, tipo)
+
+        Args:
+            video_id: ID do vídeo do YouTube
+            track: Transcript escolhido em `select_track`
+
+        Returns:
+            Dict com 'transcript', 'segments', 'language', 'is_generated', 'minhash' e 'content_hash'
+        """
+        cache_key = (video_id, track.language_code, track.is_generated)
+        cached = self._cached_track(cache_key)
+        if cached is not None:
+            return self._track_data(cached)
+
+        # uma réplica baixa; as outras esperam e leem a faixa do backend compartilhado
+        with shared_backend().single_flight(self._shared_track_key(cache_key), deadline=self.deadline):
+            cached = self._cached_track(cache_key)
+            if cached is not None:
+                return self._track_data(cached)
+
+            result = run_with_deadline(track.fetch, self.deadline, 'transcrição')
+            transcript_text = TextFormatter().format_transcript(result)
+            data = {
+                'transcript': transcript_text.replace("\n", " "),
+                'segments': result.to_raw_data(),
+                'language': result.language_code,
+                'is_generated': result.is_generated,
+            }
+            data['minhash'] = self._minhasher.signature(data['transcript'])
+            data['content_hash'] = content_hash(data['transcript'])
+            self._remember_track(cache_key, data)
+            return data
+
+    @staticmethod
+    def _shared_track_key(cache_key: tuple) -> str:
+        video_id, language, is_generated = cache_key
+        return f"transcript:{video_id}:{language}:{int(bool(is_generated))}"
+
+    def _cached_track(self, cache_key: tuple) -> Optional[Union[TranscriptFile, Dict[str, any]]]:
+        """
+        Faixa em cache: a cópia em memória, o arquivo em disco e, por fim, o backend compartilhado
+
+        O TranscriptFile devolvido é aberto só para quem chamou, que deve fechá-lo.
+        """
+        cached = self._transcript_cache.get(cache_key)
+        if cached is None:
+            cached = self._transcript_store.open(cache_key)
+        if cached is None:
+            shared = self._shared_track(cache_key)
+            if shared is not None:
+                self._remember_track(cache_key, shared, share=False)
+                cached = self._transcript_cache.get(cache_key) or self._transcript_store.open(cache_key)
+        return cached
+
+    @staticmethod
+    def _track_data(cached: Union[TranscriptFile, Dict[str, any]]) -> Dict[str, any]:
+        """Transcrição completa de uma faixa em cache, fechando o arquivo"""
+        if isinstance(cached, TranscriptFile):
+            with cached:
+                return cached.to_dict()
+        return cached
+
+    def _shared_track(self, cache_key: tuple) -> Optional[Dict[str, any]]:
+        """Faixa baixada por outra réplica, no formato de `_fetch_track`"""
+        try:
+            shared = shared_backend().get(self._shared_track_key(cache_key))
+        except BackendError:
+            return None
+        if shared is None:
+            return None
+        transcript = " ".join(segment['text'] for segment in shared['segments']).replace("\n", " ")
+        return {
+            'transcript': transcript,
+            'segments': shared['segments'],
+            'language': cache_key[1],
+            'is_generated': cache_key[2],
+            'minhash': np.asarray(shared['minhash'], dtype=np.uint32) if shared.get('minhash') else None,
+            'content_hash': shared.get('content_hash') or content_hash(transcript),
+        }
+
+    def _remember_track(self, cache_key: tuple, data: Dict[str, any], share: bool = True) -> None:
+        """Grava a faixa comprimida em disco (ou, se o disco falhar, na memória) e publica no backend compartilhado"""
+        try:
+            self._transcript_store.put(cache_key, data['segments'], data['minhash'], data['content_hash'])
+            self._transcript_cache.delete(cache_key)
+        except OSError:
+            self._transcript_cache.set(cache_key, data)
+        if not share:
+            return
+        minhash = data.get('minhash')
+        try:
+            shared_backend().set(
+                self._shared_track_key(cache_key),
+                {
+                    'segments': data['segments'],
+                    'minhash': minhash.tolist() if minhash is not None else None,
+                    'content_hash': data['content_hash'],
+                },
+                ttl=TRANSCRIPT_TTL_SECONDS
+            )
+        except BackendError:
+            pass  # sem backend, a faixa continua no cache local
+
+    def _iter_segments(self, track) -> Iterator[Dict[str, any]]:
+        """
+        Segmentos de uma faixa à medida que o XML chega, sem esperar o download inteiro
+
+        Usa o cliente HTTP da própria faixa; se a versão do youtube_transcript_api
+        não o expuser (ou a faixa exigir PO token), cai no `fetch` completo.
+        """
+        http_client = getattr(track, '_http_client', None)
+        url = getattr(track, '_url', None)
+        if http_client is None or not url or "&exp=xpe" in url:
+            yield from run_with_deadline(track.fetch, self.deadline, 'transcrição').to_raw_data()
+            return
+
+        with http_client.get(url, stream=True, timeout=self._socket_timeout()) as response:
+            response.raise_for_status()
+            parser = ElementTree.XMLPullParser(events=('end',))
+            for block in response.iter_content(chunk_size=16 * 1024):
+                if self.deadline:
+                    self.deadline.check('transcrição')
+                parser.feed(block)
+                for _, element in parser.read_events():
+                    if element.tag != 'text':
+                        continue
+                    if element.text is not None:
+                        yield {
+                            'text': self._TAG_RE.sub("", unescape(element.text)),
+                            'start': float(element.attrib['start']),
+                            'duration': float(element.attrib.get('dur', '0.0')),
+                        }
+                    element.clear()
+
+    def stream_transcript(
+        self,
+        video_url: str,
+        languages: list = None,
+        chunk_words: int = 300
+        ) -> Iterator[Dict[str, any]]:
+        """
+        Entrega a transcrição em partes assim que há segmentos suficientes
+
+        Permite que o processamento (ex.: `LLMService.condense_stream`) comece
+        antes do fim do download. Ao terminar, a transcrição completa vai para o
+        mesmo cache de `get_transcript`. Erros são levantados pelo gerador.
+
+        Args:
+            video_url: URL do vídeo do YouTube
+            languages: Idiomas em ordem de preferência (usa `self.languages` se None)
+            chunk_words: Palavras (aproximadas) por parte
+
+        Yields:
+            Dicts com 'index', 'language', 'start', 'end' e 'text'
+        """
+        video_id = self.extract_video_id(video_url)
+        transcript_list = self.list_transcripts(video_id)
+        track = self.select_track(transcript_list, languages or self.languages)
+
+        cache_key = (video_id, track.language_code, track.is_generated)
+        cached = self._cached_track(cache_key)
+        if isinstance(cached, TranscriptFile):
+            source = cached.iter_segments()
+        elif cached is not None:
+            source = iter(cached['segments'])
+        else:
+            source = self._iter_segments(track)
+
+        segments, chunk, words, index = [], [], 0, 0
+        try:
+            for segment in source:
+                segments.append(segment)
+                chunk.append(segment)
+                words += len(segment['text'].split())
+                if words >= chunk_words:
+                    yield self._chunk(index, chunk, track.language_code)
+                    chunk, words, index = [], 0, index + 1
+            if chunk:
+                yield self._chunk(index, chunk, track.language_code)
+        finally:
+            if isinstance(cached, TranscriptFile):
+                cached.close()
+
+        if cached is None and segments:
+            data = {
+                'transcript': " ".join(segment['text'] for segment in segments).replace("\n", " "),
+                'segments': segments,
+                'language': track.language_code,
+                'is_generated': track.is_generated,
+            }
+            data['minhash'] = self._minhasher.signature(data['transcript'])
+            data['content_hash'] = content_hash(data['transcript'])
+            self._remember_track(cache_key, data)
+
+    @staticmethod
+    def _chunk(index: int, segments: List[Dict[str, any]], language: str) -> Dict[str, any]:
+        last = segments[-1]
+        return {
+            'index': index,
+            'language': language,
+            'start': segments[0]['start'],
+            'end': last['start'] + last.get('duration', 0),
+            # mesmo texto que `get_transcript` produz para estes segmentos
+            'text': " ".join(segment['text'] for segment in segments).replace("\n", " "),
+        }
+
+    @profiled
+    def get_transcript(self, video_url: str, languages: list = None) -> Dict[str, any]:
         """
         Obtém a transcrição de um vídeo do YouTube
-        
+
         Args:
             video_url: URL do vídeo do YouTube
-            
+            languages: Idiomas em ordem de preferência (usa `self.languages` se None)
+
         Returns:
-            Dict com 'success', 'transcript', 'language' e 'error'
+            Dict com 'success', 'transcript', 'segments', 'language', 'is_generated',
+            'minhash' (assinatura para detecção de duplicatas), 'content_hash'
+            (muda só quando o texto muda) e 'error'
         """
         try:
-            # video_id = video_url.split("v=")[1]
-            video_id = self.extract_video_id(video_url)            
-            result = YouTubeTranscriptApi().fetch(video_id, languages=self.languages)
-            formatter = TextFormatter()
-            transcript_text = formatter.format_transcript(result)
-            transcript_text = transcript_text.replace("\n", " ")
-            
+            video_id = self.extract_video_id(video_url)
+            transcript_list = self.list_transcripts(video_id)
+            track = self.select_track(transcript_list, languages or self.languages)
+            data = self._fetch_track(video_id, track)
+
             return {
                 'success': True,
-                'transcript': transcript_text,
-                'language': self.languages[0],
-                'is_generated': True,
+                **data,
                 'error': None
             }
-            
+
         except Exception as e:
             return {
                 'success': False,
                 'transcript': None,
+                'segments': None,
                 'language': None,
+                'is_generated': None,
+                'minhash': None,
+                'content_hash': None,
                 'error': f'Error fetching transcript: {str(e)}'
             }
+
+    @profiled
+    def open_transcript(self, video_url: str, languages: list = None) -> Optional[TranscriptFile]:
+        """
+        Transcrição para leitura parcial: trechos e blocos são descomprimidos sob demanda
+
+        Baixa a faixa se ainda não estiver em cache. Use no lugar de
+        `get_transcript` quando só uma parte do texto for necessária.
+
+        Args:
+            video_url: URL do vídeo do YouTube
+            languages: Idiomas em ordem de preferência (usa `self.languages` se None)
+
+        Returns:
+            TranscriptFile aberto só para quem chamou (feche com `close()` ou
+            `with`), ou None se a faixa não puder ser gravada em disco
+
+        Raises:
+            Exception: Erros ao listar ou baixar a transcrição
+        """
+        video_id = self.extract_video_id(video_url)
+        transcript_list = self.list_transcripts(video_id)
+        track = self.select_track(transcript_list, languages or self.languages)
+        cache_key = (video_id, track.language_code, track.is_generated)
+
+        cached = self._cached_track(cache_key)
+        if cached is None:
+            self._fetch_track(video_id, track)
+            cached = self._cached_track(cache_key)
+        return cached if isinstance(cached, TranscriptFile) else None
+
+    def open_track(self, video_id: str, language: Optional[str], is_generated: Optional[bool]) -> Optional[TranscriptFile]:
+        """
+        Faixa já baixada, para leitura parcial (não baixa nada)
+
+        Args:
+            video_id: ID do vídeo
+            language: Idioma da faixa ('transcript_language' de `get_complete_data`)
+            is_generated: Faixa gerada automaticamente ('transcript_is_generated')
+
+        Returns:
+            TranscriptFile aberto só para quem chamou (feche com `close()` ou
+            `with`), ou None se a faixa não estiver em disco
+        """
+        if not video_id or not language:
+            return None
+        cached = self._cached_track((video_id, language, bool(is_generated)))
+        return cached if isinstance(cached, TranscriptFile) else None
+
+    def _transcript_summary(self, video_url: str) -> Optional[Dict[str, any]]:
+        """Campos de `get_transcript` lidos só do índice do arquivo, sem o texto (None = arquivo indisponível)"""
+        try:
+            handle = self.open_transcript(video_url)
+        except Exception:
+            return None  # `get_transcript` refaz a busca e reporta o erro
+        if handle is None:
+            return None
+        with handle:
+            if handle.content_hash is None:
+                return None
+            return {
+                'success': True,
+                'transcript': None,
+                'segments': None,
+                'language': handle.language,
+                'is_generated': handle.is_generated,
+                'minhash': handle.minhash,
+                'content_hash': handle.content_hash,
+                'error': None
+            }
+
+    @classmethod
+    def _loaded_similarity_index(cls) -> SimilarityIndex:
+        """Índice de duplicatas, reconstruído das faixas em disco no primeiro uso do processo"""
+        with cls._similarity_lock:
+            if not cls._similarity_loaded:
+                for video_id, signature in cls._transcript_store.signatures():
+                    cls._similarity_index.add(video_id, signature)
+                cls._similarity_loaded = True
+        return cls._similarity_index
+
+    @profiled
+    def find_near_duplicates(
+        self,
+        video_id: str,
+        signature,
+        threshold: Optional[float] = None
+        ) -> List[Dict[str, any]]:
+        """
+        Busca vídeos já vistos com transcrição quase idêntica e indexa o vídeo atual
+
+        Args:
+            video_id: ID do vídeo consultado
+            signature: Assinatura MinHash da transcrição (campo 'minhash')
+            threshold: Similaridade mínima (padrão: NEAR_DUPLICATE_THRESHOLD)
+
+        Returns:
+            Lista de dicts com 'video_id' e 'similarity', da mais similar para a menos
+        """
+        if signature is None:
+            return []
+        index = self._loaded_similarity_index()
+        matches = index.query(
+            signature,
+            threshold=threshold or self.NEAR_DUPLICATE_THRESHOLD,
+            exclude=video_id
+        )
+        index.add(video_id, signature)
+        return matches
+
+    def get_transcripts(self, video_url: str, languages: list) -> Dict[str, Dict[str, any]]:
+        """
+        Obtém transcrições em vários idiomas usando uma única listagem de faixas
+
+        Args:
+            video_url: URL do vídeo do YouTube
+            languages: Idiomas desejados
+
+        Returns:
+            Dict idioma -> resultado no mesmo formato de `get_transcript`
+        """
+        results = {}
+        try:
+            video_id = self.extract_video_id(video_url)
+            transcript_list = self.list_transcripts(video_id)
+        except Exception as e:
+            error = f'Error listing transcripts: {str(e)}'
+            return {
+                language: {'success': False, 'transcript': None, 'segments': None,
+                           'language': None, 'is_generated': None, 'minhash': None, 'content_hash': None, 'error': error}
+                for language in languages
+            }
+
+        for language in languages:
+            try:
+                track = self.select_track(transcript_list, [language])
+                results[language] = {'success': True, **self._fetch_track(video_id, track), 'error': None}
+            except Exception as e:
+                results[language] = {
+                    'success': False,
+                    'transcript': None,
+                    'segments': None,
+                    'language': None,
+                    'is_generated': None,
+                    'minhash': None,
+                    'content_hash': None,
+                    'error': f'Error fetching transcript: {str(e)}'
+                }
+        return results
     
+    def _ydl_opts(self, **overrides) -> Dict[str, any]:
+        """Opções base do yt-dlp para extração de metadados sem download"""
+        opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': False,
+            'socket_timeout': self._socket_timeout()
+        }
+        opts.update(overrides)
+        return opts
+
+    @staticmethod
+    def _parse_video_info(info: Dict[str, any]) -> Dict[str, any]:
+        """
+        Converte o dicionário bruto do yt-dlp no formato de `get_video_info`
+
+        Args:
+            info: Resultado de `YoutubeDL.extract_info`
+
+        Returns:
+            Dict com informações do vídeo
+        """
+        publish_date = None
+        if info.get("upload_date"):
+            try:
+                publish_date = datetime.strptime(info.get("upload_date"), "%Y%m%d").date()
+            except:
+                publish_date = None
+
+        return {
+            'success': True,
+            'video_id': info.get("id"),
+            'title': info.get("title"),
+            'author': info.get("uploader"),
+            'channel': info.get("channel"),
+            'publish_date': publish_date,
+            'views': info.get("view_count"),
+            'likes': info.get("like_count"),
+            'duration': info.get("duration"),  # em segundos
+            'description': info.get("description"),
+            'thumbnail_url': info.get("thumbnail"),
+            'keywords': info.get("tags", []),
+            'rating': info.get("average_rating"),
+            'category': info.get("categories", [None])[0] if info.get("categories") else None,
+            'error': None
+        }
+
+    def _remember_info(self, video_info: Dict[str, any]) -> None:
+        """Guarda metadados recém-extraídos; os contadores vindos junto também estão frescos"""
+        video_id = video_info['video_id']
+        refreshed_at = time.time()
+        self._metadata_cache.set(video_id, video_info)
+        stats = {field: video_info.get(field) for field in VOLATILE_FIELDS}
+        self._remember_stats(video_id, {**stats, 'stats_refreshed_at': refreshed_at})
+        publish_date = video_info.get('publish_date')
+        try:
+            shared_backend().set(
+                f"video_info:{video_id}",
+                {
+                    **video_info,
+                    'publish_date': publish_date.isoformat() if publish_date else None,
+                    'stats_refreshed_at': refreshed_at,
+                },
+                ttl=METADATA_TTL_SECONDS
+            )
+        except BackendError:
+            pass
+
+    def _cached_info(self, video_id: str) -> Optional[Dict[str, any]]:
+        """Metadados em cache: os do processo e, depois, os extraídos por outra réplica"""
+        cached = self._metadata_cache.get(video_id)
+        if cached is not None:
+            return cached
+        try:
+            shared = shared_backend().get(f"video_info:{video_id}")
+        except BackendError:
+            return None
+        if shared is None:
+            return None
+        refreshed_at = shared.pop('stats_refreshed_at', 0)
+        if shared.get('publish_date'):
+            shared['publish_date'] = date.fromisoformat(shared['publish_date'])
+        self._metadata_cache.set(video_id, shared)
+        age = time.time() - refreshed_at
+        if age < VOLATILE_TTL_SECONDS:
+            stats = {field: shared.get(field) for field in VOLATILE_FIELDS}
+            self._remember_stats(video_id, {**stats, 'stats_refreshed_at': refreshed_at}, ttl=VOLATILE_TTL_SECONDS - age)
+        return shared
+
+    def _with_stats(self, video_infos: Dict[str, Dict[str, any]]) -> Dict[str, Dict[str, any]]:
+        """Metadados em cache com os contadores atualizados (uma chamada em lote para os vencidos)"""
+        ids = [video_id for video_id, info in video_infos.items() if info.get('success')]
+        try:
+            stats = self.refresh_stats(ids)
+        except Exception:
+            # sem contadores novos: mantém os anteriores
+            stats = {}
+        return {
+            video_id: {**info, **stats[video_id]} if video_id in stats else info
+            for video_id, info in video_infos.items()
+        }
+
+    @profiled
+    def refresh_stats(self, video_ids: List[str], max_workers: int = 4) -> Dict[str, Dict[str, any]]:
+        """
+        Contadores voláteis (views, likes) dos vídeos, buscando só os vencidos
+
+        Com YOUTUBE_API_KEY, até STATS_BATCH_SIZE vídeos por requisição à
+        YouTube Data API (só estatísticas, sem transcrição nem metadados).
+        Sem a chave, ou se a API falhar, cai na extração do yt-dlp.
+
+        Args:
+            video_ids: IDs dos vídeos
+            max_workers: Workers do yt-dlp quando não há chave da API
+
+        Returns:
+            Dict video_id -> 'views', 'likes' e 'stats_refreshed_at' (timestamp);
+            vídeos que falharem ficam de fora, e só são tentados de novo depois
+            de VOLATILE_TTL_SECONDS
+        """
+        results, stale = {}, []
+        for video_id in dict.fromkeys(video_ids):
+            cached = self._stats_cache.get(video_id)
+            if cached is not None:
+                results[video_id] = cached
+            elif video_id not in self._stats_failures:
+                stale.append(video_id)
+        if not stale:
+            return results
+
+        fetched = {}
+        try:
+            if YOUTUBE_API_KEY:
+                try:
+                    fetched = self._fetch_stats_api(stale)
+                except requests.RequestException:
+                    fetched = {}
+            missing = [video_id for video_id in stale if video_id not in fetched]
+            if missing:
+                for video_id, info in self._extract_infos(missing, max_workers).items():
+                    if info['success']:
+                        fetched[video_id] = self._stats_cache.get(video_id)
+        finally:
+            for video_id in stale:
+                if fetched.get(video_id) is None:
+                    self._stats_failures.set(video_id, True)
+        results.update({video_id: stats for video_id, stats in fetched.items() if stats is not None})
+        return results
+
+    def stats_in_background(self, video_ids: List[str]) -> Dict[str, Dict[str, any]]:
+        """
+        Últimos contadores conhecidos, sem esperar a rede; os vencidos são atualizados em segundo plano
+
+        Para a página: o rerun não espera o YouTube. A atualização roda com
+        prazo de STATS_DEADLINE_SECONDS, e o valor novo aparece no rerun seguinte.
+
+        Args:
+            video_ids: IDs dos vídeos
+
+        Returns:
+            Dict video_id -> 'views', 'likes' e 'stats_refreshed_at'; vídeos
+            sem contadores conhecidos ficam de fora
+        """
+        known, stale = {}, []
+        for video_id in dict.fromkeys(video_ids):
+            stats = self._stats_cache.get(video_id)
+            if stats is None:
+                if video_id not in self._stats_failures:
+                    stale.append(video_id)
+                stats = self._last_stats.get(video_id)
+            if stats is not None:
+                known[video_id] = stats
+
+        with self._stats_lock:
+            stale = [video_id for video_id in stale if video_id not in self._stats_pending]
+            self._stats_pending.update(stale)
+        if stale:
+            self._stats_refresher.submit(self._refresh_pending_stats, stale)
+        return known
+
+    @classmethod
+    def _refresh_pending_stats(cls, video_ids: List[str]) -> None:
+        try:
+            cls(deadline=Deadline(STATS_DEADLINE_SECONDS)).refresh_stats(video_ids)
+        except Exception:
+            pass  # falhas já ficaram registradas por `refresh_stats`
+        finally:
+            with cls._stats_lock:
+                cls._stats_pending.difference_update(video_ids)
+
+    def _remember_stats(self, video_id: str, stats: Dict[str, any], ttl: Optional[float] = None) -> None:
+        """Guarda contadores frescos (e como últimos conhecidos)"""
+        self._stats_cache.set(video_id, stats, ttl=ttl)
+        self._last_stats.set(video_id, stats)
+        self._stats_failures.delete(video_id)
+
+    def _fetch_stats_api(self, video_ids: List[str]) -> Dict[str, Dict[str, any]]:
+        """Estatísticas pela YouTube Data API, em lotes de STATS_BATCH_SIZE"""
+        fetched = {}
+        for i in range(0, len(video_ids), STATS_BATCH_SIZE):
+            if self.deadline:
+                self.deadline.check('estatísticas')
+            batch = video_ids[i:i + STATS_BATCH_SIZE]
+            response = requests.get(
+                self.STATS_API_URL,
+                params={'part': 'statistics', 'id': ",".join(batch), 'key': YOUTUBE_API_KEY},
+                timeout=self._socket_timeout()
+            )
+            response.raise_for_status()
+            now = time.time()
+            for item in response.json().get('items', []):
+                statistics = item.get('statistics', {})
+                stats = {
+                    'views': int(statistics['viewCount']) if 'viewCount' in statistics else None,
+                    'likes': int(statistics['likeCount']) if 'likeCount' in statistics else None,
+                    'stats_refreshed_at': now,
+                }
+                self._remember_stats(item['id'], stats)
+                fetched[item['id']] = stats
+        return fetched
+
+    @profiled
     def get_video_info(self, video_url: str) -> Dict[str, any]:
         """
         Obtém informações detalhadas do vídeo usando yt-dlp
+
+        Metadados estáveis vêm do cache (METADATA_TTL_SECONDS); views e likes
+        vencidos (VOLATILE_TTL_SECONDS) são atualizados por `refresh_stats`,
+        sem repetir a extração completa.
         
         Args:
             video_url: URL do vídeo do YouTube
@@ -91,39 +802,20 @@ class YouTubeService:
         Returns:
             Dict com informações do vídeo
         """
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False  
-        }
-        
+        video_id = self.extract_video_id(video_url)
+        cached = self._cached_info(video_id) if video_id else None
+        if cached is not None:
+            return self._with_stats({video_id: cached})[video_id]
+
+        def extract() -> Dict[str, any]:
+            with yt_dlp.YoutubeDL(self._ydl_opts()) as ydl:
+                return ydl.extract_info(video_url, download=False)
+
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)                
-                publish_date = None
-                if info.get("upload_date"):
-                    try:
-                        publish_date = datetime.strptime(info.get("upload_date"), "%Y%m%d").date()
-                    except:
-                        publish_date = None
-                
-                return {
-                    'success': True,
-                    'video_id': info.get("id"),
-                    'title': info.get("title"),
-                    'author': info.get("uploader"),
-                    'channel': info.get("channel"),
-                    'publish_date': publish_date,
-                    'views': info.get("view_count"),
-                    'likes': info.get("like_count"),
-                    'duration': info.get("duration"),  # em segundos
-                    'description': info.get("description"),
-                    'thumbnail_url': info.get("thumbnail"),
-                    'keywords': info.get("tags", []),
-                    'rating': info.get("average_rating"),
-                    'category': info.get("categories", [None])[0] if info.get("categories") else None,
-                    'error': None
-                }
+            info = run_with_deadline(extract, self.deadline, 'metadados')
+            video_info = self._parse_video_info(info)
+            self._remember_info(video_info)
+            return video_info
                 
         except Exception as e:
             return {
@@ -131,13 +823,173 @@ class YouTubeService:
                 'video_id': None,
                 'error': f'Error fetching video info: {str(e)}'
             }
+
+    @staticmethod
+    def _normalize_collection_url(url: str) -> str:
+        """Aponta URLs de canal para a aba de vídeos (evita listar abas aninhadas)"""
+        url = url.rstrip("/")
+        is_channel = any(part in url for part in ("/@", "/channel/", "/c/", "/user/"))
+        tabs = ("/videos", "/shorts", "/streams", "/playlists")
+        if is_channel and not url.endswith(tabs):
+            return url + "/videos"
+        return url
+
+    def list_collection_videos(self, collection_url: str, limit: Optional[int] = None) -> Dict[str, any]:
+        """
+        Enumera os vídeos de uma playlist ou canal com extração "flat" (sem detalhes)
+
+        Args:
+            collection_url: URL da playlist ou do canal
+            limit: Número máximo de vídeos listados (None = todos)
+
+        Returns:
+            Dict com 'success', 'title', 'entries' (lista de 'video_id', 'title', 'url') e 'error'
+        """
+        opts = self._ydl_opts(extract_flat='in_playlist')
+        if limit:
+            opts['playlistend'] = limit
+
+        try:
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                info = ydl.extract_info(self._normalize_collection_url(collection_url), download=False)
+
+            entries = []
+            for entry in info.get("entries") or []:
+                video_id = entry.get("id") if entry else None
+                if not video_id or len(video_id) != 11:
+                    continue
+                entries.append({
+                    'video_id': video_id,
+                    'title': entry.get("title"),
+                    'url': f"https://www.youtube.com/watch?v={video_id}",
+                })
+
+            return {
+                'success': True,
+                'title': info.get("title"),
+                'entries': entries[:limit] if limit else entries,
+                'error': None
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'title': None,
+                'entries': [],
+                'error': f'Error listing collection: {str(e)}'
+            }
+
+    def get_videos_info(self, video_urls: List[str], max_workers: int = 4) -> Dict[str, Dict[str, any]]:
+        """
+        Obtém metadados de vários vídeos em paralelo
+
+        IDs já presentes no cache de metadados não são extraídos de novo; só
+        seus contadores vencidos são atualizados, em lote (`refresh_stats`).
+        Cada worker reaproveita a mesma instância de `YoutubeDL` para todos os
+        vídeos que processa, evitando o custo de inicialização por vídeo.
+
+        Args:
+            video_urls: URLs (ou IDs) dos vídeos
+            max_workers: Tamanho máximo do pool de workers
+
+        Returns:
+            Dict video_id -> resultado no formato de `get_video_info`
+        """
+        cached_infos = {}
+        pending = []
+        for url in video_urls:
+            video_id = self.extract_video_id(url) or (url if len(url) == 11 else None)
+            if not video_id:
+                continue
+            cached = self._cached_info(video_id)
+            if cached is not None:
+                cached_infos[video_id] = cached
+            elif video_id not in pending:
+                pending.append(video_id)
+
+        results = self._with_stats(cached_infos) if cached_infos else {}
+        if pending:
+            results.update(self._extract_infos(pending, max_workers))
+        return results
+
+    def _extract_infos(self, video_ids: List[str], max_workers: int = 4) -> Dict[str, Dict[str, any]]:
+        """Extração completa (yt-dlp) de vários vídeos, com um `YoutubeDL` por worker"""
+        results = {}
+        local = threading.local()
+        opened = []
+        opened_lock = threading.Lock()
+
+        def fetch(video_id: str) -> Dict[str, any]:
+            ydl = getattr(local, 'ydl', None)
+            if ydl is None:
+                ydl = yt_dlp.YoutubeDL(self._ydl_opts())
+                local.ydl = ydl
+                with opened_lock:
+                    opened.append(ydl)
+            try:
+                if self.deadline:
+                    self.deadline.check('metadados')
+                info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+                video_info = self._parse_video_info(info)
+                self._remember_info(video_info)
+                return video_info
+            except Exception as e:
+                return {
+                    'success': False,
+                    'video_id': video_id,
+                    'error': f'Error fetching video info: {str(e)}'
+                }
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(video_ids)))) as pool:
+                for video_id, video_info in zip(video_ids, pool.map(fetch, video_ids)):
+                    results[video_id] = video_info
+        finally:
+            for ydl in opened:
+                ydl.close()
+
+        return results
+
+    def prefetch_collection(
+        self,
+        collection_url: str,
+        limit: Optional[int] = None,
+        max_workers: int = 4
+        ) -> Dict[str, any]:
+        """
+        Enumera uma playlist/canal e carrega os metadados de todos os vídeos no cache
+
+        Args:
+            collection_url: URL da playlist ou do canal
+            limit: Número máximo de vídeos (None = todos)
+            max_workers: Tamanho máximo do pool de workers
+
+        Returns:
+            Dict com 'success', 'videos' (video_id -> metadados), 'failed' (IDs) e 'error'
+        """
+        listing = self.list_collection_videos(collection_url, limit=limit)
+        if not listing['success']:
+            return {'success': False, 'videos': {}, 'failed': [], 'error': listing['error']}
+
+        videos = self.get_videos_info([entry['url'] for entry in listing['entries']], max_workers=max_workers)
+        failed = [video_id for video_id, info in videos.items() if not info['success']]
+        return {
+            'success': True,
+            'videos': videos,
+            'failed': failed,
+            'error': None
+        }
     
-    def get_complete_data(self, video_url: str) -> Dict[str, any]:
+    @profiled
+    def get_complete_data(self, video_url: str, include_transcript: bool = True) -> Dict[str, any]:
         """
         Obtém tanto a transcrição quanto as informações do vídeo
         
         Args:
             video_url: URL do vídeo do YouTube
+            include_transcript: Com False, 'transcript' e 'transcript_segments'
+                ficam None quando a faixa está em disco (leia trechos com
+                `open_track`); idioma, hash e assinatura vêm do índice do arquivo
             
         Returns:
             Dict com transcrição e informações do vídeo combinadas
@@ -149,9 +1001,16 @@ class YouTubeService:
             return video_info
         
         # 2. busca transcrição
-        transcript_data = self.get_transcript(video_url)
+        transcript_data = None if include_transcript else self._transcript_summary(video_url)
+        if transcript_data is None:
+            transcript_data = self.get_transcript(video_url)
         
-        # 3. dados
+        # 3. vídeos já analisados com o mesmo conteúdo
+        near_duplicates = []
+        if transcript_data['success']:
+            near_duplicates = self.find_near_duplicates(video_info['video_id'], transcript_data.get('minhash'))
+
+        # 4. dados
         return {
             'success': transcript_data['success'],
             'video_id': video_info['video_id'],
@@ -169,6 +1028,9 @@ class YouTubeService:
             'transcript': transcript_data.get('transcript'),
             'transcript_language': transcript_data.get('language'),
             'transcript_is_generated': transcript_data.get('is_generated'),
+            'transcript_segments': transcript_data.get('segments'),
+            'transcript_hash': transcript_data.get('content_hash'),
+            'near_duplicates': near_duplicates,
             'error': transcript_data.get('error')
         }
     
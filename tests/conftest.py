@@ -0,0 +1,21 @@
+"""
+Configuração comum dos testes: dados em um diretório temporário e backend SQLite local
+"""
+
+import os
+import tempfile
+
+# as configurações leem o ambiente ao serem importadas; precisa vir antes de qualquer import de `src`
+os.environ["TUBETALK_DATA_DIR"] = tempfile.mkdtemp(prefix="tubetalk-tests-")
+os.environ["TUBETALK_BACKEND_URL"] = ""
+
+import pytest
+
+
+@pytest.fixture
+def segments():
+    """Segmentos curtos no formato de `get_transcript`"""
+    return [
+        {'text': f"frase número {i} sobre o assunto do vídeo", 'start': i * 2.0, 'duration': 2.0}
+        for i in range(200)
+    ]
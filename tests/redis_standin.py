@@ -0,0 +1,261 @@
+"""
+Servidor local que fala o protocolo do Redis, com os comandos usados por `RedisBackend`,
+para testar o backend compartilhado (e várias réplicas) sem um Redis instalado
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from services.shared_backend import FINISH_SCRIPT, RELEASE_SCRIPT
+
+
+class _Store:
+    """Chaves em memória: bytes ou listas, com validade opcional"""
+
+    def __init__(self):
+        self.data: Dict[bytes, object] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.lock = threading.Lock()
+
+    def alive(self, key: bytes) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def put(self, key: bytes, value, px: Optional[int] = None) -> None:
+        self.data[key] = value
+        if px is None:
+            self.expires.pop(key, None)
+        else:
+            self.expires[key] = time.monotonic() + px / 1000
+
+    def remove(self, key: bytes) -> int:
+        self.expires.pop(key, None)
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def items(self, key: bytes) -> deque:
+        if not self.alive(key):
+            self.data[key] = deque()
+        value = self.data[key]
+        if not isinstance(value, deque):
+            raise _CommandError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+
+class _CommandError(Exception):
+    pass
+
+
+def _release(store: _Store, keys: List[bytes], args: List[bytes]) -> int:
+    if store.alive(keys[0]) and store.data[keys[0]] == args[0]:
+        return store.remove(keys[0])
+    return 0
+
+
+def _finish(store: _Store, keys: List[bytes], args: List[bytes]) -> int:
+    if store.alive(keys[0]) and store.data[keys[0]] != args[0]:
+        return 0
+    store.put(keys[0], args[0], int(args[1]))
+    return 1
+
+
+# scripts aceitos por EVAL, reimplementados em Python
+SCRIPTS = {RELEASE_SCRIPT.encode('utf-8'): _release, FINISH_SCRIPT.encode('utf-8'): _finish}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.strip().split()  # comando inline (ex.: redis-cli, telnet)
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _reply(self, value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, _CommandError):
+            return b"-" + str(value).encode('utf-8') + b"\r\n"
+        if isinstance(value, str):
+            return b"+" + value.encode('utf-8') + b"\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        return b"*%d\r\n" % len(value) + b"".join(self._reply(item) for item in value)
+
+    def handle(self) -> None:
+        while True:
+            try:
+                args = self._read_command()
+            except (OSError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                with self.server.store.lock:
+                    reply = self.server.run(args[0].upper().decode('utf-8'), args[1:])
+            except _CommandError as e:
+                reply = e
+            except (IndexError, ValueError):
+                reply = _CommandError(f"ERR wrong arguments for '{args[0].decode('utf-8', 'replace')}'")
+            try:
+                self.wfile.write(self._reply(reply))
+            except OSError:
+                return
+
+
+class LocalRedisServer(socketserver.ThreadingTCPServer):
+    """
+    Stand-in do Redis em uma thread (ou processo) local
+
+    Aceita PING, AUTH, SELECT, GET, SET (NX/XX/PX/EX), DEL, EXISTS, RPUSH,
+    LMOVE, LREM, LRANGE, LLEN, FLUSHDB e EVAL dos scripts em `SCRIPTS`.
+    Todos os bancos são o mesmo; os dados somem quando o servidor para.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Inicializa o servidor (port=0 escolhe uma porta livre)
+
+        Args:
+            host: Endereço de escuta
+            port: Porta de escuta
+        """
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "LocalRedisServer":
+        """Atende em uma thread de fundo"""
+        self._thread = threading.Thread(target=self.serve_forever, name="redis-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "LocalRedisServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def run(self, command: str, args: List[bytes]):
+        """Executa um comando (com a trava do armazenamento já tomada)"""
+        store = self.store
+        if command == 'PING':
+            return 'PONG'
+        if command in ('AUTH', 'SELECT'):
+            return 'OK'
+        if command == 'FLUSHDB':
+            store.data.clear()
+            store.expires.clear()
+            return 'OK'
+        if command == 'GET':
+            if not store.alive(args[0]):
+                return None
+            value = store.data[args[0]]
+            if isinstance(value, deque):
+                raise _CommandError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+        if command == 'SET':
+            key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+            px = None
+            if b'PX' in options:
+                px = int(options[options.index(b'PX') + 1])
+            elif b'EX' in options:
+                px = int(options[options.index(b'EX') + 1]) * 1000
+            exists = store.alive(key)
+            if (b'NX' in options and exists) or (b'XX' in options and not exists):
+                return None
+            store.put(key, value, px)
+            return 'OK'
+        if command == 'DEL':
+            return sum(store.remove(key) for key in args if store.alive(key))
+        if command == 'EXISTS':
+            return sum(1 for key in args if store.alive(key))
+        if command == 'RPUSH':
+            items = store.items(args[0])
+            items.extend(args[1:])
+            return len(items)
+        if command == 'LLEN':
+            return len(store.items(args[0])) if store.alive(args[0]) else 0
+        if command == 'LRANGE':
+            if not store.alive(args[0]):
+                return []
+            items = list(store.items(args[0]))
+            start, stop = int(args[1]), int(args[2])
+            stop = len(items) if stop == -1 else stop + 1
+            return items[start:stop]
+        if command == 'LREM':
+            if not store.alive(args[0]):
+                return 0
+            items, count, value = store.items(args[0]), int(args[1]), args[2]
+            removed = 0
+            for _ in range(count if count > 0 else len(items)):
+                try:
+                    items.remove(value)
+                except ValueError:
+                    break
+                removed += 1
+            return removed
+        if command == 'LMOVE':
+            source, destination, where_from, where_to = args[0], args[1], args[2].upper(), args[3].upper()
+            if not store.alive(source) or not store.items(source):
+                return None
+            items = store.items(source)
+            value = items.popleft() if where_from == b'LEFT' else items.pop()
+            target = store.items(destination)
+            target.append(value) if where_to == b'RIGHT' else target.appendleft(value)
+            return value
+        if command == 'EVAL':
+            script = SCRIPTS.get(args[0])
+            if script is None:
+                raise _CommandError("NOSCRIPT o stand-in só executa os scripts de SCRIPTS")
+            count = int(args[1])
+            return script(store, args[2:2 + count], args[2 + count:])
+        raise _CommandError(f"ERR unknown command '{command}'")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Stand-in local do Redis para o backend compartilhado")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args(argv)
+
+    server = LocalRedisServer(args.host, args.port)
+    print(f"Escutando em {server.url} (Ctrl+C para parar)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import time
+
+from services.cache import TTLCache
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'a' passa a ser o mais recente
+    cache.set('c', 3)
+    assert 'b' not in cache and cache.get('a') == 1 and cache.get('c') == 3
+
+    cache.set('curta', 4, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get('curta', 'vencida') == 'vencida'
+    cache.delete('a')
+    assert len(cache) <= 1
+
@@ -0,0 +1,53 @@
+import numpy as np
+
+from services.chapter_service import _depth_scores, segment_chapters
+
+
+def _reference_depths(similarities):
+    # TextTiling direto: sobe para cada lado enquanto a similaridade não cai
+    depths = np.zeros_like(similarities)
+    for i, value in enumerate(similarities):
+        left = value
+        for j in range(i - 1, -1, -1):
+            if similarities[j] < left:
+                break
+            left = similarities[j]
+        right = value
+        for j in range(i + 1, len(similarities)):
+            if similarities[j] < right:
+                break
+            right = similarities[j]
+        depths[i] = (left - value) + (right - value)
+    return depths
+
+
+def test_depth_scores_match_texttiling():
+    rng = np.random.default_rng(0)
+    for size in (1, 2, 5, 50, 300):
+        similarities = rng.random(size)
+        assert np.allclose(_depth_scores(similarities), _reference_depths(similarities))
+        # empates (platôs) contam como subida, como no laço original
+        rounded = np.round(similarities, 1)
+        assert np.allclose(_depth_scores(rounded), _reference_depths(rounded))
+    assert _depth_scores(np.array([])).size == 0
+
+
+def test_depth_of_a_single_valley():
+    assert np.allclose(_depth_scores(np.array([0.9, 0.5, 0.2, 0.6, 0.8])), [0, 0.4, 1.3, 0.2, 0])
+
+
+def test_segment_chapters_splits_on_topic_change():
+    topics = ["futebol gol partida campeonato torcida", "receita forno farinha açúcar massa"]
+    segments = [
+        {'text': f"{topics[i // 60]} {i}", 'start': i * 5.0, 'duration': 5.0}
+        for i in range(120)
+    ]
+    chapters = segment_chapters(segments)
+    assert len(chapters) == 2
+    assert abs(chapters[1]['start'] - 300.0) <= 20.0
+    assert chapters[0]['start'] == 0.0 and chapters[-1]['end'] == 600.0
+
+
+def test_chapters_accept_a_segment_iterator(segments):
+    assert segment_chapters(iter(segments)) == segment_chapters(segments)
+    assert segment_chapters(iter([])) == []
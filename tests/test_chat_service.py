@@ -0,0 +1,51 @@
+from services.chat_service import ChatSession
+from services.llm_service import LLMService
+from services.transcript_store import TranscriptStore
+
+
+def test_context_reads_only_the_head_of_the_transcript_file(tmp_path, segments):
+    long_segments = [dict(segment, start=segment['start'] + 400.0 * copy) for copy in range(20) for segment in segments]
+    store = TranscriptStore(root=tmp_path, chunk_chars=512)
+    store.put(('abcdefghijk', 'pt', False), long_segments)
+    llm = LLMService(provider='ollama')
+
+    with store.open(('abcdefghijk', 'pt', False)) as handle:
+        read = []
+        original = handle.chunk_segments
+        handle.chunk_segments = lambda i: read.append(i) or original(i)
+        session = ChatSession({'title': "Vídeo"}, {'summary': "Resumo curto"}, transcript_file=handle)
+        context = session.context(llm)
+        blocks = len(handle)
+
+    assert "Transcrição: frase número 0" in context
+    assert 0 < len(read) < blocks / 4
+    # o contexto fica pronto: a sessão não guarda o arquivo
+    assert session._transcript_file is None and session.context(llm) == context
+
+
+class _CountingLLM:
+    """Responde tudo e conta as chamadas"""
+
+    def __init__(self):
+        self.real = LLMService(provider='ollama')
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+    def generate(self, prompt):
+        self.calls += 1
+        return {'success': True, 'text': "resposta", 'usage': None, 'error': None}
+
+
+def test_history_is_folded_in_batches():
+    llm = _CountingLLM()
+    session = ChatSession({'title': "Vídeo"}, max_turns=6)
+    for i in range(5):
+        assert session.ask(f"pergunta {i}", llm)['success']
+
+    # 10 mensagens, limite 6: o excesso (4) dispara um único resumo, não dois
+    assert session.fold_batch == 4
+    assert llm.calls == 5 + 1 and len(session.recent_turns) == 6
+    session.ask("pergunta 5", llm)
+    assert llm.calls == 6 + 1 and len(session.recent_turns) == 8
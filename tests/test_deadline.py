@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from configs.timeout_config import LLM_MAX_RETRIES, LLM_REQUEST_TIMEOUT
+from services.deadline import Cancelled, Deadline, DeadlineExceeded, run_with_deadline
+from services.llm_service import LLMService
+from services.scheduler import LLMScheduler
+from services.youtube_service import YouTubeService, _TimeoutSession
+
+
+def test_child_gets_a_share_of_the_remaining_time():
+    deadline = Deadline(10)
+    child = deadline.child(0.5)
+    assert 4.5 < child.remaining() <= 5.0
+    assert Deadline().remaining() is None
+    assert deadline.timeout(3) == 3
+    assert Deadline(1).timeout(30) <= 1
+
+
+def test_cancel_reaches_children():
+    deadline = Deadline(10)
+    child = deadline.child(0.5)
+    deadline.cancel()
+    with pytest.raises(Cancelled):
+        child.check("etapa")
+
+
+def test_run_with_deadline_returns_or_gives_up():
+    assert run_with_deadline(lambda: 42, Deadline(5)) == 42
+    assert run_with_deadline(lambda: 7, None) == 7
+
+    release = threading.Event()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        run_with_deadline(release.wait, Deadline(0.3), poll=0.05)
+    assert time.monotonic() - started < 1.0
+
+    deadline = Deadline(5)
+    threading.Timer(0.1, deadline.cancel).start()
+    with pytest.raises(Cancelled):
+        run_with_deadline(lambda: release.wait(2), deadline, poll=0.05)
+    release.set()
+
+
+class _FakeApi:
+    sessions = []
+
+    def __init__(self, http_client):
+        self.sessions.append(http_client)
+
+    def list(self, video_id):
+        return f"faixas de {video_id}"
+
+
+def test_cached_track_list_does_not_keep_the_first_request_timeout(monkeypatch):
+    monkeypatch.setattr("services.youtube_service.YouTubeTranscriptApi", _FakeApi)
+    monkeypatch.setattr(YouTubeService, "_track_list_cache", type(YouTubeService._track_list_cache)(maxsize=4, ttl=60))
+
+    # a primeira requisição está quase sem tempo; a sessão guardada não pode herdar isso
+    YouTubeService(deadline=Deadline(0.5)).list_transcripts("abcdefghijk")
+    [session] = _FakeApi.sessions
+    assert isinstance(session, _TimeoutSession)
+    assert session.timeout == YouTubeService().timeout
+
+
+def test_fallback_fetch_respects_the_deadline():
+    release = threading.Event()
+
+    class SlowTrack:
+        def fetch(self):
+            release.wait(5)
+
+    service = YouTubeService(deadline=Deadline(0.3))
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        list(service._iter_segments(SlowTrack()))
+    assert time.monotonic() - started < 1.5
+    release.set()
+
+
+def test_llm_client_timeout_and_retries_fit_the_deadline():
+    service = LLMService(provider='openai', api_key='sk-teste', deadline=Deadline(30))
+    client, per_call = service._client_for_call()
+    assert per_call and client.root_client.timeout <= 30 and client.root_client.max_retries == 0
+
+    service.deadline = Deadline(1000)
+    client, _ = service._client_for_call()
+    assert client.root_client.timeout == LLM_REQUEST_TIMEOUT and client.root_client.max_retries == LLM_MAX_RETRIES
+
+    service.deadline = None
+    assert service._client_for_call() == (service.llm, False)
+
+
+class _HangingClient:
+    """Cliente preso até o HTTP ser fechado"""
+
+    def __init__(self):
+        self.closed = threading.Event()
+        self.root_client = self
+
+    def close(self):
+        self.closed.set()
+
+    def invoke(self, prompt):
+        self.closed.wait(5)
+        raise ConnectionError("conexão fechada")
+
+
+def test_abandoned_llm_call_is_closed_and_frees_its_slot(monkeypatch):
+    service = LLMService(provider='openai', api_key='sk-teste', deadline=Deadline(0.3))
+    service.scheduler = LLMScheduler(max_concurrent=1, interactive_reserve=0)
+    clients = []
+    monkeypatch.setattr(service, '_initialize_llm', lambda timeout, retries: clients.append(_HangingClient()) or clients[-1])
+
+    result = service.generate("pergunta qualquer")
+    assert not result['success'] and "esgotado" in result['error']
+    [client] = clients
+    assert client.closed.is_set()
+    assert _wait_until(lambda: service.scheduler.metrics()['analysis']['running'] == 0)
+
+
+def _wait_until(condition, timeout=2.0):
+    limit = time.monotonic() + timeout
+    while time.monotonic() < limit:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
@@ -0,0 +1,20 @@
+from configs.evaluation_config import DEFAULT_VARIANTS
+from services.evaluation import EvaluationHarness, rouge, topic_coverage
+
+
+def test_rouge_and_topic_coverage():
+    assert rouge("o gato subiu", "o gato subiu")['rougeL'] == 1.0
+    assert rouge("nada igual", "o gato subiu")['rouge1'] == 0.0
+    assert topic_coverage("fala sobre economia e política", ["economia", "astronomia"]) == 0.5
+    assert topic_coverage("texto", []) is None
+
+
+def test_parallel_variant_beats_baseline_with_the_stub(segments):
+    transcript = " ".join(segment['text'] for segment in segments)
+    variants = [variant for variant in DEFAULT_VARIANTS if variant['name'] in ('baseline', 'parallel')]
+    harness = EvaluationHarness([{'video_id': 'abcdefghijk', 'transcript': transcript}], variants)
+    harness.run()
+
+    rows = {row['variant']: row for row in harness.summary()}
+    assert rows['baseline']['failures'] == 0 and rows['parallel']['failures'] == 0
+    assert rows['parallel']['latency_mean'] < 0.8 * rows['baseline']['latency_mean']
@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+from services.library_service import LibraryService
+
+
+def _video(video_id, title, words, channel="Canal"):
+    segments = [{'text': f"{word} trecho {i}", 'start': i * 10.0, 'duration': 10.0} for i, word in enumerate(words)]
+    return {
+        'video_id': video_id,
+        'title': title,
+        'channel': channel,
+        'publish_date': "2024-05-01",
+        'keywords': ["python"],
+        'transcript': " ".join(segment['text'] for segment in segments),
+        'transcript_segments': segments,
+    }
+
+
+@pytest.fixture
+def library(tmp_path):
+    return LibraryService(tmp_path / "library.db")
+
+
+def test_search_returns_hits_per_video(library):
+    library.add_video(_video("a" * 11, "Aula de bancos", ["índice", "tabela"] * 10), {'summary': "bancos de dados"})
+    library.add_video(_video("b" * 11, "Outra aula", ["índice", "lista"] * 10), {'summary': "estruturas"})
+
+    found = library.search("índice", hits_per_video=2)
+    assert found['success']
+    assert {result['video_id'] for result in found['results']} == {"a" * 11, "b" * 11}
+    for result in found['results']:
+        assert 1 <= len(result['hits']) <= 2
+        assert all("**" in hit['text'] for hit in result['hits'])
+
+    assert [r['video_id'] for r in library.search("bancos")['results']] == ["a" * 11]
+    assert library.search("índice", channel="Nenhum")['results'] == []
+
+
+def test_re_adding_a_video_replaces_its_text(library):
+    library.add_video(_video("a" * 11, "Primeira", ["antigo"] * 5))
+    library.add_video(_video("a" * 11, "Segunda", ["novo"] * 5))
+    assert library.search("antigo")['results'] == []
+    [result] = library.search("novo")['results']
+    assert result['title'] == "Segunda"
+
+    library.remove_video("a" * 11)
+    assert library.search("novo")['results'] == []
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    # formato antigo: `video_id UNINDEXED` dentro das próprias tabelas FTS
+    db_path = tmp_path / "library.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE VIRTUAL TABLE documents USING fts5(
+            video_id UNINDEXED, title, tags, summary, topics, article, transcript,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+        CREATE VIRTUAL TABLE segments USING fts5(
+            video_id UNINDEXED, start UNINDEXED, text,
+            tokenize = 'unicode61 remove_diacritics 2'
+        );
+        INSERT INTO documents VALUES ('aaaaaaaaaaa', 'Antiga', 'python', 'resumo', '', '', 'migrado');
+        INSERT INTO segments VALUES ('aaaaaaaaaaa', 0.0, 'migrado no início');
+    """)
+    conn.close()
+
+    library = LibraryService(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO videos (video_id, title) VALUES ('aaaaaaaaaaa', 'Antiga')")
+    [result] = library.search("migrado")['results']
+    assert result['hits'] == [{'start': 0.0, 'text': "**migrado** no início"}]
+
+    library.add_video(_video("a" * 11, "Nova", ["atual"] * 5))
+    assert library.search("migrado")['results'] == []
+    assert library.search("atual")['results'][0]['title'] == "Nova"
+
+
+def test_transcript_text_comes_from_segment_iterator(library):
+    video = _video("c" * 11, "Sem texto", ["coruja", "gato"] * 10)
+    video.pop('transcript')
+    segments = video.pop('transcript_segments')
+    assert library.add_video(video, segments=iter(segments))['success']
+    [hit] = library.search("coruja")['results']
+    assert hit['video_id'] == "c" * 11 and hit['hits'][0]['start'] == 0.0
@@ -0,0 +1,44 @@
+import pytest
+
+from services.prompt_registry import PROMPTS, PromptRegistry, PromptTemplate, TemplateError
+
+
+def test_render_does_not_interpret_braces_in_values():
+    template = PromptTemplate('resumo', "Resuma {{em JSON}}: {transcript} ({language})", required=['transcript'])
+    assert template.fields == ('transcript', 'language')
+    assert template.static_text == "Resuma {em JSON}:  ()"
+    text = template.render(transcript="código {x} e {}", language="pt", extra="ignorado")
+    assert text == "Resuma {em JSON}: código {x} e {} (pt)"
+
+    with pytest.raises(TemplateError):
+        template.render(transcript="só um campo")
+
+
+@pytest.mark.parametrize("text", ["{0}", "{a.b}", "{a:>10}", "{a!r}", "chave {aberta", "sem campos"])
+def test_invalid_templates_fail_when_loaded(text):
+    with pytest.raises(TemplateError):
+        PromptTemplate('ruim', text, required=['a'])
+
+
+def test_provider_variants_keep_the_fields_and_change_the_version():
+    registry = PromptRegistry()
+    base = registry.register('summary', "Resuma: {transcript}", required=['transcript'])
+    version = registry.version(['summary'])
+    assert registry.get('summary', 'ollama') is base
+
+    variant = registry.register('summary', "Resumo curto de {transcript}", provider='ollama')
+    assert registry.get('summary', 'ollama') is variant and registry.get('summary') is base
+    assert registry.version(['summary'], 'ollama') != version
+    assert registry.version(['summary']) == version
+
+    with pytest.raises(TemplateError):
+        registry.register('summary', "Sem o campo", provider='groq')
+    with pytest.raises(TemplateError):
+        registry.get('inexistente')
+
+
+def test_shipped_templates_compile():
+    assert PROMPTS.names()
+    for name in PROMPTS.names():
+        assert PROMPTS.get(name).fields
+    assert PROMPTS.compile("Texto: {transcript}") is PROMPTS.compile("Texto: {transcript}")
@@ -0,0 +1,81 @@
+import json
+import sqlite3
+import zipfile
+from datetime import date
+
+import pytest
+
+from services.result_store import EXPORT_FIELDS, ResultStore
+
+
+VIDEO = {'video_id': 'abcdefghijk', 'title': 'Título', 'channel': 'Canal', 'publish_date': date(2024, 5, 1), 'transcript_hash': 'h1'}
+ANALYSIS = {
+    'summary': 'Resumo {com chaves}',
+    'topics': '- tópico',
+    'chapters': [{'start': 0.0, 'title': 'Abertura'}],
+    'article': 'Artigo',
+    'usage': {'calls': 3, 'total_tokens': 1200},
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    store.put(VIDEO, ANALYSIS, 'ollama', 'llama3', 'v1')
+    store.put({**VIDEO, 'video_id': 'outrovideo1', 'channel': 'Outro'}, ANALYSIS, 'groq', 'llama-3.3', 'v1')
+    return store
+
+
+def test_get_respects_the_key_and_the_transcript_hash(store):
+    analysis = store.get('abcdefghijk', 'ollama', 'llama3', 'v1')
+    assert analysis['chapters'] == ANALYSIS['chapters'] and analysis['usage'] == ANALYSIS['usage']
+    assert analysis['prompt_version'] == 'v1'
+    assert store.get('abcdefghijk', 'ollama', 'llama3', 'v2') is None
+    assert store.get('abcdefghijk', 'ollama', 'llama3', 'v1', transcript_hash='outro') is None
+    assert store.put({'title': 'sem id'}, ANALYSIS, 'ollama', 'llama3', 'v1')['success'] is False
+
+
+def test_jsonl_and_markdown_exports(store, tmp_path):
+    assert store.export_jsonl(tmp_path / "todos.jsonl") == 2
+    assert store.export_jsonl(tmp_path / "canal.jsonl", channel='Canal') == 1
+    [record] = [json.loads(line) for line in (tmp_path / "canal.jsonl").read_text(encoding='utf-8').splitlines()]
+    assert tuple(record) == EXPORT_FIELDS
+    assert record['publish_date'] == '2024-05-01' and record['chapters'] == ANALYSIS['chapters']
+
+    assert store.export_markdown(tmp_path / "docs.zip", provider='groq') == 1
+    with zipfile.ZipFile(tmp_path / "docs.zip") as bundle:
+        [name] = bundle.namelist()
+        document = bundle.read(name).decode('utf-8')
+    assert name == "outrovideo1_groq_llama-3.3_v1.md"
+    assert document.startswith("# Título\n") and "## Resumo\n\nResumo {com chaves}" in document
+
+
+def test_parquet_export_writes_row_groups(store, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    assert store.export_parquet(tmp_path / "r.parquet", batch_size=1) == 2
+    table = pq.read_table(tmp_path / "r.parquet")
+    assert pq.ParquetFile(tmp_path / "r.parquet").num_row_groups == 2
+    assert table.column_names == [f for f in EXPORT_FIELDS if f not in ('chapters', 'usage')] + ['chapters', 'usage']
+    assert json.loads(table.column('usage')[0].as_py()) == ANALYSIS['usage']
+
+
+def test_databases_without_transcript_hash_are_migrated(tmp_path):
+    path = tmp_path / "antigo.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE results (video_id TEXT NOT NULL, provider TEXT NOT NULL, model TEXT NOT NULL, "
+            "template_version TEXT NOT NULL, created_at TEXT NOT NULL, title TEXT, channel TEXT, "
+            "publish_date TEXT, summary TEXT, topics TEXT, chapters TEXT, article TEXT, usage TEXT, "
+            "PRIMARY KEY (video_id, provider, model, template_version))"
+        )
+        conn.execute(
+            "INSERT INTO results (video_id, provider, model, template_version, created_at, summary) "
+            "VALUES ('antigo00001', 'openai', 'gpt', 'v0', '2024-01-01T00:00:00', 'resumo antigo')"
+        )
+    conn.close()
+
+    store = ResultStore(path)
+    old = store.get('antigo00001', 'openai', 'gpt', 'v0', transcript_hash='qualquer')
+    assert old['summary'] == 'resumo antigo' and old['transcript_hash'] is None
+    assert store.put(VIDEO, ANALYSIS, 'ollama', 'llama3', 'v1')['success']
+    assert len(store) == 2
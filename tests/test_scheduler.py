@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from services.deadline import Deadline, DeadlineExceeded
+from services.llm_service import LLMService
+from services.scheduler import LLMScheduler
+
+
+class _BlockingLLM:
+    """Imita o cliente do Ollama, preso até `release`"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.finished = threading.Event()
+
+    def generate(self, prompts):
+        self.release.wait(5)
+        self.finished.set()
+        raise RuntimeError("resposta descartada")
+
+
+def _wait_until(condition, timeout=2.0):
+    limit = time.monotonic() + timeout
+    while time.monotonic() < limit:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_abandoned_call_keeps_its_slot_until_it_finishes():
+    scheduler = LLMScheduler(max_concurrent=1, interactive_reserve=0)
+    service = LLMService(provider='ollama', deadline=Deadline(0.3))
+    service.scheduler = scheduler
+    service.llm = _BlockingLLM()
+
+    result = service.generate("pergunta qualquer")
+    assert not result['success'] and "esgotado" in result['error']
+
+    # quem chamou já voltou, mas o provedor ainda está ocupado com a chamada
+    assert scheduler.metrics()['analysis']['running'] == 1
+    waiting = []
+    thread = threading.Thread(target=lambda: waiting.append(scheduler.acquire('chat')))
+    thread.start()
+    thread.join(0.3)
+    assert thread.is_alive()
+
+    service.llm.release.set()
+    assert service.llm.finished.wait(2)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert scheduler.metrics()['analysis']['running'] == 0
+    assert scheduler.metrics()['chat']['running'] == 1
+    waiting[0]()
+    waiting[0]()  # devolver de novo não tem efeito
+    assert scheduler.metrics()['chat']['running'] == 0
+
+
+def test_fair_queue_serves_light_tenants_first():
+    scheduler = LLMScheduler(max_concurrent=1, interactive_reserve=0)
+    release = scheduler.acquire('analysis', 'ocupante')
+    order = []
+
+    def call(tenant):
+        with scheduler.slot('analysis', tenant):
+            order.append(tenant)
+
+    threads = []
+    for tenant in ['pesado', 'pesado', 'pesado', 'leve']:
+        thread = threading.Thread(target=call, args=(tenant,))
+        thread.start()
+        threads.append(thread)
+        assert _wait_until(lambda: scheduler.metrics()['analysis']['queued'] == len(threads))
+
+    release()
+    for thread in threads:
+        thread.join(2)
+    assert order.index('leve') <= 1
+
+
+def test_batch_never_takes_the_interactive_reserve():
+    scheduler = LLMScheduler(max_concurrent=2, interactive_reserve=1, slo_seconds={})
+    first = scheduler.acquire('batch')
+
+    granted = []
+    thread = threading.Thread(target=lambda: granted.append(scheduler.acquire('batch', poll=0.05)))
+    thread.start()
+    thread.join(0.3)
+    assert thread.is_alive() and scheduler.metrics()['batch']['deferred'] > 0
+
+    # a vaga reservada continua livre para o chat
+    chat = scheduler.acquire('chat', deadline=Deadline(0.5))
+    chat()
+    first()
+    thread.join(2)
+    assert granted
+    granted[0]()
+    assert scheduler.metrics()['batch']['running'] == 0
+
+
+def test_caller_that_gives_up_in_the_queue_leaves_it():
+    scheduler = LLMScheduler(max_concurrent=1, interactive_reserve=0)
+    release = scheduler.acquire('analysis')
+    with pytest.raises(DeadlineExceeded):
+        with scheduler.slot('chat', deadline=Deadline(0.1), poll=0.02):
+            pass
+    assert scheduler.metrics()['chat']['queued'] == 0
+    release()
+    assert scheduler.metrics()['analysis']['running'] == 0
+
+
+def test_finish_times_of_served_tenants_are_pruned():
+    scheduler = LLMScheduler(max_concurrent=1, interactive_reserve=0)
+    for session in range(50):
+        with scheduler.slot('chat', f"sessão-{session}"):
+            pass
+    assert scheduler._last_finish == {}
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from configs.backend_config import JOB_MAX_ATTEMPTS
+from redis_standin import LocalRedisServer
+from services.shared_backend import RedisBackend, SharedBackend, SQLiteBackend
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        yield SQLiteBackend(tmp_path / "shared.db")
+        return
+    with LocalRedisServer() as server:
+        backend = RedisBackend(server.url, prefix="test:")
+        yield backend
+        backend.close()
+
+
+def test_only_the_current_lease_holder_finishes_a_job(backend):
+    backend.enqueue('analysis', {'url': 'x'}, job_id='job-1')
+    slow = backend.claim('analysis', 'lento', lease=0.05)
+    time.sleep(0.1)
+
+    # a reserva venceu: outro worker retoma a tarefa
+    taken = backend.claim('analysis', 'novo')
+    assert taken['id'] == slow['id'] and taken['attempts'] == 2
+
+    assert backend.complete('job-1', 'lento', {'de': 'lento'}) is False
+    assert backend.fail('job-1', 'lento', "erro tardio") is False
+    assert backend.job('job-1')['status'] == 'running'
+
+    assert backend.complete('job-1', 'novo', {'de': 'novo'}) is True
+    job = backend.job('job-1')
+    assert job['status'] == 'done' and job['result'] == {'de': 'novo'}
+    assert backend.complete('job-1', 'novo', {'de': 'de novo'}) is False
+
+
+def test_expired_lease_nobody_took_still_counts(backend):
+    backend.enqueue('analysis', {'url': 'x'}, job_id='job-2')
+    backend.claim('analysis', 'lento', lease=0.05)
+    time.sleep(0.1)
+
+    assert backend.fail('job-2', 'lento', "erro") is True
+    assert backend.job('job-2')['status'] == 'queued'
+    assert backend.claim('analysis', 'outro')['id'] == 'job-2'
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SharedBackend()
+
+
+def test_cache_values_expire(backend):
+    backend.set('chave', {'a': (1, 2)}, ttl=0.05)
+    assert backend.get('chave') == {'a': [1, 2]}
+    time.sleep(0.1)
+    assert backend.get('chave', 'vencida') == 'vencida'
+
+    backend.set('fixa', [1])
+    backend.delete('fixa')
+    assert backend.get('fixa') is None
+
+
+def test_lock_has_a_single_owner_until_it_expires(backend):
+    token = backend.acquire('trava', ttl=0.2)
+    assert token is not None
+    assert backend.acquire('trava') is None
+    assert backend.release('trava', 'outro-token') is False
+    assert backend.release('trava', token) is True
+
+    backend.acquire('trava', ttl=0.05)
+    time.sleep(0.1)
+    assert backend.acquire('trava') is not None  # o dono caiu: a trava venceu sozinha
+
+
+def test_single_flight_runs_the_work_once(backend):
+    runs = []
+
+    def work():
+        with backend.single_flight('video', ttl=5, wait=5) as owner:
+            assert owner
+            if backend.get('resultado') is None:
+                runs.append(1)
+                time.sleep(0.1)
+                backend.set('resultado', 'pronto')
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert runs == [1]
+
+
+def test_queue_is_fifo_and_deduplicates_pending_jobs(backend):
+    assert backend.enqueue('analysis', {'n': 1}, job_id='a')['created'] is True
+    assert backend.enqueue('analysis', {'n': 1}, job_id='a')['created'] is False
+    backend.enqueue('analysis', {'n': 2}, job_id='b')
+    assert backend.pending('analysis') == {'queued': 2, 'running': 0}
+
+    first = backend.claim('analysis', 'w1')
+    assert first['id'] == 'a' and first['payload'] == {'n': 1} and first['status'] == 'running'
+    assert backend.claim('analysis', 'w2')['id'] == 'b'
+    assert backend.claim('analysis', 'w3') is None
+    assert backend.pending('analysis') == {'queued': 0, 'running': 2}
+
+    backend.complete('a', 'w1', 'ok')
+    # concluída, a tarefa pode ser enfileirada de novo
+    assert backend.enqueue('analysis', {'n': 1}, job_id='a')['created'] is True
+
+
+def test_failures_retry_until_the_attempt_limit(backend):
+    backend.enqueue('analysis', {}, job_id='falha')
+    for attempt in range(1, JOB_MAX_ATTEMPTS + 1):
+        job = backend.claim('analysis', 'w')
+        assert job['attempts'] == attempt
+        backend.fail('falha', 'w', f"erro {attempt}")
+    job = backend.job('falha')
+    assert job['status'] == 'failed' and job['error'] == f"erro {JOB_MAX_ATTEMPTS}"
+    assert backend.claim('analysis', 'w') is None
+
+
+def test_expired_leases_stop_after_the_attempt_limit(backend):
+    backend.enqueue('analysis', {}, job_id='travada')
+    for _ in range(JOB_MAX_ATTEMPTS):
+        assert backend.claim('analysis', 'w', lease=0.02)['id'] == 'travada'
+        time.sleep(0.05)
+    assert backend.claim('analysis', 'w') is None
+    assert backend.job('travada')['status'] == 'failed'
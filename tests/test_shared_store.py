@@ -0,0 +1,78 @@
+import os
+import time
+
+from services.shared_store import SharedStore
+
+
+def test_shared_store_spills_unpinned_entries_and_reloads_them(tmp_path):
+    value = "x" * 4000
+    store = SharedStore(max_bytes=10_000, spill_dir=tmp_path)
+    store.put('video:a', value)
+    store.acquire('video:a', 'sessão-1')
+    store.put('video:b', value)
+    store.put('video:c', value)
+
+    # 'a' está reservada: quem sai da memória é a menos usada sem reserva
+    usage = store.usage()
+    assert usage['bytes'] <= 10_000 and usage['spilled'] == 1 and usage['pinned'] == 1
+    assert 'video:b' in store
+    assert store.get('video:b') == value
+    assert store.usage()['reloaded'] == 1
+
+    # recarregar 'b' estourou o limite de novo: agora 'c' está no disco
+    assert store.usage()['spilled'] == 2 and len(list(tmp_path.iterdir())) == 1
+    store.delete('video:b')
+    assert 'video:b' not in store and 'video:c' in store
+
+
+def test_shared_store_without_spill_drops_entries_after_release():
+    value = "y" * 4000
+    store = SharedStore(max_bytes=6_000)
+    store.put('a', value)
+    store.acquire('a', 'sessão')
+    store.put('b', value)
+    assert store.get('a') == value and store.get('b') is None
+    assert store.usage()['evicted'] == 1
+
+    store.put('c', value)  # não cabe e 'a' continua reservada: sai 'c'
+    assert store.get('a') == value and store.get('c') is None
+    store.release('a', 'sessão')
+    store.put('d', value)  # sem reserva, 'a' é a menos usada
+    assert store.get('a') is None and store.get('d') == value
+
+
+def test_shared_store_lease_expires():
+    store = SharedStore(max_bytes=5_000, lease_seconds=0.05)
+    store.put('a', "z" * 4000)
+    store.acquire('a', 'sessão abandonada')
+    time.sleep(0.1)
+    store.put('b', "z" * 4000)
+    assert store.get('a') is None and store.get('b') is not None
+
+
+def test_pinned_entries_spill_once_the_unpinned_ones_are_gone(tmp_path):
+    value = "p" * 4000
+    store = SharedStore(max_bytes=10_000, spill_dir=tmp_path)
+    for session, key in enumerate(['video:a', 'video:b', 'video:c']):
+        store.acquire(key, f"sessão-{session}")
+        store.put(key, value)
+
+    # todas reservadas: a menos usada vai para o disco mesmo assim
+    usage = store.usage()
+    assert usage['bytes'] <= 10_000 and usage['spilled'] == 1 and usage['pinned'] == 3
+    assert store.get('video:a') == value and store.usage()['reloaded'] == 1
+
+
+def test_old_spill_files_are_purged(tmp_path):
+    stale = tmp_path / "execucao-anterior.pkl.z"
+    stale.write_bytes(b"lixo")
+    old = time.time() - 7200
+    os.utime(stale, (old, old))
+    store = SharedStore(max_bytes=5_000, spill_dir=tmp_path, spill_ttl=3600)
+    assert not stale.exists() and store.usage()['expired'] == 1
+
+    store.put('a', "q" * 4000)
+    store.put('b', "q" * 4000)
+    spilled = next(tmp_path.iterdir())
+    os.utime(spilled, (old, old))
+    assert store.get('a') is None and not spilled.exists()
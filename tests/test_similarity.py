@@ -0,0 +1,45 @@
+import numpy as np
+
+from services.similarity import MinHasher, SimilarityIndex
+from services.transcript_store import TranscriptStore
+from services.youtube_service import YouTubeService
+
+
+TEXT = " ".join(f"palavra{i}" for i in range(300))
+
+
+def test_signature_is_deterministic_and_sized():
+    hasher = MinHasher(num_perm=64)
+    signature = hasher.signature(TEXT)
+    assert signature.dtype == np.uint32 and signature.shape == (64,)
+    assert np.array_equal(signature, MinHasher(num_perm=64).signature(TEXT))
+    assert hasher.signature("") is None
+
+
+def test_index_finds_near_duplicates_only():
+    hasher = MinHasher()
+    index = SimilarityIndex()
+    index.add("original", hasher.signature(TEXT))
+    index.add("outro", hasher.signature(" ".join(f"termo{i}" for i in range(300))))
+
+    almost = TEXT.replace("palavra150", "trocada")
+    matches = index.query(hasher.signature(almost), threshold=0.8)
+    assert [match['video_id'] for match in matches] == ["original"]
+    assert matches[0]['similarity'] >= 0.8
+    assert index.query(hasher.signature(TEXT), exclude="original") == []
+
+
+def test_index_is_rebuilt_from_stored_transcripts(tmp_path, monkeypatch, segments):
+    store = TranscriptStore(root=tmp_path)
+    signature = YouTubeService._minhasher.signature(TEXT)
+    store.put(("abcdefghijk", "pt", False), segments, minhash=signature)
+    store.put(("semassinatu", "pt", False), segments)
+
+    # processo novo: índice vazio, ainda não carregado
+    monkeypatch.setattr(YouTubeService, "_transcript_store", store)
+    monkeypatch.setattr(YouTubeService, "_similarity_index", SimilarityIndex())
+    monkeypatch.setattr(YouTubeService, "_similarity_loaded", False)
+
+    matches = YouTubeService().find_near_duplicates("zzzzzzzzzzz", signature)
+    assert [match['video_id'] for match in matches] == ["abcdefghijk"]
+    assert len(YouTubeService._similarity_index) == 2
@@ -0,0 +1,36 @@
+from services.token_budget import CHARS_PER_TOKEN, TokenCounter, estimate_cost
+
+
+TEXT = " ".join(f"palavra{i}" for i in range(400))
+
+
+def test_heuristic_counter_splits_on_word_boundaries():
+    counter = TokenCounter('ollama', 'llama3')
+    assert not counter.is_exact
+    assert counter.count("") == 0
+    assert counter.count("abcdefg") == 2  # 7 caracteres / 3.5
+
+    chunks = counter.split(TEXT, 100)
+    assert " ".join(chunks) == TEXT
+    assert all(len(chunk) <= 100 * CHARS_PER_TOKEN for chunk in chunks)
+    assert all(not chunk.startswith(" ") and "palavra" in chunk for chunk in chunks)
+
+
+def test_clip_keeps_the_start_within_the_limit():
+    counter = TokenCounter('groq')
+    clipped = counter.clip(TEXT, 50)
+    assert TEXT.startswith(clipped) and counter.count(clipped) <= 50
+    assert counter.clip("curto", 50) == "curto"
+
+
+def test_exact_counter_when_the_vocabulary_is_available():
+    counter = TokenCounter('openai', 'gpt-4o-mini')
+    if not counter.is_exact:
+        return  # sem rede para baixar o vocabulário: a heurística já foi testada acima
+    chunks = counter.split(TEXT, 64)
+    assert "".join(chunks) == TEXT
+    assert all(counter.count(chunk) <= 64 for chunk in chunks)
+
+
+def test_cost_is_unknown_for_unpriced_models():
+    assert estimate_cost('modelo-desconhecido', 1000, 1000) is None
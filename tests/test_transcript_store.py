@@ -0,0 +1,147 @@
+import json
+import os
+import struct
+import time
+
+import numpy as np
+import pytest
+
+from services.transcript_store import MAGIC, TranscriptFile, TranscriptStore, content_hash
+from services.youtube_service import YouTubeService
+
+
+KEY = ('abcdefghijk', 'pt', False)
+
+
+def _text(segments):
+    return " ".join(segment['text'] for segment in segments)
+
+
+def test_file_layout_is_magic_blocks_index_and_footer(tmp_path, segments):
+    store = TranscriptStore(root=tmp_path, chunk_chars=512)
+    path = store.put(KEY, segments, minhash=np.arange(8, dtype=np.uint32), content_hash="abc")
+    assert path.name == "abcdefghijk.pt.manual.tts"
+
+    raw = path.read_bytes()
+    assert raw[:4] == MAGIC and raw[-4:] == MAGIC
+    index_offset, index_length, _ = struct.unpack("<QI4s", raw[-16:])
+    index = json.loads(raw[index_offset:index_offset + index_length])
+    assert index['segments'] == len(segments) and index['chars'] == len(_text(segments))
+    assert index['minhash'] == list(range(8)) and index['content_hash'] == "abc"
+    # blocos contíguos logo depois do MAGIC, terminando onde começa o índice
+    chunks = index['chunks']
+    assert len(chunks) > 1 and chunks[0][0] == len(MAGIC)
+    assert all(a[0] + a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+    assert chunks[-1][0] + chunks[-1][1] == index_offset
+
+
+def test_partial_reads_match_the_full_transcript(tmp_path, segments):
+    store = TranscriptStore(root=tmp_path, chunk_chars=512)
+    store.put(KEY, segments)
+    with store.open(KEY) as track:
+        assert track.segments() == segments
+        assert track.text() == _text(segments)
+        assert track.text(start=100, end=110) == _text(s for s in segments if s['start'] + s['duration'] >= 100 and s['start'] <= 110)
+        assert _text(segments).startswith(track.head(300)) and len(track.head(300)) >= 300
+        assert track.to_dict()['content_hash'] == content_hash(_text(segments))
+        assert track.chunk_range(0)[0] == 0.0
+
+
+def test_truncated_and_expired_files_are_dropped(tmp_path, segments):
+    store = TranscriptStore(root=tmp_path, ttl=60)
+    path = store.put(KEY, segments)
+    with pytest.raises(ValueError):
+        TranscriptFile(_truncated_copy(path, tmp_path))
+
+    path.write_bytes(path.read_bytes()[:-10])
+    assert store.open(KEY) is None and not path.exists()
+
+    path = store.put(KEY, segments)
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert store.open(KEY) is None and not path.exists()
+
+
+def _truncated_copy(path, directory):
+    copy = directory / "truncado.tts"
+    copy.write_bytes(path.read_bytes()[:-1])
+    return copy
+
+
+def test_unsafe_key_parts_stay_inside_the_store(tmp_path, segments):
+    store = TranscriptStore(root=tmp_path)
+    path = store.put(('../fora', 'pt/BR', True), segments[:3])
+    assert path.parent == tmp_path and path.name == "___fora.pt_BR.auto.tts"
+    assert store.paths('../fora') == [path]
+
+
+class _Track:
+    language_code = 'pt'
+    is_generated = False
+
+    def fetch(self):
+        raise AssertionError("a faixa está em cache; não deveria baixar")
+
+
+def _opened_files(monkeypatch, store):
+    opened = []
+    original = store.open
+
+    def tracking_open(key):
+        handle = original(key)
+        if handle is not None:
+            opened.append(handle)
+        return handle
+
+    monkeypatch.setattr(store, 'open', tracking_open)
+    return opened
+
+
+def test_cached_tracks_are_not_left_mapped(monkeypatch, tmp_path, segments):
+    store = TranscriptStore(root=tmp_path, chunk_chars=256)
+    store.put(('abcdefghijk', 'pt', False), segments)
+    monkeypatch.setattr(YouTubeService, '_transcript_store', store)
+    monkeypatch.setattr(YouTubeService, '_transcript_cache', type(YouTubeService._transcript_cache)(maxsize=4))
+    opened = _opened_files(monkeypatch, store)
+    service = YouTubeService()
+
+    data = service._fetch_track('abcdefghijk', _Track())
+    assert data['segments'] == segments
+
+    monkeypatch.setattr(service, 'list_transcripts', lambda video_id: None)
+    monkeypatch.setattr(service, 'select_track', lambda transcripts, languages: _Track())
+    stream = service.stream_transcript("https://www.youtube.com/watch?v=abcdefghijk", chunk_words=20)
+    next(stream)
+    stream.close()  # consumidor parou no meio
+
+    with service.open_transcript("https://www.youtube.com/watch?v=abcdefghijk") as handle:
+        assert isinstance(handle, TranscriptFile)
+        assert handle.head(40).startswith("frase número 0")
+
+    assert len(opened) == 3
+    assert all(handle._mm.closed for handle in opened)
+    assert len(YouTubeService._transcript_cache) == 0
+
+
+def test_complete_data_can_skip_loading_the_transcript(monkeypatch, tmp_path, segments):
+    store = TranscriptStore(root=tmp_path)
+    store.put(('abcdefghijk', 'pt', False), segments, content_hash="hash-gravado")
+    monkeypatch.setattr(YouTubeService, '_transcript_store', store)
+    service = YouTubeService()
+    monkeypatch.setattr(service, 'get_video_info', lambda url: {
+        'success': True, 'video_id': 'abcdefghijk', 'title': "t", 'author': "a", 'channel': "c",
+        'publish_date': None, 'views': 1, 'likes': 1, 'duration': 1, 'description': "",
+        'thumbnail_url': None, 'keywords': [], 'category': None,
+    })
+    monkeypatch.setattr(service, 'list_transcripts', lambda video_id: None)
+    monkeypatch.setattr(service, 'select_track', lambda transcripts, languages: _Track())
+    monkeypatch.setattr(service, 'find_near_duplicates', lambda video_id, signature: [])
+
+    data = service.get_complete_data("https://www.youtube.com/watch?v=abcdefghijk", include_transcript=False)
+    assert data['success'] and data['transcript'] is None and data['transcript_segments'] is None
+    assert data['transcript_hash'] == "hash-gravado" and data['transcript_language'] == 'pt'
+    assert data['transcript_is_generated'] is False
+
+    with service.open_track('abcdefghijk', 'pt', False) as handle:
+        assert next(handle.iter_segments()) == segments[0]
+    assert service.open_track('abcdefghijk', 'en', False) is None
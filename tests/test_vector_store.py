@@ -0,0 +1,104 @@
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+from services.vector_store import CorpusIndex, chunk_transcript
+
+
+class HashEmbeddings:
+    """Embeddings determinísticos: um vetor por palavra, somados"""
+
+    dim = 32
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.dim] += 1
+        return vector
+
+    def embed_documents(self, texts):
+        return np.stack([self._vector(text) for text in texts])
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def _video(video_id, word):
+    segments = [{'text': f"{word} fala {i}", 'start': i * 5.0, 'duration': 5.0} for i in range(40)]
+    return {'video_id': video_id, 'title': word, 'channel': "Canal", 'transcript_segments': segments}
+
+
+def test_chunk_transcript_keeps_start_times():
+    segments = [{'text': "um dois três", 'start': float(i), 'duration': 1.0} for i in range(10)]
+    chunks = chunk_transcript(segments, max_words=6)
+    assert [chunk['start'] for chunk in chunks] == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert chunk_transcript(None, "a b c d e", max_words=2)[-1] == {'start': None, 'text': "e"}
+
+
+def test_add_and_search_survive_reopen(tmp_path):
+    index = CorpusIndex(HashEmbeddings(), tmp_path)
+    assert index.add_video(_video("a" * 11, "gato"))['added'] > 0
+    assert index.add_video(_video("b" * 11, "cachorro"))['added'] > 0
+    assert index.add_video(_video("a" * 11, "gato"))['added'] == 0
+
+    reopened = CorpusIndex(HashEmbeddings(), tmp_path)
+    assert reopened.has_video("a" * 11) and reopened.has_video("b" * 11)
+    hits = reopened.search("cachorro fala", k=3)
+    assert hits[0]["video_id"] == "b" * 11
+    assert reopened.search("gato", video_ids=["a" * 11])[0]['video_id'] == "a" * 11
+
+
+def test_unsaved_vectors_do_not_mark_the_video_indexed(tmp_path):
+    index = CorpusIndex(HashEmbeddings(), tmp_path)
+    index.add_video(_video("a" * 11, "gato"))
+    index.add_video(_video("b" * 11, "cachorro"), persist=False)
+    assert index.has_video("b" * 11)
+
+    # o processo "caiu" antes de save(): o vídeo volta a ser indexado
+    reopened = CorpusIndex(HashEmbeddings(), tmp_path)
+    assert reopened.has_video("a" * 11)
+    assert not reopened.has_video("b" * 11)
+    assert reopened.add_video(_video("b" * 11, "cachorro"))['added'] > 0
+
+
+def test_failed_save_leaves_no_rows(tmp_path, monkeypatch):
+    index = CorpusIndex(HashEmbeddings(), tmp_path)
+
+    def broken_save():
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(index, "_write", broken_save)
+    result = index.add_video(_video("a" * 11, "gato"))
+    assert not result['success'] and "disco cheio" in result['error']
+    assert not index.has_video("a" * 11)
+
+
+def test_two_processes_share_the_index_without_losing_vectors(tmp_path):
+    # duas instâncias no mesmo diretório fazem o papel de dois processos
+    first = CorpusIndex(HashEmbeddings(), tmp_path)
+    second = CorpusIndex(HashEmbeddings(), tmp_path)
+    words = ["gato", "cachorro", "papagaio", "tartaruga"]
+    threads = [
+        threading.Thread(target=(first if i % 2 else second).add_video, args=(_video(str(i) * 11, word),))
+        for i, word in enumerate(words)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for index in (first, second, CorpusIndex(HashEmbeddings(), tmp_path)):
+        assert len(index) == 4 * len(chunk_transcript(_video("x", "x")['transcript_segments']))
+        for i, word in enumerate(words):
+            assert index.has_video(str(i) * 11)
+            assert index.search(f"{word} fala", k=1)[0]['video_id'] == str(i) * 11
+
+
+def test_add_video_reads_segments_from_an_iterator(tmp_path):
+    video = _video("c" * 11, "coruja")
+    segments = video.pop('transcript_segments')
+    index = CorpusIndex(HashEmbeddings(), tmp_path)
+    assert index.add_video(video, segments=iter(segments))['added'] == len(chunk_transcript(segments))
+    assert index.search("coruja fala", k=1)[0]['start'] == 0.0
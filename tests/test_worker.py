@@ -0,0 +1,81 @@
+import zlib
+
+import numpy as np
+
+from services import worker as worker_module
+from services.analysis_service import analysis_identity, analysis_key, share_analysis
+from services.library_service import LibraryService
+from services.result_store import ResultStore
+from services.shared_backend import SQLiteBackend
+from services.vector_store import CorpusIndex
+from services.worker import AnalysisWorker
+from services.youtube_service import YouTubeService
+
+URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+class HashEmbeddings:
+    """Embeddings determinísticos: um vetor por palavra, somados"""
+
+    dim = 32
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.dim] += 1
+        return vector
+
+    def embed_documents(self, texts):
+        return np.stack([self._vector(text) for text in texts])
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def _worker(tmp_path, monkeypatch, segments, transcript_hash):
+    video_data = {
+        'success': True,
+        'video_id': "abcdefghijk",
+        'title': "Vídeo",
+        'channel': "Canal",
+        'transcript': " ".join(segment['text'] for segment in segments),
+        'transcript_segments': segments,
+        'transcript_language': "pt-BR",
+        'transcript_hash': transcript_hash,
+        'error': None,
+    }
+    monkeypatch.setattr(YouTubeService, "get_complete_data", lambda self, url: dict(video_data))
+    analyzed = []
+
+    def fake_analysis(transcript, video_data, llm_service):
+        analyzed.append(video_data['video_id'])
+        return {'success': True, 'analysis': {'summary': "Resumo", 'transcript_hash': transcript_hash}, 'error': None}
+
+    monkeypatch.setattr(worker_module, "run_analysis", fake_analysis)
+    worker = AnalysisWorker(
+        SQLiteBackend(tmp_path / "shared.db"),
+        results=ResultStore(tmp_path / "results.db"),
+        library=LibraryService(tmp_path / "library.db"),
+        corpus=CorpusIndex(HashEmbeddings(), tmp_path / "corpus"),
+    )
+    return worker, analyzed
+
+
+def test_worker_ignores_a_shared_analysis_of_another_transcript(tmp_path, monkeypatch, segments):
+    worker, analyzed = _worker(tmp_path, monkeypatch, segments, "hash-novo")
+    key = analysis_key("abcdefghijk", *analysis_identity('ollama', None))
+    share_analysis(key, {'summary': "Antigo", 'transcript_hash': "hash-antigo"}, worker.backend)
+
+    result = worker.process({'url': URL, 'provider': 'ollama'})
+    assert result['success'] and not result['reused'] and analyzed == ["abcdefghijk"]
+
+    # a análise nova vale para a transcrição atual
+    assert worker.process({'url': URL, 'provider': 'ollama'})['reused']
+    assert analyzed == ["abcdefghijk"]
+
+
+def test_worker_indexes_analyzed_videos_in_the_corpus(tmp_path, monkeypatch, segments):
+    worker, _ = _worker(tmp_path, monkeypatch, segments, "hash")
+    assert worker.process({'url': URL, 'provider': 'ollama'})['success']
+    assert worker.corpus.has_video("abcdefghijk")
+    assert worker.corpus.search("frase número 10", k=1)[0]['video_id'] == "abcdefghijk"
@@ -0,0 +1,51 @@
+import threading
+
+from services.cache import TTLCache
+from services.youtube_service import YouTubeService
+
+
+def _fresh_caches(monkeypatch):
+    for name in ('_stats_cache', '_last_stats', '_stats_failures'):
+        monkeypatch.setattr(YouTubeService, name, TTLCache(maxsize=16, ttl=60))
+    monkeypatch.setattr(YouTubeService, '_stats_pending', set())
+    monkeypatch.setattr("services.youtube_service.YOUTUBE_API_KEY", None)
+
+
+def test_failed_stats_refresh_is_not_retried_every_rerun(monkeypatch):
+    _fresh_caches(monkeypatch)
+    calls = []
+
+    def failing_extract(self, video_ids, max_workers=4):
+        calls.append(list(video_ids))
+        return {video_id: {'success': False, 'video_id': video_id} for video_id in video_ids}
+
+    monkeypatch.setattr(YouTubeService, '_extract_infos', failing_extract)
+    service = YouTubeService()
+    assert service.refresh_stats(['abcdefghijk']) == {}
+    assert service.refresh_stats(['abcdefghijk']) == {}
+    assert calls == [['abcdefghijk']]
+
+
+def test_page_gets_last_known_stats_without_waiting(monkeypatch):
+    _fresh_caches(monkeypatch)
+    release, done = threading.Event(), threading.Event()
+
+    def slow_extract(self, video_ids, max_workers=4):
+        release.wait(5)
+        for video_id in video_ids:
+            self._remember_stats(video_id, {'views': 200, 'likes': 20, 'stats_refreshed_at': 2.0})
+        done.set()
+        return {video_id: {'success': True} for video_id in video_ids}
+
+    monkeypatch.setattr(YouTubeService, '_extract_infos', slow_extract)
+    service = YouTubeService()
+    YouTubeService._last_stats.set('abcdefghijk', {'views': 100, 'likes': 10, 'stats_refreshed_at': 1.0})
+
+    # contador vencido: volta na hora com o último valor e agenda uma única atualização
+    assert service.stats_in_background(['abcdefghijk'])['abcdefghijk']['views'] == 100
+    assert service.stats_in_background(['abcdefghijk'])['abcdefghijk']['views'] == 100
+    assert YouTubeService._stats_pending == {'abcdefghijk'}
+
+    release.set()
+    assert done.wait(2)
+    assert service.stats_in_background(['abcdefghijk'])['abcdefghijk']['views'] == 200